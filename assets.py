@@ -0,0 +1,265 @@
+"""
+Arquivos estáticos próprios: CSS do Tailwind já compilado e enxuto, JS e
+fontes sem CDN, selos de rank redimensionados.
+
+`flask assets-build` (precisa de `npm ci` antes) gera static/dist/:
+
+    css/app.<hash>.css                Tailwind só com as classes usadas nos templates
+    js/alpine.<hash>.js               Alpine.js
+    vendor/fontawesome/...            Font Awesome (CSS + webfonts)
+    fonts/inter-latin-*.<hash>.woff2  Inter 400/500/700
+    img/selos/<rank>-24.<hash>.webp   selos em 24 e 48 px (PNG e WebP)
+    img/...                           demais imagens de static/img
+    manifest.json                     nome lógico -> nome com hash
+
+Os nomes levam o hash do conteúdo, então são servidos com
+`Cache-Control: immutable` de um ano. Texto (CSS, JS, TTF) ganha versões
+.br e .gz pré-comprimidas, escolhidas pelo Accept-Encoding.
+
+Nos templates nada muda: `url_for('static', filename='css/app.css')`
+resolve para o nome com hash quando ele está no manifesto. `asset_existe`
+diz se o build foi feito; sem ele, o base.html continua usando os CDNs.
+"""
+import gzip
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import subprocess
+from hashlib import sha256
+from pathlib import Path
+
+from flask import current_app, request, send_file, abort
+from werkzeug.security import safe_join
+
+BASE_DIR = Path(__file__).resolve().parent
+NODE_MODULES = BASE_DIR / "node_modules"
+PASTA_DIST = "dist" # Dentro de static/
+CACHE_MAX_AGE = 365 * 24 * 3600
+
+# (origem em node_modules, destino em dist/)
+VENDOR = (
+    ("alpinejs/dist/alpine.js", "js/alpine.js"),
+    ("@fortawesome/fontawesome-free/css/all.min.css", "vendor/fontawesome/css/all.min.css"),
+    ("@fortawesome/fontawesome-free/webfonts", "vendor/fontawesome/webfonts"),
+    *((f"@fontsource/inter/files/inter-latin-{peso}-normal.woff2", f"fonts/inter-latin-{peso}-normal.woff2")
+      for peso in (400, 500, 700)),
+)
+SELOS = ("bronze", "prata", "ouro")
+TAMANHOS_SELO = (24, 48) # w-6 em telas 1x e 2x
+COMPRIMIVEIS = {".css", ".js", ".svg", ".json", ".ttf", ".txt"}
+URL_CSS = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+class AssetsErro(Exception):
+    pass
+
+
+# --- Build -----------------------------------------------------------------
+
+def _tailwind(destino):
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        subprocess.run(
+            ["npx", "--no-install", "tailwindcss", "-c", "tailwind.config.js",
+             "-i", "assets/app.css", "-o", str(destino), "--minify"],
+            cwd=BASE_DIR, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise AssetsErro(f"Falha ao compilar o Tailwind (rode `npm ci` antes): {e}") from e
+
+
+def _copiar_vendor(pasta):
+    for origem, destino in VENDOR:
+        origem, destino = NODE_MODULES / origem, pasta / destino
+        if not origem.exists():
+            raise AssetsErro(f"{origem} não encontrado (rode `npm ci` antes).")
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        if origem.is_dir():
+            shutil.copytree(origem, destino)
+        else:
+            shutil.copy2(origem, destino)
+
+
+def _gerar_selos(static, pasta):
+    from PIL import Image # Só o build precisa do Pillow
+
+    (pasta / "img" / "selos").mkdir(parents=True, exist_ok=True)
+    for nome in SELOS:
+        with Image.open(static / "img" / f"{nome}.png") as original:
+            original = original.convert("RGBA")
+            for tamanho in TAMANHOS_SELO:
+                img = original.copy()
+                img.thumbnail((tamanho, tamanho), Image.LANCZOS)
+                base = pasta / "img" / "selos" / f"{nome}-{tamanho}"
+                img.save(f"{base}.png", "PNG", optimize=True)
+                img.save(f"{base}.webp", "WEBP", quality=90, method=6)
+
+
+def _copiar_imagens(static, pasta):
+    for origem in (static / "img").iterdir():
+        if origem.is_file():
+            (pasta / "img").mkdir(parents=True, exist_ok=True)
+            shutil.copy2(origem, pasta / "img" / origem.name)
+
+
+def _nome_com_hash(relativo, conteudo):
+    raiz, extensao = posixpath.splitext(relativo)
+    return f"{raiz}.{sha256(conteudo).hexdigest()[:12]}{extensao}"
+
+
+def _reescrever_urls(relativo, texto, nomes):
+    """Troca as url(...) relativas de um CSS pelos nomes com hash."""
+    pasta = posixpath.dirname(relativo)
+
+    def trocar(m):
+        url = m.group(2).strip()
+        caminho, sufixo = re.match(r"([^?#]*)(.*)", url).groups()
+        if not caminho or ":" in caminho or caminho.startswith("/"):
+            return m.group(0)
+        alvo = nomes.get(posixpath.normpath(posixpath.join(pasta, caminho)))
+        if alvo is None:
+            return m.group(0)
+        return f'url("{posixpath.relpath(alvo, pasta or ".")}{sufixo}")'
+
+    return URL_CSS.sub(trocar, texto)
+
+
+def _fingerprint(pasta):
+    """Renomeia tudo para nome.<hash>.ext; CSS por último, já com as url() trocadas."""
+    arquivos = sorted(p.relative_to(pasta).as_posix() for p in pasta.rglob("*") if p.is_file())
+    nomes = {}
+    for relativo in sorted(arquivos, key=lambda r: r.endswith(".css")):
+        caminho = pasta / relativo
+        if relativo.endswith(".css"):
+            texto = _reescrever_urls(relativo, caminho.read_text(encoding="utf-8"), nomes)
+            caminho.write_text(texto, encoding="utf-8")
+        nomes[relativo] = _nome_com_hash(relativo, caminho.read_bytes())
+        caminho.rename(pasta / nomes[relativo])
+    return nomes
+
+
+def _comprimir(pasta, nomes):
+    """Grava .br e .gz dos arquivos de texto, quando ficam menores."""
+    try:
+        import brotli # Opcional: sem ele só há .gz
+    except ImportError:
+        brotli = None
+        current_app.logger.warning("Brotli não instalado: gerando só as versões .gz.")
+    comprimidos = {}
+    for relativo in nomes.values():
+        if posixpath.splitext(relativo)[1] not in COMPRIMIVEIS:
+            continue
+        conteudo = (pasta / relativo).read_bytes()
+        variantes = [("gzip", ".gz", gzip.compress(conteudo, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variantes.insert(0, ("br", ".br", brotli.compress(conteudo, quality=11)))
+        for codificacao, extensao, dados in variantes:
+            if len(dados) < len(conteudo):
+                (pasta / (relativo + extensao)).write_bytes(dados)
+                comprimidos.setdefault(relativo, []).append(codificacao)
+    return comprimidos
+
+
+def construir(sem_node=False):
+    """
+    Gera static/dist do zero e devolve o manifesto. Com `sem_node` pula o
+    Tailwind e os pacotes do npm (o base.html continua nos CDNs).
+    """
+    static = Path(current_app.static_folder)
+    destino = static / PASTA_DIST
+    pasta = static / f".{PASTA_DIST}.novo"
+    shutil.rmtree(pasta, ignore_errors=True)
+    pasta.mkdir()
+    try:
+        if not sem_node:
+            _tailwind(pasta / "css" / "app.css")
+            _copiar_vendor(pasta)
+        _copiar_imagens(static, pasta)
+        _gerar_selos(static, pasta)
+        nomes = _fingerprint(pasta)
+        manifesto = {
+            "arquivos": {logico: f"{PASTA_DIST}/{nome}" for logico, nome in nomes.items()},
+            "comprimidos": {f"{PASTA_DIST}/{nome}": cods for nome, cods in _comprimir(pasta, nomes).items()},
+        }
+        (pasta / "manifest.json").write_text(json.dumps(manifesto, indent=2, sort_keys=True), encoding="utf-8")
+    except BaseException:
+        shutil.rmtree(pasta, ignore_errors=True)
+        raise
+    # Troca a pasta inteira de uma vez
+    antigo = static / f".{PASTA_DIST}.antigo"
+    shutil.rmtree(antigo, ignore_errors=True)
+    if destino.exists():
+        destino.rename(antigo)
+    pasta.rename(destino)
+    shutil.rmtree(antigo, ignore_errors=True)
+    current_app.extensions.pop("assets", None)
+    return manifesto
+
+
+# --- Em execução -------------------------------------------------------------
+
+def _manifesto():
+    """Manifesto de static/dist (lido uma vez; em debug, relido quando muda)."""
+    caminho = os.path.join(current_app.static_folder, PASTA_DIST, "manifest.json")
+    cache = current_app.extensions.get("assets")
+    if cache is not None and not current_app.debug:
+        return cache["manifesto"]
+    try:
+        mtime = os.stat(caminho).st_mtime
+    except FileNotFoundError:
+        mtime = None
+    if cache is None or cache["mtime"] != mtime:
+        manifesto = {"arquivos": {}, "comprimidos": {}}
+        if mtime is not None:
+            with open(caminho, encoding="utf-8") as f:
+                manifesto = json.load(f)
+        manifesto["servidos"] = set(manifesto["arquivos"].values())
+        cache = {"mtime": mtime, "manifesto": manifesto}
+        current_app.extensions["assets"] = cache
+    return cache["manifesto"]
+
+
+def asset_existe(nome):
+    """Se `nome` (ex.: 'css/app.css') foi gerado por `flask assets-build`."""
+    return nome in _manifesto()["arquivos"]
+
+
+def _url_com_hash(endpoint, values):
+    if endpoint == "static" and "filename" in values:
+        values["filename"] = _manifesto()["arquivos"].get(values["filename"], values["filename"])
+
+
+def servir_estatico(filename):
+    """Substitui a rota /static: arquivos de dist/ saem pré-comprimidos e imutáveis."""
+    manifesto = _manifesto()
+    if filename not in manifesto["servidos"]:
+        return current_app.send_static_file(filename)
+
+    caminho = safe_join(current_app.static_folder, filename)
+    if caminho is None:
+        abort(404)
+    codificacao = None
+    for disponivel in manifesto["comprimidos"].get(filename, ()):
+        if request.accept_encodings[disponivel]:
+            codificacao = disponivel
+            break
+    if codificacao:
+        caminho += ".br" if codificacao == "br" else ".gz"
+    response = send_file(caminho, mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                         conditional=True, max_age=CACHE_MAX_AGE)
+    if codificacao:
+        response.headers["Content-Encoding"] = codificacao
+    if filename in manifesto["comprimidos"]:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    app.url_defaults(_url_com_hash)
+    app.add_template_global(asset_existe)
+    app.view_functions["static"] = servir_estatico
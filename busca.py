@@ -0,0 +1,220 @@
+"""
+Busca textual nas licitações (título, tipo de serviço e descrição).
+
+    page, destaques = buscar_licitacoes("pintura fachada", cidade="Curitiba", estado="PR")
+
+- Postgres: coluna gerada `licitacao.busca` (tsvector em português, com
+  peso A para o título, B para o tipo e C para a descrição) e um índice
+  GIN. A coluna é recalculada pelo próprio banco a cada INSERT/UPDATE. Os
+  acentos saem com translate() no documento e na consulta (sem depender da
+  extensão unaccent), então "manutencao" acha "manutenção". A consulta
+  aceita a sintaxe de websearch_to_tsquery ("frase exata", or, -palavra)
+  e é ordenada por ts_rank_cd.
+- SQLite (desenvolvimento): tabela virtual FTS5 `licitacao_busca` com
+  conteúdo externo, mantida por triggers. Sem stemming em português: cada
+  palavra vira uma busca por prefixo, sem acentos. Ordenada por bm25.
+
+Os resultados são paginados por cursor em (rank, id) e o trecho destacado
+(ts_headline / snippet) é calculado só para as linhas da página. O índice é
+criado pela migração ou, em bancos criados com create_all, junto com a
+tabela; `flask busca-rebuild` cria o que faltar e reindexa. Esses objetos
+não estão no metadata dos modelos (a coluna tsvector não existe no
+SQLite), então o autogenerate do Alembic os ignora (`objeto_da_busca`,
+usado em migrations/env.py) em vez de propor apagá-los.
+"""
+import re
+import unicodedata
+
+from markupsafe import Markup, escape
+from sqlalchemy import Integer, column, func, literal_column, table, text
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, TSVECTOR
+
+from models import db, Condominio, Licitacao
+from pagination import Page, page_size, paginate_keyset
+
+IDIOMA = "portuguese"
+_CONFIG = literal_column(f"'{IDIOMA}'::regconfig")
+
+# Tabela FTS5 do SQLite; a coluna oculta com o nome da tabela recebe o MATCH
+_FTS5 = table("licitacao_busca", column("rowid", Integer), column("licitacao_busca"))
+
+# Marcadores do trecho destacado, trocados por <mark> depois de escapar o texto
+INICIO, FIM = "⟦", "⟧"
+
+# translate() é IMMUTABLE e pode entrar na coluna gerada, ao contrário de unaccent()
+COM_ACENTO = "áàâãäåéèêëíìîïóòôõöúùûüçñÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑ"
+SEM_ACENTO = "aaaaaaeeeeiiiiooooouuuucnAAAAAAEEEEIIIIOOOOOUUUUCN"
+
+
+def _vetor(campo, peso):
+    return (f"setweight(to_tsvector('{IDIOMA}', "
+            f"translate(coalesce({campo}, ''), '{COM_ACENTO}', '{SEM_ACENTO}')), '{peso}')")
+
+
+DDL_POSTGRES = (
+    "ALTER TABLE licitacao ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS ("
+    f"{_vetor('titulo', 'A')} || {_vetor('tipo_servico', 'B')} || {_vetor('descricao', 'C')}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_licitacao_busca ON licitacao USING gin (busca)",
+)
+
+DDL_SQLITE = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS licitacao_busca USING fts5(
+        titulo, tipo_servico, descricao,
+        content='licitacao', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS licitacao_busca_ai AFTER INSERT ON licitacao BEGIN
+        INSERT INTO licitacao_busca(rowid, titulo, tipo_servico, descricao)
+        VALUES (new.id, new.titulo, new.tipo_servico, new.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS licitacao_busca_ad AFTER DELETE ON licitacao BEGIN
+        INSERT INTO licitacao_busca(licitacao_busca, rowid, titulo, tipo_servico, descricao)
+        VALUES ('delete', old.id, old.titulo, old.tipo_servico, old.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS licitacao_busca_au AFTER UPDATE OF titulo, tipo_servico, descricao ON licitacao BEGIN
+        INSERT INTO licitacao_busca(licitacao_busca, rowid, titulo, tipo_servico, descricao)
+        VALUES ('delete', old.id, old.titulo, old.tipo_servico, old.descricao);
+        INSERT INTO licitacao_busca(rowid, titulo, tipo_servico, descricao)
+        VALUES (new.id, new.titulo, new.tipo_servico, new.descricao);
+    END""",
+)
+
+
+def objeto_da_busca(tipo, nome, tabela=None):
+    """Se o objeto do banco é um dos criados pelo DDL acima (tipo/nome como no include_object do Alembic)."""
+    if tipo == "column":
+        return tabela == "licitacao" and nome == "busca"
+    if tipo == "index":
+        return nome == "ix_licitacao_busca"
+    if tipo == "table":
+        # A tabela FTS5 e as tabelas internas dela (_data, _idx, _docsize, _config)
+        return nome == "licitacao_busca" or nome.startswith("licitacao_busca_")
+    return False
+
+
+def criar_indice(connection):
+    """Cria a coluna/índice (Postgres) ou a tabela FTS5 e os triggers (SQLite), se faltarem."""
+    nome = connection.dialect.name
+    ddl = DDL_POSTGRES if nome == "postgresql" else DDL_SQLITE if nome == "sqlite" else ()
+    for comando in ddl:
+        connection.execute(text(comando))
+    return bool(ddl)
+
+
+def reconstruir(connection):
+    """Recria o índice a partir da tabela licitacao (o tsvector do Postgres é gerado pelo banco)."""
+    if not criar_indice(connection):
+        return False
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("INSERT INTO licitacao_busca(licitacao_busca) VALUES ('rebuild')"))
+    else:
+        connection.execute(text("REINDEX INDEX ix_licitacao_busca"))
+    return True
+
+
+@db.event.listens_for(Licitacao.__table__, "after_create")
+def _criar_junto_com_a_tabela(target, connection, **kw):
+    criar_indice(connection)
+
+
+def _sem_acento(texto):
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+def _consulta_fts5(termos):
+    """Texto livre -> consulta FTS5: cada palavra entre aspas, com prefixo (sem operadores do usuário)."""
+    palavras = re.findall(r"\w+", termos)
+    return " ".join(f'"{palavra}"*' for palavra in palavras) or None
+
+
+def _filtrar_local(query, cidade, estado):
+    if cidade or estado:
+        query = query.join(Condominio, Condominio.id == Licitacao.condominio_id)
+    if cidade:
+        query = query.filter(func.lower(Condominio.cidade) == cidade.strip().lower())
+    if estado:
+        query = query.filter(Condominio.estado == estado.strip().upper())
+    return query
+
+
+def consulta_busca(termos, cidade=None, estado=None, opcoes=()):
+    """
+    Consulta (Licitacao, rank) das licitações abertas que casam com
+    `termos`, sem ordem nem limite. Devolve (query, rank, consulta), ou None
+    se não sobrar nenhuma palavra para buscar.
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        consulta = func.websearch_to_tsquery(_CONFIG, _sem_acento(termos))
+        busca = literal_column("licitacao.busca", TSVECTOR)
+        # ts_rank_cd devolve real: em double precision o valor volta exato no cursor da paginação
+        rank = db.cast(func.ts_rank_cd(busca, consulta), DOUBLE_PRECISION)
+        ranking = (db.session.query(Licitacao.id.label("id"), rank.label("rank"))
+                   .filter(busca.op("@@")(consulta)))
+    else:
+        consulta = _consulta_fts5(termos)
+        if consulta is None:
+            return None
+        # bm25 é menor para os mais relevantes; pesos: título 10, tipo 4, descrição 1
+        ranking = (db.session.query(_FTS5.c.rowid.label("id"),
+                                    (-func.bm25(literal_column("licitacao_busca"), 10.0, 4.0, 1.0, type_=db.Float)).label("rank"))
+                   .filter(_FTS5.c.licitacao_busca.op("MATCH")(consulta)))
+    ranking = ranking.subquery("ranking")
+
+    query = (db.session.query(Licitacao, ranking.c.rank)
+             .join(ranking, ranking.c.id == Licitacao.id)
+             .filter(Licitacao.status == "aberta")
+             .options(*opcoes))
+    return _filtrar_local(query, cidade, estado), ranking.c.rank, consulta
+
+
+def buscar_licitacoes(termos, cidade=None, estado=None, opcoes=()):
+    """
+    Licitações abertas que casam com `termos`, da mais relevante para a
+    menos, filtradas por cidade/UF do condomínio. Devolve (page, destaques):
+    os itens da página são (Licitacao, rank) e `destaques` mapeia o id para
+    (titulo, trecho) com os marcadores INICIO/FIM (ver o filtro `destacar`).
+    """
+    busca = consulta_busca(termos, cidade, estado, opcoes)
+    if busca is None:
+        return Page([], page_size()), {}
+    query, rank, consulta = busca
+    page = paginate_keyset(query, rank, Licitacao.id, descending=True)
+    return page, _destaques([lic.id for lic, _ in page.items], termos, consulta)
+
+
+def listar_abertas(cidade=None, estado=None, opcoes=()):
+    """Sem termos de busca: licitações abertas, das mais novas para as mais antigas."""
+    query = Licitacao.query.options(*opcoes).filter(Licitacao.status == "aberta")
+    return paginate_keyset(_filtrar_local(query, cidade, estado), Licitacao.created_at, Licitacao.id, descending=True)
+
+
+def _destaques(ids, termos, consulta):
+    if not ids:
+        return {}
+    if db.session.get_bind().dialect.name == "postgresql":
+        # ts_headline lê o texto original, com acentos: destaca as duas grafias
+        consulta = consulta.op("||")(func.websearch_to_tsquery(_CONFIG, termos))
+        marcadores = f"StartSel={INICIO}, StopSel={FIM}, MaxWords=35, MinWords=15, MaxFragments=2"
+        linhas = db.session.query(
+            Licitacao.id,
+            func.ts_headline(_CONFIG, Licitacao.titulo, consulta, f"StartSel={INICIO}, StopSel={FIM}, HighlightAll=true"),
+            func.ts_headline(_CONFIG, Licitacao.descricao, consulta, marcadores),
+        ).filter(Licitacao.id.in_(ids))
+    else:
+        # highlight/snippet só funcionam numa consulta com MATCH na tabela FTS5
+        linhas = db.session.execute(text(
+            f"SELECT rowid, highlight(licitacao_busca, 0, '{INICIO}', '{FIM}'), "
+            f"snippet(licitacao_busca, 2, '{INICIO}', '{FIM}', '…', 24) "
+            "FROM licitacao_busca WHERE licitacao_busca MATCH :consulta AND rowid IN :ids"
+        ).bindparams(db.bindparam("ids", expanding=True)), {"consulta": consulta, "ids": ids})
+    return {id_: (titulo, trecho) for id_, titulo, trecho in linhas}
+
+
+def destacar(texto):
+    """Filtro Jinja: escapa o texto e transforma os marcadores da busca em <mark>."""
+    if texto is None:
+        return ""
+    return Markup(str(escape(texto)).replace(INICIO, "<mark>").replace(FIM, "</mark>"))
+
+
+def init_busca(app):
+    app.add_template_filter(destacar)
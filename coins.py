@@ -0,0 +1,212 @@
+"""
+Livro-razão das coins das empresas.
+
+Todo débito e crédito de `saldo_coins` passa por aqui: um único UPDATE
+condicional altera o saldo no próprio banco e devolve o valor novo
+(RETURNING), e a TransacaoCoin correspondente entra na mesma transação.
+Nada de ler o saldo, calcular em Python e gravar de volta: com duas
+requisições ao mesmo tempo (duas candidaturas, ou uma candidatura e o
+webhook do Mercado Pago) uma das escritas se perderia, ou as duas
+passariam pela checagem de saldo e a empresa gastaria o que não tem.
+
+No Postgres o UPDATE trava a linha da empresa até o commit, então as
+operações da mesma empresa entram em fila; no SQLite a escrita inteira é
+serializada. Como em enqueue_email, o commit fica a cargo de quem chamou.
+
+`flask coins-stress` dispara débitos e créditos concorrentes e confere
+que o saldo final bate com a soma do livro-razão. Ele grava uma empresa e
+transações de mentira, então só roda em banco de teste (SQLite ou nome com
+"test") ou com --confirmar, e apaga tudo no fim mesmo se for interrompido.
+"""
+import random
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Empresa, TransacaoCoin
+
+
+class SaldoInsuficiente(Exception):
+    """A empresa não tem coins para o débito; nada foi alterado."""
+
+
+class PagamentoJaCreditado(Exception):
+    """O pagamento já tem transação no livro-razão; nada foi alterado."""
+
+
+class BancoNaoEhDeTeste(Exception):
+    """O teste de carga recusou o banco configurado (pode ser o de produção)."""
+
+
+def _alterar_saldo(empresa_id, delta, condicao=None):
+    consulta = (
+        update(Empresa)
+        .where(Empresa.id == empresa_id)
+        .values(saldo_coins=Empresa.saldo_coins + delta)
+        .returning(Empresa.saldo_coins)
+        .execution_options(synchronize_session=False)
+    )
+    if condicao is not None:
+        consulta = consulta.where(condicao)
+    return db.session.execute(consulta).scalar()
+
+
+def _registrar(empresa_id, quantidade, descricao, payment_id=None):
+    db.session.add(TransacaoCoin(
+        empresa_id=empresa_id,
+        quantidade=quantidade,
+        descricao=descricao,
+        payment_id=payment_id,
+        status="concluido"
+    ))
+
+
+def debitar(empresa_id, quantidade, descricao):
+    """Debita `quantidade` coins se houver saldo. Devolve o saldo novo ou levanta SaldoInsuficiente."""
+    if quantidade < 0:
+        raise ValueError("quantidade do débito não pode ser negativa")
+    novo_saldo = _alterar_saldo(empresa_id, -quantidade, Empresa.saldo_coins >= quantidade)
+    if novo_saldo is None:
+        raise SaldoInsuficiente(f"Empresa ID {empresa_id} sem saldo para {quantidade} coins.")
+    _registrar(empresa_id, -quantidade, descricao)
+    return novo_saldo
+
+
+def creditar(empresa_id, quantidade, descricao, payment_id=None):
+    """
+    Credita `quantidade` coins. Devolve o saldo novo, ou None se a empresa não existir.
+
+    Com `payment_id` a transação é gravada antes, num savepoint: o índice
+    único em payment_id faz o segundo crédito do mesmo pagamento (dois
+    workers com a mesma notificação) levantar PagamentoJaCreditado sem
+    mexer no saldo.
+    """
+    if quantidade < 0:
+        raise ValueError("quantidade do crédito não pode ser negativa")
+    if payment_id is None:
+        novo_saldo = _alterar_saldo(empresa_id, quantidade)
+        if novo_saldo is not None:
+            _registrar(empresa_id, quantidade, descricao)
+        return novo_saldo
+
+    if db.session.query(Empresa.id).filter_by(id=empresa_id).first() is None:
+        return None
+    try:
+        with db.session.begin_nested():
+            _registrar(empresa_id, quantidade, descricao, payment_id)
+    except IntegrityError:
+        raise PagamentoJaCreditado(f"Pagamento {payment_id} já creditado.") from None
+    return _alterar_saldo(empresa_id, quantidade)
+
+
+def saldo_do_livro(empresa_id):
+    """Soma das transações da empresa (deve ser igual a saldo_coins)."""
+    return db.session.query(func.coalesce(func.sum(TransacaoCoin.quantidade), 0)) \
+                     .filter(TransacaoCoin.empresa_id == empresa_id).scalar()
+
+
+# --- Teste de carga ----------------------------------------------------------
+
+def banco_de_teste(url):
+    """SQLite (desenvolvimento) ou um banco cujo nome indica teste (ex.: condominio_teste)."""
+    return url.get_backend_name() == "sqlite" or "test" in (url.database or "").lower()
+
+
+def _operacao_ingenua(empresa_id, delta, descricao):
+    """O padrão antigo (ler, somar em Python, gravar), para comparação."""
+    empresa = db.session.get(Empresa, empresa_id)
+    if empresa.saldo_coins + delta < 0:
+        raise SaldoInsuficiente(descricao)
+    empresa.saldo_coins = empresa.saldo_coins + delta
+    _registrar(empresa_id, delta, descricao)
+
+
+def _apagar_empresa_de_teste(empresa_id):
+    db.session.rollback()
+    TransacaoCoin.query.filter_by(empresa_id=empresa_id).delete(synchronize_session=False)
+    db.session.delete(db.session.get(Empresa, empresa_id))
+    db.session.commit()
+
+
+def estressar(threads=8, operacoes=200, saldo_inicial=50, ingenuo=False, semente=None, confirmar=False):
+    """
+    Cria uma empresa temporária e dispara `operacoes` débitos/créditos
+    aleatórios em cada uma das `threads` (cada uma com sua sessão), todas
+    ao mesmo tempo. No fim compara saldo_coins com a soma do livro-razão e
+    apaga a empresa, inclusive se algo falhar no meio. `ingenuo=True` usa o
+    ler-calcular-gravar antigo. Fora de um banco de teste levanta
+    BancoNaoEhDeTeste, a não ser com `confirmar=True`.
+    """
+    if not confirmar and not banco_de_teste(db.engine.url):
+        raise BancoNaoEhDeTeste(db.engine.url.render_as_string(hide_password=True))
+
+    app = current_app._get_current_object()
+    empresa = Empresa(nome="Teste de carga (coins)", cnpj="00.000.000/0000-00", status="teste")
+    db.session.add(empresa)
+    db.session.commit()
+    empresa_id = empresa.id
+
+    contagem = {"debitos": 0, "creditos": 0, "recusados": 0, "erros": 0}
+    trava = threading.Lock()
+    largada = threading.Barrier(threads)
+    parar = threading.Event()
+
+    def trabalhar(indice):
+        sorteio = random.Random(None if semente is None else semente + indice)
+        with app.app_context():
+            try:
+                largada.wait()
+            except threading.BrokenBarrierError:
+                return
+            for _ in range(operacoes):
+                if parar.is_set():
+                    break
+                quantidade = sorteio.randint(1, 5)
+                credito = sorteio.random() < 0.4
+                resultado = "creditos" if credito else "debitos"
+                try:
+                    if ingenuo:
+                        _operacao_ingenua(empresa_id, quantidade if credito else -quantidade, "Teste de carga")
+                    elif credito:
+                        creditar(empresa_id, quantidade, "Teste de carga")
+                    else:
+                        debitar(empresa_id, quantidade, "Teste de carga")
+                    db.session.commit()
+                except SaldoInsuficiente:
+                    db.session.rollback()
+                    resultado = "recusados"
+                except Exception as e:
+                    db.session.rollback()
+                    current_app.logger.debug(f"Teste de carga: {e}")
+                    resultado = "erros"
+                with trava:
+                    contagem[resultado] += 1
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    try:
+        creditar(empresa_id, saldo_inicial, "Saldo inicial do teste de carga")
+        db.session.commit()
+
+        inicio = time.perf_counter()
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+        duracao = time.perf_counter() - inicio
+
+        db.session.expire_all()
+        saldo = db.session.get(Empresa, empresa_id).saldo_coins
+        livro = saldo_do_livro(empresa_id)
+    finally:
+        # Interrompido (Ctrl+C) ou com erro: as threads param antes da limpeza
+        parar.set()
+        largada.abort()
+        for trabalhador in trabalhadores:
+            if trabalhador.is_alive():
+                trabalhador.join()
+        _apagar_empresa_de_teste(empresa_id)
+
+    return dict(contagem, saldo=saldo, livro=livro, segundos=duracao)
@@ -0,0 +1,244 @@
+"""
+Comandos `flask ...` (workers, manutenção e diagnóstico).
+
+Registrados por create_app(). Os módulos pesados de cada comando (Pillow,
+Flask-Migrate/Alembic...) são importados dentro do próprio comando, para
+que o boot dos workers web não pague por eles.
+"""
+import signal
+import sys
+
+import click
+from flask import current_app
+from flask.cli import ScriptInfo, with_appcontext
+
+from models import db, Empresa, ContaAcesso
+from outbox import run_outbox_worker, outbox_stats
+from mp_webhooks import run_webhook_worker, requeue_dead_letters
+
+
+@click.command("db", add_help_option=False,
+               context_settings={"ignore_unknown_options": True, "allow_extra_args": True})
+@click.pass_context
+def db_command(ctx):
+    """Migrações do banco (Flask-Migrate / Alembic)."""
+    # O Flask-Migrate (e o Alembic) só é importado quando `flask db ...` é usado
+    from flask_migrate import Migrate
+    from flask_migrate.cli import db as grupo
+
+    info = ctx.find_object(ScriptInfo)
+    app = info.load_app()
+    if "migrate" not in app.extensions:
+        Migrate(app, db)
+    grupo.main(args=ctx.args, prog_name=ctx.command_path, obj=info)
+
+
+@click.command("outbox-worker")
+@with_appcontext
+@click.option("--once", is_flag=True, help="Drena a fila uma vez e sai.")
+def outbox_worker_command(once):
+    """Envia os e-mails enfileirados no outbox."""
+    run_outbox_worker(once=once)
+
+@click.command("outbox-stats")
+@with_appcontext
+def outbox_stats_command():
+    """Mostra a profundidade da fila de e-mails e as latências de envio."""
+    for chave, valor in outbox_stats().items():
+        print(f"{chave}: {valor}")
+
+@click.command("logo-worker")
+@with_appcontext
+@click.option("--once", is_flag=True, help="Processa as logos pendentes uma vez e sai.")
+def logo_worker_command(once):
+    """Gera as variantes (WebP/PNG, 32/64/200 px) das logos enviadas."""
+    from logos import run_logo_worker
+    run_logo_worker(once=once)
+
+@click.command("reputacao-rebuild")
+@with_appcontext
+def reputacao_rebuild_command():
+    """Recalcula rating_avg, rating_count e service_count de todas as empresas."""
+    Empresa.recalcular_reputacao()
+    db.session.commit()
+    print("✅ Contadores de reputação recalculados.")
+
+@click.command("contas-acesso-rebuild")
+@with_appcontext
+def contas_acesso_rebuild_command():
+    """Recria a tabela de contas de login a partir de condomínios e empresas."""
+    conflitos = ContaAcesso.reconstruir()
+    db.session.commit()
+    for email, dono, ignorado in conflitos:
+        print(f"⚠️  {email}: mantido {dono[0]} #{dono[1]}, ignorado {ignorado[0]} #{ignorado[1]}")
+    print(f"✅ Contas de acesso recriadas ({len(conflitos)} conflito(s) de e-mail).")
+
+@click.command("uploads-gc")
+@with_appcontext
+@click.option("--dry-run", is_flag=True, help="Só lista o que seria apagado.")
+@click.option("--carencia-horas", default=24, show_default=True, type=float,
+              help="Não apaga arquivos mais novos que isso (uploads em andamento).")
+@click.option("--listar", is_flag=True, help="Mostra cada chave órfã.")
+def uploads_gc_command(dry_run, carencia_horas, listar):
+    """Apaga do storage os arquivos que nenhum condomínio ou empresa referencia."""
+    from upload_gc import coletar_orfaos, formatar_bytes
+    resultado = coletar_orfaos(carencia_horas=carencia_horas, dry_run=dry_run)
+    if listar:
+        for chave in resultado["chaves"]:
+            print(f"  {chave}")
+    acao = "seriam liberados" if dry_run else "liberados"
+    print(f"{resultado['arquivos_listados']} arquivo(s) no storage, {resultado['referenciados']} chave(s) referenciada(s), "
+          f"{resultado['ignorados_por_carencia']} dentro da carência.")
+    print(f"{'🔎' if dry_run else '🧹'} {resultado['orfaos']} órfão(s); {formatar_bytes(resultado['bytes'])} {acao}.")
+
+@click.command("assets-build")
+@with_appcontext
+@click.option("--sem-node", is_flag=True, help="Pula o Tailwind e os pacotes do npm (só imagens).")
+def assets_build_command(sem_node):
+    """Gera static/dist: CSS do Tailwind, JS/fontes locais e selos, com hash e .br/.gz."""
+    from assets import construir, AssetsErro
+    try:
+        manifesto = construir(sem_node=sem_node)
+    except AssetsErro as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(f"✅ {len(manifesto['arquivos'])} arquivo(s) em static/dist, "
+          f"{len(manifesto['comprimidos'])} com versão pré-comprimida.")
+
+@click.command("explain-consultas")
+@with_appcontext
+@click.option("--salvar", type=click.Path(dir_okay=False), help="Grava os planos em JSON (ex.: antes da migração).")
+@click.option("--comparar", type=click.Path(exists=True, dir_okay=False), help="Mostra os planos salvos lado a lado com os atuais.")
+@click.option("--analyze", is_flag=True, help="Usa EXPLAIN ANALYZE no Postgres (executa as consultas).")
+def explain_consultas_command(salvar, comparar, analyze):
+    """Imprime o EXPLAIN das consultas quentes (login, listagens, webhook)."""
+    from explain_consultas import coletar_planos, imprimir_planos, salvar_planos, carregar_planos
+    planos = coletar_planos(analyze=analyze)
+    imprimir_planos(planos, carregar_planos(comparar) if comparar else None)
+    if salvar:
+        salvar_planos(planos, salvar)
+        print(f"Planos gravados em {salvar}.")
+
+@click.command("mp-webhook-worker")
+@with_appcontext
+@click.option("--once", is_flag=True, help="Drena a fila uma vez e sai.")
+def mp_webhook_worker_command(once):
+    """Processa as notificações do Mercado Pago enfileiradas pelo webhook."""
+    run_webhook_worker(once=once)
+
+@click.command("mp-webhook-reprocessar")
+@with_appcontext
+def mp_webhook_reprocessar_command():
+    """Devolve para a fila as notificações que foram para a dead-letter."""
+    print(f"{requeue_dead_letters()} notificação(ões) devolvida(s) para a fila.")
+
+
+@click.command("create-tables")
+@with_appcontext
+def create_tables_command():
+    """Criar tabelas manualmente"""
+    try:
+        db.create_all()
+        print("✅ Tabelas criadas com sucesso!")
+    except Exception as e:
+        print(f"❌ Erro ao criar tabelas: {e}")
+
+@click.command("startup-report")
+@click.option("--top", default=25, show_default=True, help="Quantos módulos mostrar.")
+def startup_report_command(top):
+    """Mede, em um interpretador novo, o custo de importação de cada módulo no boot da app."""
+    from startup_report import medir, imprimir
+    imprimir(medir(), top=top)
+
+@click.command("templates-precompile")
+@with_appcontext
+def templates_precompile_command():
+    """Compila todos os templates e grava o bytecode em JINJA_CACHE_DIR (rodar no deploy)."""
+    from template_cache import precompilar
+    if current_app.jinja_env.bytecode_cache is None:
+        print("⚠️ JINJA_CACHE_DIR não configurado: os templates só foram verificados.")
+    tempos, erros = precompilar(current_app)
+    for nome, erro in erros:
+        print(f"❌ {nome}: {erro}")
+    if erros:
+        raise SystemExit(1)
+    print(f"✅ {len(tempos)} templates compilados em {sum(ms for _, ms in tempos):.0f} ms.")
+
+@click.command("templates-bench")
+@with_appcontext
+@click.option("--repeticoes", default=5, show_default=True, help="Medições por template (vale a menor).")
+def templates_bench_command(repeticoes):
+    """Tempo de carga de cada template no primeiro uso: sem cache x com o bytecode."""
+    from template_cache import comparar
+    resultado = sorted(comparar(current_app, repeticoes), key=lambda item: item[1], reverse=True)
+    print(f"{'template':<42}{'sem cache':>12}{'bytecode':>12}")
+    for nome, sem, com in resultado:
+        print(f"{nome:<42}{sem:>9.2f} ms{com:>9.2f} ms")
+    total_sem, total_com = sum(r[1] for r in resultado), sum(r[2] for r in resultado)
+    print(f"{'total':<42}{total_sem:>9.1f} ms{total_com:>9.1f} ms  ({total_sem / max(total_com, 0.001):.0f}x)")
+
+
+@click.command("busca-rebuild")
+@with_appcontext
+def busca_rebuild_command():
+    """Cria o índice da busca de licitações, se faltar, e reindexa (FTS5 no SQLite, GIN no Postgres)."""
+    from busca import reconstruir
+    with db.engine.begin() as conexao:
+        if not reconstruir(conexao):
+            print(f"⚠️ Busca textual não suportada no banco {conexao.dialect.name}.")
+            raise SystemExit(1)
+    print("✅ Índice da busca de licitações reconstruído.")
+
+@click.command("coins-stress")
+@with_appcontext
+@click.option("--threads", default=8, show_default=True, help="Threads simultâneas, cada uma com sua sessão.")
+@click.option("--operacoes", default=200, show_default=True, help="Débitos/créditos por thread.")
+@click.option("--saldo-inicial", default=50, show_default=True, help="Coins da empresa temporária no início.")
+@click.option("--ingenuo", is_flag=True, help="Usa o ler-calcular-gravar antigo, para comparar.")
+@click.option("--confirmar", is_flag=True, help="Roda mesmo num banco que não parece de teste.")
+def coins_stress_command(threads, operacoes, saldo_inicial, ingenuo, confirmar):
+    """Débitos e créditos concorrentes numa empresa temporária: o saldo tem de bater com o livro-razão."""
+    from coins import estressar, BancoNaoEhDeTeste
+    # kill (SIGTERM) também passa pela limpeza da empresa temporária, como o Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(1))
+    try:
+        r = estressar(threads=threads, operacoes=operacoes, saldo_inicial=saldo_inicial,
+                      ingenuo=ingenuo, confirmar=confirmar)
+    except BancoNaoEhDeTeste as e:
+        print(f"❌ {e} não parece um banco de teste: o teste de carga grava uma empresa e transações nele.")
+        print("   Use DATABASE_URL apontando para um banco de teste (SQLite ou nome com \"test\") ou --confirmar.")
+        raise SystemExit(1)
+    total = r["debitos"] + r["creditos"] + r["recusados"] + r["erros"]
+    print(f"{total} operações em {r['segundos']:.1f} s: {r['debitos']} débitos, {r['creditos']} créditos, "
+          f"{r['recusados']} recusados por saldo, {r['erros']} com erro.")
+    print(f"saldo_coins = {r['saldo']}, soma do livro-razão = {r['livro']}")
+    if r["saldo"] != r["livro"] or r["saldo"] < 0:
+        print("❌ Saldo diverge do livro-razão (ou ficou negativo).")
+        raise SystemExit(1)
+    print("✅ Saldo igual à soma do livro-razão.")
+
+
+COMANDOS = (
+    db_command,
+    outbox_worker_command,
+    outbox_stats_command,
+    logo_worker_command,
+    reputacao_rebuild_command,
+    contas_acesso_rebuild_command,
+    uploads_gc_command,
+    assets_build_command,
+    explain_consultas_command,
+    mp_webhook_worker_command,
+    mp_webhook_reprocessar_command,
+    create_tables_command,
+    startup_report_command,
+    templates_precompile_command,
+    templates_bench_command,
+    coins_stress_command,
+    busca_rebuild_command,
+)
+
+
+def registrar_comandos(app):
+    for comando in COMANDOS:
+        app.cli.add_command(comando)
@@ -2,9 +2,11 @@ import os
 from urllib.parse import quote, urlparse
 from dotenv import load_dotenv
 
-# Garantir que as variáveis de ambiente sejam carregadas, embora já esteja em app.py
+# Carrega o .env uma única vez, antes de ler as variáveis abaixo
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 class Config:
     # --- 1. CONFIGURAÇÕES DE APLICAÇÃO ---
     
@@ -47,7 +49,64 @@ class Config:
     MAIL_USERNAME_SENDER = os.getenv("MAIL_USERNAME_SENDER", "administrador@condblindado.com.br") 
     
     MAIL_SUPPRESS_SEND = os.getenv("MAIL_SUPPRESS_SEND", "False") == "True"
-    
+
+    # Fila de e-mails (outbox): o envio é feito pelo worker `flask outbox-worker`
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 20))
+    OUTBOX_MAX_TENTATIVAS = int(os.getenv("OUTBOX_MAX_TENTATIVAS", 6))
+    OUTBOX_BACKOFF_BASE = int(os.getenv("OUTBOX_BACKOFF_BASE", 30)) # segundos
+    OUTBOX_BACKOFF_MAX = int(os.getenv("OUTBOX_BACKOFF_MAX", 3600)) # segundos
+    OUTBOX_LEASE = int(os.getenv("OUTBOX_LEASE", 300)) # segundos
+    OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 5))
+
+    # Paginação das listagens (pagination.py)
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 24))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 100))
+
+    # Chat da licitação (views/mensagens.py): mensagens por página do histórico e intervalo do polling
+    MENSAGENS_POR_PAGINA = int(os.getenv("MENSAGENS_POR_PAGINA", 30))
+    MENSAGENS_POLL_INTERVALO = int(os.getenv("MENSAGENS_POLL_INTERVALO", 5)) # segundos
+    # Eventos ao vivo das licitações (eventos.py): "auto" liga o SSE só com workers gevent
+    SSE_HABILITADO = os.getenv("SSE_HABILITADO", "auto") # True, False ou auto
+    SSE_KEEPALIVE = int(os.getenv("SSE_KEEPALIVE", 15)) # segundos entre comentários de keep-alive
+    SSE_DURACAO_MAX = int(os.getenv("SSE_DURACAO_MAX", 1800)) # segundos; depois o navegador reconecta
+    SSE_FILA_MAX = int(os.getenv("SSE_FILA_MAX", 100)) # eventos por conexão antes de derrubar um cliente lento
+
+    # Logos das empresas (logos.py): limites do upload e worker `flask logo-worker`
+    LOGO_MAX_BYTES = int(os.getenv("LOGO_MAX_BYTES", 5 * 1024 * 1024))
+    LOGO_MAX_PIXELS = int(os.getenv("LOGO_MAX_PIXELS", 25_000_000)) # largura x altura
+    LOGO_BATCH_SIZE = int(os.getenv("LOGO_BATCH_SIZE", 10))
+    LOGO_LEASE = int(os.getenv("LOGO_LEASE", 300)) # segundos
+    LOGO_POLL_INTERVAL = float(os.getenv("LOGO_POLL_INTERVAL", 5))
+
+    # Uploads: pasta do armazenamento local (criada no primeiro upload) e tamanho máximo da requisição
+    UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", os.path.join(BASE_DIR, "uploads"))
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_MB", 16)) * 1024 * 1024
+
+    # Entrega de /uploads (uploads.py). Os nomes têm uuid, então o cache pode ser longo.
+    UPLOAD_CACHE_MAX_AGE = int(os.getenv("UPLOAD_CACHE_MAX_AGE", 31536000)) # 1 ano
+    # Ex.: "/_uploads/" para o nginx enviar os arquivos (X-Accel-Redirect); vazio = Flask envia
+    UPLOAD_X_ACCEL_PREFIX = os.getenv("UPLOAD_X_ACCEL_PREFIX", "")
+
+    # Armazenamento dos uploads (storage.py): "local" (UPLOAD_FOLDER) ou "s3" (S3, MinIO, R2...)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+    S3_BUCKET = os.getenv("S3_BUCKET", "")
+    S3_PREFIX = os.getenv("S3_PREFIX", "")
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "") # Vazio = AWS; ex.: http://127.0.0.1:9000 para MinIO
+    S3_REGION = os.getenv("S3_REGION", "")
+    S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY", "")
+    S3_SECRET_KEY = os.getenv("S3_SECRET_KEY", "")
+    S3_PRESIGN_EXPIRES = int(os.getenv("S3_PRESIGN_EXPIRES", 3600)) # segundos
+
+    # Cache das páginas públicas (page_cache.py), esvaziado a cada commit que muda condomínios/empresas/avaliações
+    PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "True") == "True"
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", 60)) # segundos
+    PAGE_CACHE_MAX_ITENS = int(os.getenv("PAGE_CACHE_MAX_ITENS", 256))
+
+    # Templates (template_cache.py): bytecode compilado em disco, compartilhado pelos workers; vazio = desativado
+    JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(BASE_DIR, "instance", "jinja_cache"))
+    # Reler do disco os templates alterados só em debug (None = segue o modo debug)
+    TEMPLATES_AUTO_RELOAD = None
+
     # --- 4. CREDENCIAIS FINAIS DO ADMINISTRADOR ---
     
     # Lidas do ambiente do Render/OS
@@ -65,6 +124,22 @@ class Config:
     MP_ACCESS_TOKEN = os.getenv("MP_ACCESS_TOKEN", "TEST-...") 
     # Token de verificação do Webhook (opcional, mas recomendado para segurança)
     MP_WEBHOOK_SECRET = os.getenv("MP_WEBHOOK_SECRET", "")
+    # Cliente HTTP compartilhado (mp_client.py): timeouts, pool e circuit breaker
+    # MP_API_BASE_URL pode apontar para o stub local (mp_stub.py) em testes de carga
+    MP_API_BASE_URL = os.getenv("MP_API_BASE_URL", "https://api.mercadopago.com")
+    MP_CONNECT_TIMEOUT = float(os.getenv("MP_CONNECT_TIMEOUT", 3)) # segundos
+    MP_READ_TIMEOUT = float(os.getenv("MP_READ_TIMEOUT", 10)) # segundos
+    MP_POOL_SIZE = int(os.getenv("MP_POOL_SIZE", 10))
+    MP_MAX_RETRIES = int(os.getenv("MP_MAX_RETRIES", 2))
+    MP_CB_LIMITE_FALHAS = int(os.getenv("MP_CB_LIMITE_FALHAS", 5))
+    MP_CB_TEMPO_ABERTO = float(os.getenv("MP_CB_TEMPO_ABERTO", 30)) # segundos
+    # Fila de notificações do webhook, processada por `flask mp-webhook-worker`
+    MP_WEBHOOK_BATCH_SIZE = int(os.getenv("MP_WEBHOOK_BATCH_SIZE", 20))
+    MP_WEBHOOK_MAX_TENTATIVAS = int(os.getenv("MP_WEBHOOK_MAX_TENTATIVAS", 8))
+    MP_WEBHOOK_BACKOFF_BASE = int(os.getenv("MP_WEBHOOK_BACKOFF_BASE", 15)) # segundos
+    MP_WEBHOOK_BACKOFF_MAX = int(os.getenv("MP_WEBHOOK_BACKOFF_MAX", 3600)) # segundos
+    MP_WEBHOOK_LEASE = int(os.getenv("MP_WEBHOOK_LEASE", 300)) # segundos
+    MP_WEBHOOK_POLL_INTERVAL = float(os.getenv("MP_WEBHOOK_POLL_INTERVAL", 2))
         
         # URL Base da aplicação para gerar links externos
     BASE_URL = os.getenv("BASE_URL", "http://127.0.0.1:5000")    
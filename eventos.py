@@ -0,0 +1,293 @@
+"""
+Eventos ao vivo das licitações, entregues por Server-Sent Events.
+
+    GET /licitacao/<id>/eventos      (views/eventos.py)
+
+A página de detalhe da licitação abre um EventSource e fica sabendo, sem
+recarregar, de cada nova candidatura (só o condomínio) e de cada nova
+mensagem do canal. Os eventos são deltas pequenos (tipo e ids); o conteúdo
+vem pelos endpoints que já existem, como o chat com ?depois=<id>. Ao
+conectar (e a cada reconexão) o cliente recebe um evento `estado` com o
+total de candidaturas e a última mensagem, para se ressincronizar.
+
+De onde vêm os eventos: um hook de after_flush da Session anota as novas
+Candidatura e MensagemLicitacao (INSERTs feitos sem o ORM chamam
+`notificar`).
+- No Postgres, o próprio flush emite pg_notify no canal
+  `licitacao_eventos`. O NOTIFY só é entregue se a transação fizer
+  commit, e chega a todos os processos: cada worker mantém uma conexão
+  com LISTEN, aberta junto com a primeira conexão SSE do processo.
+- Nos outros bancos (SQLite em desenvolvimento) os eventos são publicados
+  no after_commit, e só para o próprio processo.
+
+Dentro do processo, o Barramento entrega cada evento às filas das conexões
+abertas para aquela licitação. Uma conexão parada custa uma fila e um
+gerador; nenhuma conexão do banco fica presa, porque a sessão é liberada
+antes do streaming. Para manter milhares de conexões abertas, os workers
+precisam ser do gevent:
+
+    gunicorn -k gevent --worker-connections 2000 wsgi:app
+
+Com workers síncronos, cada conexão SSE ocuparia um worker inteiro. Por isso
+o endpoint só fica ativo com SSE_HABILITADO=True ou, no padrão "auto",
+quando o processo roda sob o gevent. Desativado, ele responde 204 (o
+navegador não tenta de novo) e a página fica só com o polling do chat.
+"""
+import json
+import queue
+import select
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, has_app_context
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from models import db, Candidatura, MensagemLicitacao
+
+CANAL = "licitacao_eventos"
+RETRY_MS = 3000 # Espera do navegador antes de reconectar
+
+
+def sob_gevent():
+    if "gevent" not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched("socket")
+
+
+def eventos_ativos():
+    """Se o endpoint SSE está ligado (SSE_HABILITADO: True, False ou auto)."""
+    config = current_app.config["SSE_HABILITADO"]
+    if config == "auto":
+        return sob_gevent()
+    return config == "True"
+
+
+def _evento(obj):
+    if isinstance(obj, Candidatura):
+        return {"tipo": "candidatura", "licitacao_id": obj.licitacao_id, "id": obj.id}
+    if isinstance(obj, MensagemLicitacao):
+        return {"tipo": "mensagem", "licitacao_id": obj.licitacao_id, "id": obj.id,
+                "remetente_tipo": obj.remetente_tipo}
+    return None
+
+
+def formatar(evento):
+    """Evento no formato text/event-stream."""
+    return f"event: {evento['tipo']}\ndata: {json.dumps(evento, separators=(',', ':'))}\n\n"
+
+
+# --- Barramento em memória ---------------------------------------------------
+
+class Assinatura:
+    __slots__ = ("licitacao_id", "tipos", "fila")
+
+    def __init__(self, licitacao_id, tipos, tamanho_fila):
+        self.licitacao_id = licitacao_id
+        self.tipos = tipos
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+
+
+class Barramento:
+    """Pub/sub por licitação entre as conexões SSE do processo."""
+
+    def __init__(self, tamanho_fila):
+        self.tamanho_fila = tamanho_fila
+        self._assinaturas = defaultdict(set)
+        self._lock = threading.Lock()
+        self._ouvinte = None
+
+    def assinar(self, licitacao_id, tipos):
+        assinatura = Assinatura(licitacao_id, frozenset(tipos), self.tamanho_fila)
+        with self._lock:
+            self._assinaturas[licitacao_id].add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura):
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.licitacao_id)
+            if assinaturas is not None:
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    del self._assinaturas[assinatura.licitacao_id]
+
+    def publicar(self, evento):
+        with self._lock:
+            alvos = list(self._assinaturas.get(evento["licitacao_id"], ()))
+        for assinatura in alvos:
+            if evento["tipo"] in assinatura.tipos:
+                self._entregar(assinatura, evento)
+
+    def reconectar_todas(self):
+        """Encerra todas as conexões; os clientes reconectam e recebem o `estado` de novo."""
+        with self._lock:
+            alvos = [a for assinaturas in self._assinaturas.values() for a in assinaturas]
+        for assinatura in alvos:
+            self._entregar(assinatura, None)
+
+    def _entregar(self, assinatura, evento):
+        try:
+            assinatura.fila.put_nowait(evento)
+        except queue.Full:
+            # Cliente atrasado: descarta o que acumulou e encerra a conexão (None)
+            try:
+                while True:
+                    assinatura.fila.get_nowait()
+            except queue.Empty:
+                pass
+            assinatura.fila.put_nowait(None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "licitacoes": len(self._assinaturas),
+                "conexoes": sum(len(a) for a in self._assinaturas.values()),
+                "ouvinte_postgres": self._ouvinte is not None and self._ouvinte.is_alive(),
+            }
+
+    # --- LISTEN (Postgres) ---
+
+    def iniciar_ouvinte(self, engine, logger):
+        with self._lock:
+            if self._ouvinte is not None and self._ouvinte.is_alive():
+                return
+            self._ouvinte = threading.Thread(target=self._ouvir, args=(engine, logger),
+                                             name="licitacao-eventos", daemon=True)
+            self._ouvinte.start()
+
+    def _ouvir(self, engine, logger):
+        espera, reconexao = 1, False
+        while True:
+            dbapi = None
+            try:
+                conexao = engine.raw_connection()
+                dbapi = conexao.driver_connection
+                conexao.detach() # Conexão dedicada, fora do pool
+                dbapi.autocommit = True
+                dbapi.cursor().execute(f"LISTEN {CANAL}")
+                logger.info(f"Eventos das licitações: escutando o canal {CANAL}.")
+                if reconexao:
+                    # Eventos enviados enquanto estava desconectado se perderam
+                    self.reconectar_todas()
+                espera, reconexao = 1, True
+                for payload in _notificacoes(dbapi):
+                    self.publicar(json.loads(payload))
+            except Exception as e:
+                logger.error(f"Eventos das licitações: LISTEN falhou ({e}); nova tentativa em {espera}s.")
+            finally:
+                if dbapi is not None:
+                    try:
+                        dbapi.close()
+                    except Exception:
+                        pass
+            time.sleep(espera)
+            espera = min(espera * 2, 60)
+
+
+def _notificacoes(dbapi, intervalo=30):
+    """Payloads dos NOTIFY recebidos, com psycopg2 ou psycopg 3; um SELECT 1 a cada `intervalo` parado."""
+    if callable(getattr(dbapi, "notifies", None)): # psycopg 3
+        while True:
+            for notificacao in dbapi.notifies(timeout=intervalo):
+                yield notificacao.payload
+            dbapi.execute("SELECT 1") # Detecta conexão caída
+    cursor = dbapi.cursor()
+    while True:
+        if select.select([dbapi], [], [], intervalo) == ([], [], []):
+            cursor.execute("SELECT 1")
+            continue
+        dbapi.poll()
+        while dbapi.notifies:
+            yield dbapi.notifies.pop(0).payload
+
+
+def get_barramento():
+    """Barramento do processo (criado uma vez por app); no Postgres, liga o LISTEN."""
+    barramento = current_app.extensions.get("eventos")
+    if barramento is None:
+        barramento = Barramento(current_app.config["SSE_FILA_MAX"])
+        current_app.extensions["eventos"] = barramento
+    if db.engine.dialect.name == "postgresql":
+        barramento.iniciar_ouvinte(db.engine, current_app.logger)
+    return barramento
+
+
+def transmitir(barramento, assinatura, estado, keepalive, duracao):
+    """
+    Gerador do text/event-stream: o `estado` inicial, os eventos da fila e
+    um comentário a cada `keepalive` segundos. Encerra após `duracao`
+    segundos (o navegador reconecta sozinho).
+    """
+    limite = time.monotonic() + duracao
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        yield formatar(estado)
+        while time.monotonic() < limite:
+            try:
+                evento = assinatura.fila.get(timeout=keepalive)
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            if evento is None:
+                return
+            yield formatar(evento)
+    finally:
+        barramento.cancelar(assinatura)
+
+
+# --- Origem dos eventos ------------------------------------------------------
+
+def notificar(session, eventos):
+    """
+    Agenda eventos para quando a transação da `session` fizer commit. O
+    after_flush já chama isto para os objetos novos; INSERTs feitos sem o
+    ORM (como Candidatura.inscrever) chamam direto.
+    """
+    conexao = session.connection()
+    if conexao.dialect.name == "postgresql":
+        # Entregue a todos os processos só se a transação fizer commit
+        for evento in eventos:
+            conexao.execute(text("SELECT pg_notify(:canal, :dados)"),
+                            {"canal": CANAL, "dados": json.dumps(evento, separators=(',', ':'))})
+    else:
+        session.info.setdefault("eventos_pendentes", []).extend(eventos)
+
+
+@db.event.listens_for(Session, "after_flush")
+def _coletar(session, flush_context):
+    eventos = [e for e in map(_evento, session.new) if e is not None]
+    if eventos:
+        notificar(session, eventos)
+
+
+@db.event.listens_for(Session, "after_commit")
+def _publicar(session):
+    eventos = session.info.pop("eventos_pendentes", None)
+    if eventos and has_app_context():
+        barramento = current_app.extensions.get("eventos")
+        if barramento is not None:
+            for evento in eventos:
+                barramento.publicar(evento)
+
+
+@db.event.listens_for(Session, "after_soft_rollback")
+def _descartar(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop("eventos_pendentes", None)
+
+
+def init_eventos(app):
+    app.add_template_global(eventos_ativos)
+    driver = make_url(app.config["SQLALCHEMY_DATABASE_URI"]).get_driver_name()
+    if sob_gevent() and driver == "psycopg2":
+        # Com o gevent, o psycopg2 precisa ceder o loop enquanto espera o banco (o psycopg 3 já cede)
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            app.logger.warning("psycogreen não instalado: consultas ao Postgres vão bloquear o worker gevent.")
+        else:
+            patch_psycopg()
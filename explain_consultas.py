@@ -0,0 +1,144 @@
+"""
+Planos de execução (EXPLAIN) das consultas quentes das rotas (views/).
+
+    flask explain-consultas --salvar antes.json     # antes de `flask db upgrade`
+    flask db upgrade
+    flask explain-consultas --comparar antes.json   # mostra antes x depois
+
+Cada consulta aqui reproduz o formato usado na rota correspondente (filtro,
+ordenação e LIMIT da paginação), com valores de exemplo tirados do próprio
+banco quando existem. No Postgres usa EXPLAIN (ou EXPLAIN ANALYZE com
+--analyze); no SQLite, EXPLAIN QUERY PLAN.
+"""
+import json
+
+from busca import consulta_busca
+from models import db, Condominio, Empresa, Licitacao, Candidatura, TransacaoCoin, TransacaoPlano, \
+    Contato, MensagemLicitacao
+
+LIMITE_PAGINA = 25
+
+
+def _exemplo(coluna, padrao):
+    valor = db.session.query(coluna).filter(coluna.isnot(None)).limit(1).scalar()
+    return valor if valor is not None else padrao
+
+
+def _busca(nome, termos):
+    busca = consulta_busca(termos)
+    if busca is None:
+        return []
+    query, rank, _ = busca
+    return [(nome, query.order_by(rank.desc(), Licitacao.id.desc()).limit(LIMITE_PAGINA))]
+
+
+def consultas_quentes():
+    """Lista de (nome, consulta) no formato das rotas."""
+    email_cond = _exemplo(Condominio.email, "gestor@exemplo.com")
+    email_emp = _exemplo(Empresa.email_comercial, "contato@exemplo.com")
+    condominio_id = _exemplo(Licitacao.condominio_id, 1)
+    licitacao_id = _exemplo(Candidatura.licitacao_id, 1)
+    empresa_id = _exemplo(Candidatura.empresa_id, 1)
+    payment_id = _exemplo(TransacaoCoin.payment_id, "123456789")
+
+    return [
+        ("login: condomínio por e-mail",
+         Condominio.query.filter_by(email=email_cond).limit(1)),
+        ("login: empresa por e-mail",
+         Empresa.query.filter_by(email_comercial=email_emp).limit(1)),
+        ("index: últimos condomínios aprovados",
+         Condominio.query.filter_by(status="aprovado").order_by(Condominio.created_at.desc()).limit(8)),
+        ("admin: pendentes (contagem)",
+         db.session.query(db.func.count(Empresa.id)).filter(Empresa.status.in_(["pendente", "verificado"]))),
+        ("admin: condomínios por status",
+         Condominio.query.filter(Condominio.status.in_(["pendente", "verificado"]))
+         .order_by(Condominio.created_at.desc(), Condominio.id.desc()).limit(LIMITE_PAGINA)),
+        ("admin: empresas aprovadas",
+         Empresa.query.filter(Empresa.status == "aprovado")
+         .order_by(Empresa.created_at.desc(), Empresa.id.desc()).limit(LIMITE_PAGINA)),
+        ("admin: todos os gestores",
+         Condominio.query.order_by(Condominio.created_at.desc(), Condominio.id.desc()).limit(LIMITE_PAGINA)),
+        ("certificados: condomínios aprovados por nome",
+         Condominio.query.filter_by(status="aprovado").order_by(Condominio.nome, Condominio.id).limit(LIMITE_PAGINA)),
+        ("parceiras: empresas aprovadas por nome",
+         Empresa.query.filter_by(status="aprovado").order_by(Empresa.nome, Empresa.id).limit(LIMITE_PAGINA)),
+        ("licitações abertas",
+         Licitacao.query.filter_by(status="aberta")
+         .order_by(Licitacao.created_at.desc(), Licitacao.id.desc()).limit(LIMITE_PAGINA)),
+        *_busca("busca de licitações (?q=)", "manutenção"),
+        ("licitações do condomínio",
+         Licitacao.query.filter(Licitacao.condominio_id == condominio_id)
+         .order_by(Licitacao.created_at.desc(), Licitacao.id.desc()).limit(LIMITE_PAGINA)),
+        ("candidatura: já se candidatou?",
+         Candidatura.query.filter_by(licitacao_id=licitacao_id, empresa_id=empresa_id).limit(1)),
+        ("candidaturas da empresa",
+         Candidatura.query.join(Licitacao).filter(Candidatura.empresa_id == empresa_id)
+         .order_by(Licitacao.created_at.desc())),
+        ("webhook: transação de coins pelo payment_id",
+         TransacaoCoin.query.filter_by(payment_id=str(payment_id)).limit(1)),
+        ("webhook: transação de plano pelo payment_id",
+         TransacaoPlano.query.filter_by(payment_id=str(payment_id)).limit(1)),
+        ("chat da licitação: polling (?depois=<id>)",
+         MensagemLicitacao.query.filter(MensagemLicitacao.licitacao_id == licitacao_id, MensagemLicitacao.id > 0)
+         .order_by(MensagemLicitacao.id.asc()).limit(LIMITE_PAGINA)),
+        ("chat da licitação: últimas mensagens / histórico (?antes=<id>)",
+         MensagemLicitacao.query.filter_by(licitacao_id=licitacao_id)
+         .order_by(MensagemLicitacao.id.desc()).limit(LIMITE_PAGINA)),
+        ("admin: contatos",
+         Contato.query.order_by(Contato.created_at.desc(), Contato.id.desc()).limit(LIMITE_PAGINA)),
+    ]
+
+
+def explain(query, analyze=False):
+    """Devolve o plano da consulta como lista de linhas de texto."""
+    conn = db.session.connection()
+    dialect = conn.dialect
+    compiled = query.statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    if compiled.positional:
+        params = tuple(compiled.params[nome] for nome in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    if dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).all()
+        # (id, parent, notused, detail): indenta pelo nível da árvore
+        niveis = {0: -1}
+        linhas = []
+        for id_, parent, _, detail in rows:
+            niveis[id_] = niveis.get(parent, -1) + 1
+            linhas.append("  " * niveis[id_] + detail)
+        return linhas
+
+    prefixo = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    return [row[0] for row in conn.exec_driver_sql(prefixo + str(compiled), params)]
+
+
+def coletar_planos(analyze=False):
+    planos = {}
+    for nome, query in consultas_quentes():
+        planos[nome] = explain(query, analyze=analyze)
+    db.session.rollback()
+    return planos
+
+
+def imprimir_planos(planos, anteriores=None):
+    for nome, linhas in planos.items():
+        print(f"=== {nome}")
+        if anteriores is not None:
+            print("--- antes")
+            for linha in anteriores.get(nome, ["(sem plano salvo)"]):
+                print(f"    {linha}")
+            print("--- depois")
+        for linha in linhas:
+            print(f"    {linha}")
+        print()
+
+
+def salvar_planos(planos, caminho):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(planos, f, ensure_ascii=False, indent=2)
+
+
+def carregar_planos(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
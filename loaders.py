@@ -0,0 +1,30 @@
+"""
+Perfis de carregamento (eager loading) usados pelas consultas das telas.
+
+Cada perfil é uma tupla de opções do SQLAlchemy para `query.options(*PERFIL)`
+e carrega de uma vez os relacionamentos que o template correspondente
+percorre, evitando uma consulta extra por linha (N+1).
+"""
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+
+from models import Candidatura, Licitacao
+
+# Cards / linhas de licitação que mostram dados do condomínio
+# (lista_licitacoes.html, admin_licitacoes.html, detalhe_licitacao.html, empresa_detalhe_licitacao.html)
+LICITACAO_COM_CONDOMINIO = (
+    joinedload(Licitacao.condominio),
+)
+
+# Tela do condomínio com os candidatos, a vencedora e a avaliação
+# (condominio_detalhe_licitacao.html)
+LICITACAO_COM_CANDIDATOS = (
+    selectinload(Licitacao.candidaturas).joinedload(Candidatura.empresa),
+    joinedload(Licitacao.empresa_vencedora),
+    joinedload(Licitacao.avaliacao),
+)
+
+# Candidaturas da empresa com licitação e condomínio (empresa_candidaturas.html).
+# A consulta precisa já ter `.join(Licitacao)`: o join é reaproveitado.
+CANDIDATURA_COM_LICITACAO = (
+    contains_eager(Candidatura.licitacao).joinedload(Licitacao.condominio),
+)
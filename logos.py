@@ -0,0 +1,160 @@
+"""
+Processamento das logos das empresas em segundo plano.
+
+A rota só confere o cabeçalho da imagem (formato e dimensões, sem
+decodificar), grava o arquivo original como veio e marca a empresa com
+`logo_status = "pendente"`. O worker (`flask logo-worker`) decodifica,
+corrige a orientação e gera as variantes WebP e PNG em 32, 64 e 200 px,
+registrando-as em `Empresa.logo_variantes`.
+
+Imagens acima de LOGO_MAX_PIXELS são recusadas antes de qualquer
+decodificação (proteção contra "decompression bombs").
+"""
+import io
+import json
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from PIL import Image, ImageOps
+
+from models import db, Empresa
+from storage import get_storage, salvar_conteudo, ArquivoNaoEncontrado
+
+TAMANHOS = (32, 64, 200)
+FORMATOS_ACEITOS = {"PNG", "JPEG"}
+
+
+class LogoInvalida(Exception):
+    """Arquivo recusado: não é PNG/JPEG, é grande demais ou está corrompido."""
+
+
+def _abrir_cabecalho(dados):
+    """Abre a imagem lendo só o cabeçalho e valida formato e número de pixels."""
+    try:
+        img = Image.open(io.BytesIO(dados))
+    except (Image.UnidentifiedImageError, OSError) as e:
+        raise LogoInvalida("Arquivo não é uma imagem válida.") from e
+    if img.format not in FORMATOS_ACEITOS:
+        raise LogoInvalida("Envie uma imagem PNG ou JPEG.")
+    largura, altura = img.size
+    if largura * altura > current_app.config["LOGO_MAX_PIXELS"]:
+        raise LogoInvalida(f"Imagem grande demais ({largura}x{altura} pixels).")
+    return img
+
+
+def receber_logo(empresa, arquivo):
+    """
+    Valida e grava o upload original e agenda o processamento.
+    O commit fica a cargo de quem chamou. Levanta LogoInvalida.
+    """
+    limite = current_app.config["LOGO_MAX_BYTES"]
+    dados = arquivo.read(limite + 1)
+    if len(dados) > limite:
+        raise LogoInvalida(f"A logo deve ter no máximo {limite // (1024 * 1024)} MB.")
+    img = _abrir_cabecalho(dados)
+
+    extensao = "png" if img.format == "PNG" else "jpg"
+    empresa.logo_original = salvar_conteudo(io.BytesIO(dados), "logos", extensao, content_type=img.get_format_mimetype())
+    empresa.logo_status = "pendente"
+    empresa.logo_status_em = datetime.utcnow()
+
+
+def gerar_variantes(empresa):
+    """Gera as variantes a partir de `logo_original` e as registra na empresa."""
+    with get_storage().open(empresa.logo_original) as original:
+        img = _abrir_cabecalho(original.read())
+    if img.format == "JPEG":
+        # Decodifica o JPEG já reduzido (escala 1/2, 1/4, 1/8): bem mais barato
+        img.draft("RGB", (max(TAMANHOS), max(TAMANHOS)))
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("RGBA") if img.mode in ("P", "LA", "RGBA") else img.convert("RGB")
+
+    variantes = {}
+    for tamanho in sorted(TAMANHOS, reverse=True):
+        # Reduz a partir da variante anterior (já menor) em vez do original
+        img.thumbnail((tamanho, tamanho), Image.LANCZOS)
+        variantes[str(tamanho)] = {}
+        for formato, extensao, opcoes in (("WEBP", "webp", {"quality": 85, "method": 4}),
+                                          ("PNG", "png", {"optimize": True})):
+            buffer = io.BytesIO()
+            img.save(buffer, formato, **opcoes)
+            buffer.seek(0)
+            # Endereçadas pelo conteúdo: reenviar a mesma logo não grava nada de novo
+            variantes[str(tamanho)][extensao] = salvar_conteudo(buffer, "logos", extensao,
+                                                                 content_type=f"image/{extensao}")
+
+    empresa.logo_variantes = json.dumps(variantes)
+    empresa.logo_filename = variantes[str(max(TAMANHOS))]["png"]
+    empresa.logo_status = "pronto"
+    empresa.logo_status_em = datetime.utcnow()
+
+
+def claim_batch(limit):
+    """
+    Reserva até `limit` empresas com logo pendente (FOR UPDATE SKIP LOCKED no
+    Postgres). Reservas mais antigas que LOGO_LEASE segundos voltam a valer.
+    """
+    now = datetime.utcnow()
+    expirado = now - timedelta(seconds=current_app.config["LOGO_LEASE"])
+    empresas = (
+        Empresa.query
+        .filter(db.or_(Empresa.logo_status == "pendente",
+                       db.and_(Empresa.logo_status == "processando", Empresa.logo_status_em < expirado)))
+        .order_by(Empresa.logo_status_em, Empresa.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for empresa in empresas:
+        empresa.logo_status = "processando"
+        empresa.logo_status_em = now
+    db.session.commit()
+    return [empresa.id for empresa in empresas]
+
+
+def process_logo(empresa_id):
+    empresa = db.session.get(Empresa, empresa_id)
+    if empresa is None or empresa.logo_status != "processando" or not empresa.logo_original:
+        return
+    try:
+        gerar_variantes(empresa)
+        current_app.logger.info(f"Logo da empresa #{empresa.id} processada.")
+    except (LogoInvalida, ArquivoNaoEncontrado, OSError, Image.DecompressionBombError) as e:
+        # Erro do arquivo, não transitório: não adianta tentar de novo
+        empresa.logo_status = "falhou"
+        empresa.logo_status_em = datetime.utcnow()
+        current_app.logger.warning(f"Logo da empresa #{empresa.id} recusada: {e}")
+    db.session.commit()
+
+
+def drain_logos():
+    """Processa as logos pendentes. Retorna quantas foram processadas."""
+    batch_size = current_app.config["LOGO_BATCH_SIZE"]
+    processados = 0
+    ids = claim_batch(batch_size)
+    while ids:
+        for empresa_id in ids:
+            process_logo(empresa_id)
+        processados += len(ids)
+        ids = claim_batch(batch_size)
+    return processados
+
+
+def run_logo_worker(once=False):
+    """Loop do worker: processa as logos e dorme LOGO_POLL_INTERVAL quando não há nada."""
+    intervalo = current_app.config["LOGO_POLL_INTERVAL"]
+    current_app.logger.info("Worker de logos iniciado.")
+    while True:
+        try:
+            processados = drain_logos()
+            if processados:
+                current_app.logger.info(f"Logos: {processados} processada(s).")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro no worker de logos: {e}", exc_info=True)
+        finally:
+            db.session.remove()
+        if once:
+            return
+        time.sleep(intervalo)
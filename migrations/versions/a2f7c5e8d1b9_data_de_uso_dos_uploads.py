@@ -0,0 +1,31 @@
+"""Data do último upload de cada conteúdo (arquivo_upload.updated_at)
+
+Revision ID: a2f7c5e8d1b9
+Revises: f8d1b4e6a9c3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2f7c5e8d1b9'
+down_revision = 'f8d1b4e6a9c3'
+branch_labels = None
+depends_on = None
+
+
+# O GC só apaga conteúdo sem referências cujo updated_at passou do período
+# de carência; um upload que reaproveita o conteúdo renova a data.
+def upgrade():
+    with op.batch_alter_table('arquivo_upload', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE arquivo_upload SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    with op.batch_alter_table('arquivo_upload', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('arquivo_upload', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
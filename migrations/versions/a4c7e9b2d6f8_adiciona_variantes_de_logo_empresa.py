@@ -0,0 +1,41 @@
+"""Adiciona logo_original, logo_status e logo_variantes em empresa
+
+Revision ID: a4c7e9b2d6f8
+Revises: f2b8d5e3a1c7
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e9b2d6f8'
+down_revision = 'f2b8d5e3a1c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('empresa', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('logo_original', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('logo_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('logo_status_em', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('logo_variantes', sa.Text(), nullable=True))
+        batch_op.create_index('ix_empresa_logo_status', ['logo_status', 'logo_status_em'], unique=False)
+
+    # Logos já enviadas entram na fila para ganhar as variantes
+    op.execute("""
+        UPDATE empresa
+        SET logo_original = logo_filename, logo_status = 'pendente', logo_status_em = CURRENT_TIMESTAMP
+        WHERE logo_filename IS NOT NULL
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('empresa', schema=None) as batch_op:
+        batch_op.drop_index('ix_empresa_logo_status')
+        batch_op.drop_column('logo_variantes')
+        batch_op.drop_column('logo_status_em')
+        batch_op.drop_column('logo_status')
+        batch_op.drop_column('logo_original')
@@ -0,0 +1,46 @@
+"""Troca o índice do chat da licitação para (licitacao_id, id)
+
+Revision ID: a8f3c6d2e9b1
+Revises: b9e1f4c6a2d5
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8f3c6d2e9b1'
+down_revision = 'b9e1f4c6a2d5'
+branch_labels = None
+depends_on = None
+
+
+# O polling (?depois=<id>) e o histórico (?antes=<id>) leem uma faixa de id
+# dentro da licitação; o índice antigo ordenava por created_at.
+NOVO = ('ix_mensagem_licitacao_licitacao_id', ['licitacao_id', 'id'])
+ANTIGO = ('ix_mensagem_licitacao_licitacao_created', ['licitacao_id', 'created_at'])
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _trocar(criar, apagar):
+    if _is_postgres():
+        # Cria o novo antes de apagar o antigo, sem bloquear escritas
+        with op.get_context().autocommit_block():
+            op.create_index(criar[0], 'mensagem_licitacao', criar[1],
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(apagar[0], table_name='mensagem_licitacao',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index(criar[0], 'mensagem_licitacao', criar[1])
+        op.drop_index(apagar[0], table_name='mensagem_licitacao')
+
+
+def upgrade():
+    _trocar(NOVO, ANTIGO)
+
+
+def downgrade():
+    _trocar(ANTIGO, NOVO)
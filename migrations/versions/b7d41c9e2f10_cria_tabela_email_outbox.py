@@ -0,0 +1,44 @@
+"""Cria tabela email_outbox para envio assíncrono de e-mails
+
+Revision ID: b7d41c9e2f10
+Revises: 3a3e3e4a2e8e
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41c9e2f10'
+down_revision = '3a3e3e4a2e8e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('email_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('assunto', sa.String(length=255), nullable=False),
+        sa.Column('remetente', sa.String(length=120), nullable=False),
+        sa.Column('destinatarios', sa.Text(), nullable=False),
+        sa.Column('corpo', sa.Text(), nullable=True),
+        sa.Column('corpo_html', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('tentativas', sa.Integer(), nullable=False),
+        sa.Column('proxima_tentativa_em', sa.DateTime(), nullable=False),
+        sa.Column('ultimo_erro', sa.Text(), nullable=True),
+        sa.Column('envio_ms', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('enviado_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_email_outbox_status_proxima', ['status', 'proxima_tentativa_em'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_email_outbox_status_proxima')
+
+    op.drop_table('email_outbox')
@@ -0,0 +1,39 @@
+"""Cria tabela arquivo_upload (uploads endereçados por conteúdo, com contagem de referências)
+
+Revision ID: b9e1f4c6a2d5
+Revises: a4c7e9b2d6f8
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e1f4c6a2d5'
+down_revision = 'a4c7e9b2d6f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('arquivo_upload',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chave', sa.String(length=255), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('tamanho', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('referencias', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('chave', name='uq_arquivo_upload_chave')
+    )
+    with op.batch_alter_table('arquivo_upload', schema=None) as batch_op:
+        batch_op.create_index('ix_arquivo_upload_sha256', ['sha256'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('arquivo_upload', schema=None) as batch_op:
+        batch_op.drop_index('ix_arquivo_upload_sha256')
+
+    op.drop_table('arquivo_upload')
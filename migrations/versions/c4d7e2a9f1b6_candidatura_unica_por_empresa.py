@@ -0,0 +1,60 @@
+"""Uma candidatura por empresa em cada licitação (índice único)
+
+Revision ID: c4d7e2a9f1b6
+Revises: a8f3c6d2e9b1
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e2a9f1b6'
+down_revision = 'a8f3c6d2e9b1'
+branch_labels = None
+depends_on = None
+
+
+# O INSERT ... ON CONFLICT DO NOTHING de Candidatura.inscrever depende do
+# índice único; ele substitui o índice comum nas mesmas colunas.
+UNICO = 'ux_candidatura_licitacao_empresa'
+COMUM = 'ix_candidatura_licitacao_empresa'
+COLUNAS = ['licitacao_id', 'empresa_id']
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _verificar_duplicadas():
+    # Candidaturas repetidas têm coins debitadas: não dá para apagar às cegas
+    duplicadas = op.get_bind().execute(sa.text(
+        "SELECT licitacao_id, empresa_id, COUNT(*) FROM candidatura "
+        "GROUP BY licitacao_id, empresa_id HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicadas:
+        pares = ", ".join(f"licitação {l} / empresa {e} ({n}x)" for l, e, n in duplicadas)
+        raise RuntimeError(f"Candidaturas duplicadas; resolva antes de migrar: {pares}")
+
+
+def _trocar(criar, apagar, unico):
+    if _is_postgres():
+        # Cria o novo antes de apagar o antigo, sem bloquear escritas
+        with op.get_context().autocommit_block():
+            op.create_index(criar, 'candidatura', COLUNAS, unique=unico,
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(apagar, table_name='candidatura',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index(criar, 'candidatura', COLUNAS, unique=unico)
+        op.drop_index(apagar, table_name='candidatura')
+
+
+def upgrade():
+    _verificar_duplicadas()
+    _trocar(UNICO, COMUM, unico=True)
+
+
+def downgrade():
+    _trocar(COMUM, UNICO, unico=False)
@@ -0,0 +1,58 @@
+"""Cria fila de notificações do Mercado Pago e tabela de dead-letter
+
+Revision ID: c5e8a1f3d2b4
+Revises: b7d41c9e2f10
+Create Date: 2026-10-16 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a1f3d2b4'
+down_revision = 'b7d41c9e2f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mp_notificacao',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topico', sa.String(length=30), nullable=False),
+        sa.Column('recurso_id', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('status_mp', sa.String(length=30), nullable=True),
+        sa.Column('tentativas', sa.Integer(), nullable=False),
+        sa.Column('proxima_tentativa_em', sa.DateTime(), nullable=False),
+        sa.Column('ultimo_erro', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('recebido_em', sa.DateTime(), nullable=False),
+        sa.Column('processado_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('topico', 'recurso_id', name='uq_mp_notificacao_topico_recurso')
+    )
+    with op.batch_alter_table('mp_notificacao', schema=None) as batch_op:
+        batch_op.create_index('ix_mp_notificacao_status_proxima', ['status', 'proxima_tentativa_em'], unique=False)
+
+    op.create_table('mp_notificacao_falha',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('notificacao_id', sa.Integer(), nullable=False),
+        sa.Column('topico', sa.String(length=30), nullable=False),
+        sa.Column('recurso_id', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('tentativas', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['notificacao_id'], ['mp_notificacao.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('mp_notificacao_falha')
+    with op.batch_alter_table('mp_notificacao', schema=None) as batch_op:
+        batch_op.drop_index('ix_mp_notificacao_status_proxima')
+
+    op.drop_table('mp_notificacao')
@@ -0,0 +1,39 @@
+"""Adiciona contadores de reputação (rating_avg, rating_count, service_count) em empresa
+
+Revision ID: d3f9b6a7c8e1
+Revises: c5e8a1f3d2b4
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f9b6a7c8e1'
+down_revision = 'c5e8a1f3d2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('empresa', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_avg', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('service_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Preenche os contadores com os dados existentes
+    op.execute("""
+        UPDATE empresa SET
+            rating_count = (SELECT COUNT(*) FROM avaliacao a WHERE a.empresa_id = empresa.id),
+            rating_avg = COALESCE((SELECT AVG(a.rating) FROM avaliacao a WHERE a.empresa_id = empresa.id), 0),
+            service_count = (SELECT COUNT(*) FROM licitacao l
+                             WHERE l.empresa_vencedora_id = empresa.id AND l.status = 'concluida')
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('empresa', schema=None) as batch_op:
+        batch_op.drop_column('service_count')
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_avg')
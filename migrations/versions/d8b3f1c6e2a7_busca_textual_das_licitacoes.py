@@ -0,0 +1,78 @@
+"""Busca textual das licitações (tsvector + GIN no Postgres, FTS5 no SQLite)
+
+Revision ID: d8b3f1c6e2a7
+Revises: c4d7e2a9f1b6
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b3f1c6e2a7'
+down_revision = 'c4d7e2a9f1b6'
+branch_labels = None
+depends_on = None
+
+
+# Mesmo DDL de busca.py (a migração não importa a aplicação)
+COM_ACENTO = "áàâãäåéèêëíìîïóòôõöúùûüçñÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑ"
+SEM_ACENTO = "aaaaaaeeeeiiiiooooouuuucnAAAAAAEEEEIIIIOOOOOUUUUCN"
+
+
+def _vetor(campo, peso):
+    return (f"setweight(to_tsvector('portuguese', "
+            f"translate(coalesce({campo}, ''), '{COM_ACENTO}', '{SEM_ACENTO}')), '{peso}')")
+
+
+COLUNA_POSTGRES = (
+    "ALTER TABLE licitacao ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS ("
+    f"{_vetor('titulo', 'A')} || {_vetor('tipo_servico', 'B')} || {_vetor('descricao', 'C')}) STORED"
+)
+
+SQLITE = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS licitacao_busca USING fts5(
+        titulo, tipo_servico, descricao,
+        content='licitacao', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS licitacao_busca_ai AFTER INSERT ON licitacao BEGIN
+        INSERT INTO licitacao_busca(rowid, titulo, tipo_servico, descricao)
+        VALUES (new.id, new.titulo, new.tipo_servico, new.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS licitacao_busca_ad AFTER DELETE ON licitacao BEGIN
+        INSERT INTO licitacao_busca(licitacao_busca, rowid, titulo, tipo_servico, descricao)
+        VALUES ('delete', old.id, old.titulo, old.tipo_servico, old.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS licitacao_busca_au AFTER UPDATE OF titulo, tipo_servico, descricao ON licitacao BEGIN
+        INSERT INTO licitacao_busca(licitacao_busca, rowid, titulo, tipo_servico, descricao)
+        VALUES ('delete', old.id, old.titulo, old.tipo_servico, old.descricao);
+        INSERT INTO licitacao_busca(rowid, titulo, tipo_servico, descricao)
+        VALUES (new.id, new.titulo, new.tipo_servico, new.descricao);
+    END""",
+    # Indexa as licitações que já existem
+    "INSERT INTO licitacao_busca(licitacao_busca) VALUES ('rebuild')",
+)
+
+
+def upgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        # A coluna gerada reescreve a tabela uma vez; o índice é criado sem bloquear escritas
+        op.execute(COLUNA_POSTGRES)
+        with op.get_context().autocommit_block():
+            op.create_index('ix_licitacao_busca', 'licitacao', ['busca'], postgresql_using='gin',
+                            postgresql_concurrently=True, if_not_exists=True)
+    elif dialeto == 'sqlite':
+        for comando in SQLITE:
+            op.execute(comando)
+
+
+def downgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        op.drop_index('ix_licitacao_busca', table_name='licitacao', if_exists=True)
+        op.execute("ALTER TABLE licitacao DROP COLUMN IF EXISTS busca")
+    elif dialeto == 'sqlite':
+        for trigger in ('licitacao_busca_ai', 'licitacao_busca_ad', 'licitacao_busca_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS licitacao_busca")
@@ -0,0 +1,70 @@
+"""Um pagamento do Mercado Pago por transação de coins/plano (índices únicos)
+
+Revision ID: e3c9a7f1d5b2
+Revises: d8b3f1c6e2a7
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3c9a7f1d5b2'
+down_revision = 'd8b3f1c6e2a7'
+branch_labels = None
+depends_on = None
+
+
+# O worker do webhook grava a transação num savepoint e trata o
+# IntegrityError como "pagamento já aplicado"; isso depende dos índices
+# únicos, que substituem os índices comuns parciais em payment_id.
+# (tabela, índice único, índice comum)
+INDICES = [
+    ('transacao_coin', 'ux_transacao_coin_payment_id', 'ix_transacao_coin_payment_id'),
+    ('transacao_plano', 'ux_transacao_plano_payment_id', 'ix_transacao_plano_payment_id'),
+]
+CONDICAO = 'payment_id IS NOT NULL'
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _verificar_duplicados():
+    # Pagamento aplicado duas vezes já creditou em dobro: precisa de revisão manual
+    problemas = []
+    for tabela, _, _ in INDICES:
+        duplicados = op.get_bind().execute(sa.text(
+            f"SELECT payment_id, COUNT(*) FROM {tabela} WHERE {CONDICAO} "
+            "GROUP BY payment_id HAVING COUNT(*) > 1"
+        )).fetchall()
+        problemas += [f"{tabela} pagamento {p} ({n}x)" for p, n in duplicados]
+    if problemas:
+        raise RuntimeError(f"Pagamentos aplicados mais de uma vez; resolva antes de migrar: {', '.join(problemas)}")
+
+
+def _trocar(tabela, criar, apagar, unico):
+    if _is_postgres():
+        # Cria o novo antes de apagar o antigo, sem bloquear escritas
+        with op.get_context().autocommit_block():
+            op.create_index(criar, tabela, ['payment_id'], unique=unico,
+                            postgresql_where=sa.text(CONDICAO),
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(apagar, table_name=tabela,
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index(criar, tabela, ['payment_id'], unique=unico,
+                        sqlite_where=sa.text(CONDICAO))
+        op.drop_index(apagar, table_name=tabela)
+
+
+def upgrade():
+    _verificar_duplicados()
+    for tabela, unico, comum in INDICES:
+        _trocar(tabela, unico, comum, unico=True)
+
+
+def downgrade():
+    for tabela, unico, comum in INDICES:
+        _trocar(tabela, comum, unico, unico=False)
@@ -0,0 +1,85 @@
+"""Adiciona índices das consultas quentes (login, listagens, webhook, mensagens)
+
+Revision ID: e7a4c2d91b53
+Revises: d3f9b6a7c8e1
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a4c2d91b53'
+down_revision = 'd3f9b6a7c8e1'
+branch_labels = None
+depends_on = None
+
+
+# (nome, tabela, colunas, condição do índice parcial)
+# Cada índice segue o formato de uma consulta do app.py: filtro de igualdade
+# primeiro, depois a chave de ordenação/paginação (created_at, id) ou (nome, id).
+INDICES = [
+    # Login
+    ('ix_condominio_email', 'condominio', ['email'], None),
+    ('ix_empresa_email_comercial', 'empresa', ['email_comercial'], None),
+    # Listagens do admin por status, página inicial e contagem de pendentes
+    ('ix_condominio_status_created', 'condominio', ['status', 'created_at', 'id'], None),
+    ('ix_empresa_status_created', 'empresa', ['status', 'created_at', 'id'], None),
+    # Certificados e empresas parceiras: status = 'aprovado' ORDER BY nome, id
+    ('ix_condominio_status_nome', 'condominio', ['status', 'nome', 'id'], None),
+    ('ix_empresa_status_nome', 'empresa', ['status', 'nome', 'id'], None),
+    # Listagens sem filtro (todos os gestores, últimos cadastros, contatos)
+    ('ix_condominio_created', 'condominio', ['created_at', 'id'], None),
+    ('ix_empresa_created', 'empresa', ['created_at', 'id'], None),
+    ('ix_contato_created', 'contato', ['created_at', 'id'], None),
+    # Licitações abertas, do condomínio e do admin
+    ('ix_licitacao_status_created', 'licitacao', ['status', 'created_at', 'id'], None),
+    ('ix_licitacao_condominio_created', 'licitacao', ['condominio_id', 'created_at', 'id'], None),
+    ('ix_licitacao_created', 'licitacao', ['created_at', 'id'], None),
+    ('ix_licitacao_empresa_vencedora', 'licitacao', ['empresa_vencedora_id'], 'empresa_vencedora_id IS NOT NULL'),
+    # "Já se candidatou?" e candidaturas da empresa
+    ('ix_candidatura_licitacao_empresa', 'candidatura', ['licitacao_id', 'empresa_id'], None),
+    ('ix_candidatura_empresa', 'candidatura', ['empresa_id'], None),
+    # Idempotência do webhook do Mercado Pago
+    ('ix_transacao_coin_payment_id', 'transacao_coin', ['payment_id'], 'payment_id IS NOT NULL'),
+    ('ix_transacao_plano_payment_id', 'transacao_plano', ['payment_id'], 'payment_id IS NOT NULL'),
+    # Reputação (reputacao-rebuild) e chat da licitação
+    ('ix_avaliacao_empresa', 'avaliacao', ['empresa_id'], None),
+    ('ix_mensagem_licitacao_licitacao_created', 'mensagem_licitacao', ['licitacao_id', 'created_at'], None),
+]
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    if _is_postgres():
+        # CREATE INDEX CONCURRENTLY não bloqueia escritas, mas não pode rodar
+        # dentro de transação. IF NOT EXISTS permite repetir a migração se
+        # ela for interrompida no meio.
+        with op.get_context().autocommit_block():
+            for nome, tabela, colunas, condicao in INDICES:
+                op.create_index(
+                    nome, tabela, colunas,
+                    postgresql_concurrently=True,
+                    postgresql_where=sa.text(condicao) if condicao else None,
+                    if_not_exists=True,
+                )
+    else:
+        for nome, tabela, colunas, condicao in INDICES:
+            op.create_index(
+                nome, tabela, colunas,
+                sqlite_where=sa.text(condicao) if condicao else None,
+            )
+
+
+def downgrade():
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for nome, tabela, _, _ in reversed(INDICES):
+                op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
+    else:
+        for nome, tabela, _, _ in reversed(INDICES):
+            op.drop_index(nome, table_name=tabela)
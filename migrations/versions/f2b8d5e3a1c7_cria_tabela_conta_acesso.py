@@ -0,0 +1,73 @@
+"""Cria tabela conta_acesso (identidade de login unificada de condomínios e empresas)
+
+Revision ID: f2b8d5e3a1c7
+Revises: e7a4c2d91b53
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d5e3a1c7'
+down_revision = 'e7a4c2d91b53'
+branch_labels = None
+depends_on = None
+
+
+def _verificar_duplicados():
+    # Uma conta que ficasse de fora não conseguiria mais fazer login, e a
+    # próxima alteração nela esbarraria na restrição única: decida antes
+    duplicados = op.get_bind().execute(sa.text("""
+        SELECT email, COUNT(*) FROM (
+            SELECT LOWER(TRIM(email)) AS email FROM condominio
+            WHERE TRIM(COALESCE(email, '')) <> ''
+            UNION ALL
+            SELECT LOWER(TRIM(email_comercial)) FROM empresa
+            WHERE TRIM(COALESCE(email_comercial, '')) <> ''
+        ) contas
+        GROUP BY email HAVING COUNT(*) > 1
+    """)).fetchall()
+    if duplicados:
+        emails = ", ".join(f"{email} ({n}x)" for email, n in duplicados)
+        raise RuntimeError(f"E-mails de login repetidos entre condomínios e empresas; resolva antes de migrar: {emails}")
+
+
+def upgrade():
+    _verificar_duplicados()
+    op.create_table('conta_acesso',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email_normalizado', sa.String(length=100), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('password_hash', sa.String(length=256), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('needs_password_change', sa.Boolean(), nullable=False),
+        sa.Column('nome_exibicao', sa.String(length=200), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email_normalizado', name='uq_conta_acesso_email'),
+        sa.UniqueConstraint('tipo', 'usuario_id', name='uq_conta_acesso_tipo_usuario')
+    )
+
+    # Preenche com as contas existentes (sem e-mails repetidos, ver acima)
+    op.execute("""
+        INSERT INTO conta_acesso (email_normalizado, tipo, usuario_id, password_hash,
+                                  is_active, needs_password_change, nome_exibicao)
+        SELECT LOWER(TRIM(c.email)), 'condominio', c.id, c.password_hash,
+               c.is_active, COALESCE(c.needs_password_change, FALSE), c.contato_nome
+        FROM condominio c
+        WHERE TRIM(COALESCE(c.email, '')) <> ''
+    """)
+    op.execute("""
+        INSERT INTO conta_acesso (email_normalizado, tipo, usuario_id, password_hash,
+                                  is_active, needs_password_change, nome_exibicao)
+        SELECT LOWER(TRIM(e.email_comercial)), 'empresa', e.id, e.password_hash,
+               e.is_active, COALESCE(e.needs_password_change, FALSE), e.nome
+        FROM empresa e
+        WHERE TRIM(COALESCE(e.email_comercial, '')) <> ''
+    """)
+
+
+def downgrade():
+    op.drop_table('conta_acesso')
@@ -0,0 +1,60 @@
+"""created_at obrigatório nas tabelas paginadas por cursor
+
+Revision ID: f8d1b4e6a9c3
+Revises: e3c9a7f1d5b2
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8d1b4e6a9c3'
+down_revision = 'e3c9a7f1d5b2'
+branch_labels = None
+depends_on = None
+
+
+# A paginação por cursor compara (created_at, id) com a última linha vista;
+# com created_at NULL a comparação dá NULL e as páginas seguintes somem.
+TABELAS = ['condominio', 'empresa', 'licitacao', 'candidatura', 'contato']
+
+
+def _preencher(tabela):
+    # Linhas sem data vão para o fim da listagem (mais antigas que qualquer outra)
+    op.execute(
+        f"UPDATE {tabela} SET created_at = "
+        f"COALESCE((SELECT MIN(created_at) FROM {tabela}), CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
+
+
+def _alterar_sqlite(tabela, nullable):
+    # O batch do SQLite recria a tabela e perde os triggers (ex.: os da
+    # busca textual em licitacao); guarda o SQL deles e recria no fim
+    bind = op.get_bind()
+    gatilhos = [sql for (sql,) in bind.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :tabela"
+    ), {"tabela": tabela})]
+    with op.batch_alter_table(tabela) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=nullable)
+    for sql in gatilhos:
+        op.execute(sql)
+
+
+def upgrade():
+    for tabela in TABELAS:
+        _preencher(tabela)
+        if op.get_bind().dialect.name == 'sqlite':
+            _alterar_sqlite(tabela, nullable=False)
+        else:
+            op.alter_column(tabela, 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for tabela in TABELAS:
+        if op.get_bind().dialect.name == 'sqlite':
+            _alterar_sqlite(tabela, nullable=True)
+        else:
+            op.alter_column(tabela, 'created_at', existing_type=sa.DateTime(), nullable=True)
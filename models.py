@@ -1,4 +1,5 @@
 import enum
+import json
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import check_password_hash, generate_password_hash
@@ -33,11 +34,12 @@ class Condominio(db.Model):
     objetivo = db.Column(db.Text)
     observacoes = db.Column(db.Text)
     progress = db.Column(db.Integer, default=0)
-    pdf_filename = db.Column(db.String(300))
+    # active_history: o valor antigo é carregado ao trocar o arquivo, para a contagem de referências
+    pdf_filename = db.column_property(db.Column(db.String(300)), active_history=True)
     status = db.Column(db.String(20), default="pendente")
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     email_verified = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     password_hash = db.Column(db.String(256), nullable=True) 
@@ -54,6 +56,14 @@ class Condominio(db.Model):
 
     # Novo campo para o ranking
     rank = db.Column(ENUM(CondominioRank, name="condominiorank", schema="public"), nullable=True) # Rank assigned on approval
+
+    # Índices das consultas quentes (login, listagens do admin e página de certificados)
+    __table_args__ = (
+        db.Index('ix_condominio_email', 'email'),
+        db.Index('ix_condominio_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_condominio_status_nome', 'status', 'nome', 'id'),
+        db.Index('ix_condominio_created', 'created_at', 'id'),
+    )
     
     def set_password(self, password):
         """Hashea e salva a senha."""
@@ -103,12 +113,18 @@ class Empresa(db.Model):
     telefone = db.Column(db.String(20))
     email_comercial = db.Column(db.String(100))
     website = db.Column(db.String(200))
-    doc_filename = db.Column(db.String(300))
-    logo_filename = db.Column(db.String(255), nullable=True)
+    # active_history: o valor antigo é carregado ao trocar o arquivo, para a contagem de referências
+    doc_filename = db.column_property(db.Column(db.String(300)), active_history=True)
+    logo_filename = db.column_property(db.Column(db.String(255), nullable=True), active_history=True) # Variante de 200 px em PNG (ou logo antiga)
+    # Logo processada em segundo plano (logos.py / `flask logo-worker`)
+    logo_original = db.column_property(db.Column(db.String(255), nullable=True), active_history=True) # Arquivo enviado, como veio
+    logo_status = db.Column(db.String(20), nullable=True) # pendente, processando, pronto, falhou
+    logo_status_em = db.Column(db.DateTime, nullable=True)
+    logo_variantes = db.column_property(db.Column(db.Text, nullable=True), active_history=True) # JSON: {"32": {"webp": ..., "png": ...}, ...}
     status = db.Column(db.String(20), default="pendente")
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     email_verified = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     password_hash = db.Column(db.String(256), nullable=True) 
@@ -119,17 +135,64 @@ class Empresa(db.Model):
     # 🌟 NOVO CAMPO: Saldo de Coins para Licitações 🌟
     saldo_coins = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
+    # 🌟 CONTADORES DE REPUTAÇÃO (desnormalizados) 🌟
+    # Mantidos por registrar_avaliacao / ajustar_servicos na mesma transação que
+    # cria a avaliação ou conclui a licitação. `flask reputacao-rebuild` recalcula tudo.
+    rating_avg = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    service_count = db.Column(db.Integer, nullable=False, default=0, server_default='0') # Licitações concluídas vencidas
+
+    # Índices das consultas quentes (login, listagens do admin e página de parceiras)
+    __table_args__ = (
+        db.Index('ix_empresa_email_comercial', 'email_comercial'),
+        db.Index('ix_empresa_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_empresa_status_nome', 'status', 'nome', 'id'),
+        db.Index('ix_empresa_created', 'created_at', 'id'),
+        db.Index('ix_empresa_logo_status', 'logo_status', 'logo_status_em'),
+    )
+
+    def logo_variante(self, tamanho, formato="png"):
+        """Caminho da variante da logo; cai para logo_filename se ainda não houver variantes."""
+        if self.logo_variantes:
+            variante = json.loads(self.logo_variantes).get(str(tamanho))
+            if variante and formato in variante:
+                return variante[formato]
+        return self.logo_filename
+
     @property
     def average_rating(self):
-        from sqlalchemy.sql import func
-        # Retorna a média de avaliações ou None se não houver nenhuma
-        avg = db.session.query(func.avg(Avaliacao.rating)).filter(Avaliacao.empresa_id == self.id).scalar()
-        return avg if avg is not None else 0
+        # Retorna a média de avaliações ou 0 se não houver nenhuma
+        return self.rating_avg if self.rating_count else 0
 
-    @property
-    def service_count(self):
-        # Retorna o número de serviços concluídos (licitações vencidas)
-        return Licitacao.query.filter_by(empresa_vencedora_id=self.id, status='concluida').count()
+    @staticmethod
+    def registrar_avaliacao(empresa_id, rating):
+        """Soma uma nota à média com um UPDATE atômico (sem ler a linha antes)."""
+        Empresa.query.filter_by(id=empresa_id).update({
+            Empresa.rating_avg: (Empresa.rating_avg * Empresa.rating_count + rating) / (Empresa.rating_count + 1),
+            Empresa.rating_count: Empresa.rating_count + 1,
+        }, synchronize_session=False)
+
+    @staticmethod
+    def ajustar_servicos(empresa_id, delta):
+        """Incrementa (ou decrementa) o número de serviços concluídos."""
+        Empresa.query.filter_by(id=empresa_id).update({
+            Empresa.service_count: Empresa.service_count + delta,
+        }, synchronize_session=False)
+
+    @staticmethod
+    def recalcular_reputacao():
+        """Recalcula os contadores de todas as empresas a partir das tabelas de origem."""
+        from sqlalchemy.sql import func
+        avaliacoes = db.session.query(Avaliacao).filter(Avaliacao.empresa_id == Empresa.id)
+        db.session.execute(db.update(Empresa).values(
+            rating_count=avaliacoes.with_entities(func.count(Avaliacao.id)).scalar_subquery(),
+            rating_avg=func.coalesce(avaliacoes.with_entities(func.avg(Avaliacao.rating)).scalar_subquery(), 0),
+            service_count=(
+                db.session.query(func.count(Licitacao.id))
+                .filter(Licitacao.empresa_vencedora_id == Empresa.id, Licitacao.status == 'concluida')
+                .scalar_subquery()
+            ),
+        ))
         
     def set_password(self, password):
         """Hashea e salva a senha."""
@@ -142,6 +205,258 @@ class Empresa(db.Model):
         return check_password_hash(self.password_hash, password)
 
 
+# ------------------------------------------------------------------------
+# 🌟 IDENTIDADE DE LOGIN UNIFICADA 🌟
+# ------------------------------------------------------------------------
+def normalizar_email(email):
+    """E-mail na forma usada para login e unicidade (sem espaços, minúsculo)."""
+    email = (email or "").strip().lower()
+    return email or None
+
+
+class EmailEmUso(Exception):
+    """O e-mail já é o login de outra conta (condomínio ou empresa)."""
+
+    def __init__(self, email):
+        super().__init__(f"O e-mail {email} já está cadastrado em outra conta.")
+        self.email = email
+
+
+class ContaAcesso(db.Model):
+    """
+    Uma linha por conta que pode fazer login (condomínio ou empresa), indexada
+    pelo e-mail normalizado. O login resolve o usuário com uma única consulta
+    e a restrição única impede o mesmo e-mail em um condomínio e uma empresa.
+
+    Mantida pelos eventos de Condominio/Empresa abaixo, na mesma transação
+    (`flask contas-acesso-rebuild` recria tudo a partir das tabelas de origem).
+    """
+    __tablename__ = 'conta_acesso'
+
+    id = db.Column(db.Integer, primary_key=True)
+    email_normalizado = db.Column(db.String(100), nullable=False)
+    tipo = db.Column(db.String(20), nullable=False) # condominio, empresa
+    usuario_id = db.Column(db.Integer, nullable=False)
+    password_hash = db.Column(db.String(256), nullable=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    needs_password_change = db.Column(db.Boolean, nullable=False, default=False)
+    nome_exibicao = db.Column(db.String(200), nullable=True) # Nome guardado na sessão
+
+    __table_args__ = (
+        db.UniqueConstraint('email_normalizado', name='uq_conta_acesso_email'),
+        db.UniqueConstraint('tipo', 'usuario_id', name='uq_conta_acesso_tipo_usuario'),
+    )
+
+    def check_password(self, password):
+        if not self.password_hash:
+            return False
+        return check_password_hash(self.password_hash, password)
+
+    @staticmethod
+    def email_em_uso(email, exceto=None):
+        """True se o e-mail já pertence a outra conta. `exceto` = (tipo, usuario_id) a ignorar."""
+        email = normalizar_email(email)
+        if email is None:
+            return False
+        query = db.session.query(ContaAcesso.tipo, ContaAcesso.usuario_id).filter_by(email_normalizado=email)
+        dono = query.first()
+        return dono is not None and tuple(dono) != exceto
+
+    @staticmethod
+    def reconstruir():
+        """
+        Recria a tabela a partir de Condominio e Empresa. Quando o mesmo e-mail
+        aparece em mais de uma conta fica a primeira (condomínios antes, menor
+        id primeiro); as demais são devolvidas como conflitos.
+        """
+        db.session.query(ContaAcesso).delete(synchronize_session=False)
+        vistos, conflitos = {}, []
+        contas = [("condominio", c) for c in Condominio.query.order_by(Condominio.id)]
+        contas += [("empresa", e) for e in Empresa.query.order_by(Empresa.id)]
+        for tipo, usuario in contas:
+            valores = _valores_conta(tipo, usuario)
+            email = valores["email_normalizado"]
+            if email is None:
+                continue
+            if email in vistos:
+                conflitos.append((email, vistos[email], (tipo, usuario.id)))
+                continue
+            vistos[email] = (tipo, usuario.id)
+            db.session.add(ContaAcesso(tipo=tipo, usuario_id=usuario.id, **valores))
+        return conflitos
+
+
+# Campos de cada modelo que alimentam a ContaAcesso
+_CAMPOS_CONTA = {
+    "condominio": ("email", "password_hash", "is_active", "needs_password_change", "contato_nome"),
+    "empresa": ("email_comercial", "password_hash", "is_active", "needs_password_change", "nome"),
+}
+
+
+def _valores_conta(tipo, usuario):
+    email, senha, ativo, trocar, nome = (getattr(usuario, campo) for campo in _CAMPOS_CONTA[tipo])
+    return {
+        "email_normalizado": normalizar_email(email),
+        "password_hash": senha,
+        "is_active": True if ativo is None else ativo,
+        "needs_password_change": bool(trocar),
+        "nome_exibicao": nome,
+    }
+
+
+def _sincronizar_conta(connection, tipo, usuario, nova=False):
+    tabela = ContaAcesso.__table__
+    chave = (tabela.c.tipo == tipo) & (tabela.c.usuario_id == usuario.id)
+    valores = _valores_conta(tipo, usuario)
+    if valores["email_normalizado"] is None:
+        connection.execute(tabela.delete().where(chave))
+        return
+    dono = connection.execute(
+        db.select(tabela.c.tipo, tabela.c.usuario_id)
+        .where(tabela.c.email_normalizado == valores["email_normalizado"])
+    ).first()
+    if dono is not None and tuple(dono) != (tipo, usuario.id):
+        if nova or connection.execute(db.select(tabela.c.id).where(chave)).first() is not None:
+            raise EmailEmUso(valores["email_normalizado"])
+        # Conta que já ficou sem login por repetir o e-mail de outra (ver
+        # `flask contas-acesso-rebuild`): continua assim, e o resto da
+        # alteração (suspender, aprovar, trocar senha) segue normalmente
+        return
+    if connection.execute(tabela.update().where(chave).values(**valores)).rowcount == 0:
+        connection.execute(tabela.insert().values(tipo=tipo, usuario_id=usuario.id, **valores))
+
+
+def _registrar_sincronizacao(modelo, tipo):
+    campos = _CAMPOS_CONTA[tipo]
+
+    @db.event.listens_for(modelo, "after_insert")
+    def _apos_inserir(mapper, connection, target):
+        _sincronizar_conta(connection, tipo, target, nova=True)
+
+    @db.event.listens_for(modelo, "after_update")
+    def _apos_atualizar(mapper, connection, target):
+        estado = db.inspect(target)
+        if any(estado.attrs[campo].history.has_changes() for campo in campos):
+            _sincronizar_conta(connection, tipo, target)
+
+    @db.event.listens_for(modelo, "after_delete")
+    def _apos_excluir(mapper, connection, target):
+        tabela = ContaAcesso.__table__
+        connection.execute(tabela.delete().where((tabela.c.tipo == tipo) & (tabela.c.usuario_id == target.id)))
+
+
+_registrar_sincronizacao(Condominio, "condominio")
+_registrar_sincronizacao(Empresa, "empresa")
+
+
+# ------------------------------------------------------------------------
+# 🌟 ARQUIVOS ENVIADOS (ENDEREÇADOS POR CONTEÚDO) 🌟
+# ------------------------------------------------------------------------
+class ArquivoUpload(db.Model):
+    """
+    Um arquivo guardado no storage, identificado pelo SHA-256 do conteúdo
+    (storage.salvar_conteudo). O mesmo conteúdo enviado de novo, por quem
+    quer que seja, reaproveita a mesma chave.
+
+    `referencias` conta quantas colunas apontam para a chave; é mantida pelos
+    eventos abaixo. Com zero referências o arquivo pode ser apagado pelo GC,
+    desde que `updated_at` (renovado a cada upload que reaproveita o
+    conteúdo) seja mais velho que o período de carência.
+    """
+    __tablename__ = 'arquivo_upload'
+
+    id = db.Column(db.Integer, primary_key=True)
+    chave = db.Column(db.String(255), nullable=False) # Ex.: documentos/ab/ab12...ef.pdf
+    sha256 = db.Column(db.String(64), nullable=False)
+    tamanho = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    referencias = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Último upload deste conteúdo
+
+    __table_args__ = (
+        db.UniqueConstraint('chave', name='uq_arquivo_upload_chave'),
+        db.Index('ix_arquivo_upload_sha256', 'sha256'),
+    )
+
+    @staticmethod
+    def chaves_referenciadas():
+        """Conjunto de todas as chaves gravadas nas colunas de arquivo (uma consulta por tabela)."""
+        chaves = set()
+        for modelo, tipo in ((Condominio, "condominio"), (Empresa, "empresa")):
+            colunas = _COLUNAS_ARQUIVO[tipo]
+            linhas = db.session.query(*[getattr(modelo, coluna) for coluna in colunas]).yield_per(1000)
+            for linha in linhas:
+                for coluna, valor in zip(colunas, linha):
+                    chaves.update(_chaves(coluna, valor))
+        return chaves
+
+
+# Colunas que guardam chaves do storage; logo_variantes é um JSON com várias
+_COLUNAS_ARQUIVO = {
+    "condominio": ("pdf_filename",),
+    "empresa": ("doc_filename", "logo_filename", "logo_original", "logo_variantes"),
+}
+
+
+def _chaves(coluna, valor):
+    if not valor:
+        return []
+    if coluna == "logo_variantes":
+        return [chave for formatos in json.loads(valor).values() for chave in formatos.values()]
+    return [valor]
+
+
+def _ajustar_referencias(connection, deltas):
+    tabela = ArquivoUpload.__table__
+    for chave, delta in deltas.items():
+        if delta:
+            connection.execute(
+                tabela.update().where(tabela.c.chave == chave).values(referencias=tabela.c.referencias + delta)
+            )
+
+
+def _registrar_referencias(modelo, tipo):
+    colunas = _COLUNAS_ARQUIVO[tipo]
+
+    def _contar(target, sinal, deltas):
+        for coluna in colunas:
+            for chave in _chaves(coluna, getattr(target, coluna)):
+                deltas[chave] = deltas.get(chave, 0) + sinal
+
+    @db.event.listens_for(modelo, "after_insert")
+    def _apos_inserir(mapper, connection, target):
+        deltas = {}
+        _contar(target, +1, deltas)
+        _ajustar_referencias(connection, deltas)
+
+    @db.event.listens_for(modelo, "after_update")
+    def _apos_atualizar(mapper, connection, target):
+        estado = db.inspect(target)
+        deltas = {}
+        for coluna in colunas:
+            historico = estado.attrs[coluna].history
+            if not historico.has_changes():
+                continue
+            for valor in historico.deleted:
+                for chave in _chaves(coluna, valor):
+                    deltas[chave] = deltas.get(chave, 0) - 1
+            for valor in historico.added:
+                for chave in _chaves(coluna, valor):
+                    deltas[chave] = deltas.get(chave, 0) + 1
+        _ajustar_referencias(connection, deltas)
+
+    @db.event.listens_for(modelo, "after_delete")
+    def _apos_excluir(mapper, connection, target):
+        deltas = {}
+        _contar(target, -1, deltas)
+        _ajustar_referencias(connection, deltas)
+
+
+_registrar_referencias(Condominio, "condominio")
+_registrar_referencias(Empresa, "empresa")
+
+
 # ------------------------------------------------------------------------
 # 🌟 NOVOS MODELOS PARA O SISTEMA DE LICITAÇÕES E COINS 🌟
 # ------------------------------------------------------------------------
@@ -156,7 +471,7 @@ class Licitacao(db.Model):
     descricao = db.Column(db.Text, nullable=False)
     tipo_servico = db.Column(db.String(100), nullable=False) # Ex: Jardinagem, Segurança...
     
-    status = db.Column(db.String(20), default="aberta") # aberta, fechada, cancelada, concluida
+    status = db.Column(db.String(20), default="aberta") # aberta, fechada, concluida, embargada (ver TRANSICOES)
     custo_coins = db.Column(db.Integer, default=10) # Custo para uma empresa se candidatar
     
     # NOVO: Campo para armazenar o orçamento da proposta vencedora
@@ -165,7 +480,7 @@ class Licitacao(db.Model):
     # NOVO: ID da empresa que venceu a licitação
     empresa_vencedora_id = db.Column(db.Integer, db.ForeignKey('empresa.id'), nullable=True)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relacionamentos
@@ -178,6 +493,47 @@ class Licitacao(db.Model):
     # NOVO: Relacionamento com a avaliação (se houver)
     avaliacao = db.relationship('Avaliacao', backref='licitacao', uselist=False, cascade="all, delete-orphan")
 
+    # A busca textual (coluna tsvector `busca` + ix_licitacao_busca no Postgres,
+    # tabela FTS5 no SQLite) é criada por busca.py, fora destes índices
+    __table_args__ = (
+        db.Index('ix_licitacao_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_licitacao_condominio_created', 'condominio_id', 'created_at', 'id'),
+        db.Index('ix_licitacao_created', 'created_at', 'id'),
+        db.Index('ix_licitacao_empresa_vencedora', 'empresa_vencedora_id',
+                 postgresql_where=db.text('empresa_vencedora_id IS NOT NULL'),
+                 sqlite_where=db.text('empresa_vencedora_id IS NOT NULL')),
+    )
+
+    # Ciclo de vida: estado atual -> estados para onde pode ir. Embargada é final.
+    ESTADO_INICIAL = "aberta"
+    TRANSICOES = {
+        "aberta": ("fechada", "embargada"),
+        "fechada": ("concluida", "embargada"),
+        "concluida": ("embargada",),
+        "embargada": (),
+    }
+
+    @staticmethod
+    def transicionar(licitacao_id, para, *condicoes, **valores):
+        """
+        Muda o status com um UPDATE condicional (compare-and-set): só passa
+        se o status atual puder ir para `para` pela tabela TRANSICOES e se
+        as `condicoes` extras valerem (ex.: dono da licitação). `valores`
+        são outras colunas gravadas junto. Devolve (id, titulo,
+        empresa_vencedora_id) se ganhou, ou None se a linha não existia ou
+        não estava num estado de origem. Não faz commit.
+        """
+        origens = [de for de, destinos in Licitacao.TRANSICOES.items() if para in destinos]
+        if not origens:
+            raise ValueError(f"Nenhuma transição leva a '{para}'.")
+        return db.session.execute(
+            db.update(Licitacao)
+            .where(Licitacao.id == licitacao_id, Licitacao.status.in_(origens), *condicoes)
+            .values(status=para, **valores)
+            .returning(Licitacao.id, Licitacao.titulo, Licitacao.empresa_vencedora_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+
 
 class Candidatura(db.Model):
     __tablename__ = 'candidatura'
@@ -192,11 +548,45 @@ class Candidatura(db.Model):
     valor_proposta = db.Column(db.Float, nullable=True)
     
     status = db.Column(db.String(20), default="pendente") # pendente, aceita, rejeitada
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     # Relacionamentos
     empresa = db.relationship('Empresa', backref=db.backref('candidaturas', lazy=True))
 
+    __table_args__ = (
+        # Uma candidatura por empresa em cada licitação (ver inscrever)
+        db.Index('ux_candidatura_licitacao_empresa', 'licitacao_id', 'empresa_id', unique=True),
+        db.Index('ix_candidatura_empresa', 'empresa_id'),
+    )
+
+    @staticmethod
+    def inscrever(licitacao_id, empresa_id, mensagem=None, valor_proposta=None):
+        """
+        Insere a candidatura numa única instrução, só se a licitação estiver
+        aberta (INSERT ... SELECT) e a empresa ainda não tiver se candidatado
+        (ON CONFLICT DO NOTHING no índice único). Devolve o id da nova
+        candidatura, ou None se nada foi inserido. Não faz commit.
+        """
+        if db.session.get_bind().dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        tabela = Candidatura.__table__
+        origem = db.select(
+            Licitacao.id,
+            db.literal(empresa_id, db.Integer),
+            db.literal(mensagem, db.Text),
+            db.literal(valor_proposta, db.Float),
+            db.literal("pendente", db.String),
+        ).where(Licitacao.id == licitacao_id, Licitacao.status == "aberta")
+        consulta = (
+            insert(tabela)
+            .from_select(["licitacao_id", "empresa_id", "mensagem", "valor_proposta", "status"], origem)
+            .on_conflict_do_nothing(index_elements=["licitacao_id", "empresa_id"])
+            .returning(tabela.c.id)
+        )
+        return db.session.execute(consulta).scalar()
+
 
 class TransacaoCoin(db.Model):
     """
@@ -217,6 +607,13 @@ class TransacaoCoin(db.Model):
     
     empresa = db.relationship('Empresa', backref=db.backref('transacoes', lazy=True))
 
+    # Idempotência do webhook: um pagamento do MP vira no máximo uma transação
+    __table_args__ = (
+        db.Index('ux_transacao_coin_payment_id', 'payment_id', unique=True,
+                 postgresql_where=db.text('payment_id IS NOT NULL'),
+                 sqlite_where=db.text('payment_id IS NOT NULL')),
+    )
+
 
 class TransacaoPlano(db.Model):
     """
@@ -237,6 +634,12 @@ class TransacaoPlano(db.Model):
     
     condominio = db.relationship('Condominio', backref=db.backref('transacoes_plano', lazy=True))
 
+    __table_args__ = (
+        db.Index('ux_transacao_plano_payment_id', 'payment_id', unique=True,
+                 postgresql_where=db.text('payment_id IS NOT NULL'),
+                 sqlite_where=db.text('payment_id IS NOT NULL')),
+    )
+
 # ------------------------------------------------------------------------
 # 🌟 NOVO MODELO PARA AVALIAÇÕES 🌟
 # ------------------------------------------------------------------------
@@ -257,6 +660,10 @@ class Avaliacao(db.Model):
     empresa = db.relationship('Empresa', backref=db.backref('avaliacoes', lazy='dynamic'))
     condominio = db.relationship('Condominio', backref=db.backref('avaliacoes', lazy='dynamic'))
 
+    __table_args__ = (
+        db.Index('ix_avaliacao_empresa', 'empresa_id'),
+    )
+
 class Contato(db.Model):
     __tablename__ = 'contato'
     
@@ -266,7 +673,11 @@ class Contato(db.Model):
     telefone = db.Column(db.String(20), nullable=True)
     mensagem = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default="nao_lido") # nao_lido, lido, respondido
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_contato_created', 'created_at', 'id'),
+    )
 
 class MensagemLicitacao(db.Model):
     __tablename__ = 'mensagem_licitacao'
@@ -278,3 +689,121 @@ class MensagemLicitacao(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     licitacao = db.relationship('Licitacao', backref=db.backref('mensagens', lazy='dynamic'))
+
+    __table_args__ = (
+        # O chat é lido por faixas de id dentro da licitação (cursor do polling e do histórico)
+        db.Index('ix_mensagem_licitacao_licitacao_id', 'licitacao_id', 'id'),
+    )
+
+    @staticmethod
+    def do_canal(licitacao_id, depois=None, antes=None, limite=50):
+        """
+        Mensagens do canal em ordem de envio, lidas por uma faixa do índice
+        (licitacao_id, id). Com `depois`, as enviadas após esse id (polling);
+        senão, as `limite` mais recentes, ou as anteriores a `antes`.
+        Devolve (mensagens, tem_mais): com `depois`, se ainda há mensagens
+        novas além do limite; sem ele, se há mensagens mais antigas.
+        """
+        query = MensagemLicitacao.query.filter(MensagemLicitacao.licitacao_id == licitacao_id)
+        if depois is not None:
+            linhas = (query.filter(MensagemLicitacao.id > depois)
+                      .order_by(MensagemLicitacao.id.asc()).limit(limite + 1).all())
+            return linhas[:limite], len(linhas) > limite
+        if antes is not None:
+            query = query.filter(MensagemLicitacao.id < antes)
+        linhas = query.order_by(MensagemLicitacao.id.desc()).limit(limite + 1).all()
+        return linhas[:limite][::-1], len(linhas) > limite
+
+    def para_json(self):
+        return {
+            "id": self.id,
+            "remetente_tipo": self.remetente_tipo,
+            "conteudo": self.conteudo,
+            "created_at": self.created_at.isoformat(),
+            "hora": self.created_at.strftime('%d/%m %H:%M'),
+        }
+
+
+# ------------------------------------------------------------------------
+# 🌟 FILA PERSISTENTE DE E-MAILS (OUTBOX) 🌟
+# ------------------------------------------------------------------------
+class EmailOutbox(db.Model):
+    """
+    E-mails aguardando envio. As rotas só enfileiram (na mesma transação do
+    restante da alteração) e o worker `flask outbox-worker` faz o envio.
+    """
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    assunto = db.Column(db.String(255), nullable=False)
+    remetente = db.Column(db.String(120), nullable=False)
+    destinatarios = db.Column(db.Text, nullable=False) # Separados por vírgula
+    corpo = db.Column(db.Text, nullable=True)
+    corpo_html = db.Column(db.Text, nullable=True)
+
+    status = db.Column(db.String(20), nullable=False, default="pendente") # pendente, enviando, enviado, falhou
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    proxima_tentativa_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_erro = db.Column(db.Text, nullable=True)
+
+    # Tempo gasto na conversa SMTP (ms), usado nas métricas de latência
+    envio_ms = db.Column(db.Integer, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    enviado_em = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_proxima', 'status', 'proxima_tentativa_em'),
+    )
+
+
+# ------------------------------------------------------------------------
+# 🌟 FILA DE NOTIFICAÇÕES DO MERCADO PAGO (WEBHOOK) 🌟
+# ------------------------------------------------------------------------
+class MPNotificacao(db.Model):
+    """
+    Notificação recebida do Mercado Pago. O webhook só grava e responde;
+    o worker `flask mp-webhook-worker` consulta a API e aplica o pagamento.
+    Há no máximo uma linha por (topico, recurso_id): reenvios do MP
+    são deduplicados aqui.
+    """
+    __tablename__ = 'mp_notificacao'
+
+    id = db.Column(db.Integer, primary_key=True)
+    topico = db.Column(db.String(30), nullable=False) # payment, merchant_order
+    recurso_id = db.Column(db.String(100), nullable=False) # ID do pagamento ou do pedido
+    payload = db.Column(db.Text, nullable=True) # Corpo bruto da última notificação
+
+    status = db.Column(db.String(20), nullable=False, default="pendente") # pendente, processando, processado, falhou
+    status_mp = db.Column(db.String(30), nullable=True) # Último status do pagamento no MP (approved, pending...)
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    proxima_tentativa_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_erro = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    recebido_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Última notificação recebida
+    processado_em = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('topico', 'recurso_id', name='uq_mp_notificacao_topico_recurso'),
+        db.Index('ix_mp_notificacao_status_proxima', 'status', 'proxima_tentativa_em'),
+    )
+
+
+class MPNotificacaoFalha(db.Model):
+    """
+    Dead-letter: notificações que esgotaram as tentativas. Podem ser
+    devolvidas à fila com `flask mp-webhook-reprocessar`.
+    """
+    __tablename__ = 'mp_notificacao_falha'
+
+    id = db.Column(db.Integer, primary_key=True)
+    notificacao_id = db.Column(db.Integer, db.ForeignKey('mp_notificacao.id'), nullable=False)
+    topico = db.Column(db.String(30), nullable=False)
+    recurso_id = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=True)
+    erro = db.Column(db.Text, nullable=True)
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    notificacao = db.relationship('MPNotificacao', backref=db.backref('falhas', lazy=True))
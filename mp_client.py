@@ -0,0 +1,109 @@
+"""
+Cliente do Mercado Pago compartilhado pelo processo.
+
+`get_mp_sdk()` devolve sempre o mesmo `mercadopago.SDK`, montado sobre uma
+`requests.Session` com pool de conexões keep-alive (o TLS é negociado uma vez
+por conexão, não a cada chamada) e timeouts explícitos de conexão e leitura.
+
+Um circuit breaker conta as falhas seguidas (erros de rede, 5xx e 429). Ao
+atingir MP_CB_LIMITE_FALHAS ele abre e as chamadas falham na hora com
+`MPIndisponivel` durante MP_CB_TEMPO_ABERTO segundos; depois uma chamada de
+teste decide se ele fecha de novo.
+
+Com MP_API_BASE_URL apontando para o stub (`python mp_stub.py`) a integração
+pode ser testada e carregada sem sair da máquina.
+"""
+import os
+import threading
+import time
+
+from flask import current_app
+
+
+class MPIndisponivel(Exception):
+    """O circuit breaker está aberto: o Mercado Pago não está respondendo."""
+
+
+class CircuitBreaker:
+    """Circuit breaker simples (fechado → aberto → meio-aberto), seguro entre threads."""
+
+    def __init__(self, limite_falhas, tempo_aberto):
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self.falhas = 0
+        self.aberto_ate = None
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        if self.aberto_ate is None:
+            return "fechado"
+        if time.monotonic() < self.aberto_ate:
+            return "aberto"
+        return "meio-aberto"
+
+    def antes_da_chamada(self):
+        with self._lock:
+            estado = self.estado
+            if estado == "aberto":
+                raise MPIndisponivel("Mercado Pago indisponível (circuit breaker aberto).")
+            if estado == "meio-aberto":
+                # Só uma chamada de teste por vez; as demais continuam falhando rápido
+                if self._teste_em_andamento:
+                    raise MPIndisponivel("Mercado Pago indisponível (aguardando chamada de teste).")
+                self._teste_em_andamento = True
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self.aberto_ate = None
+            self._teste_em_andamento = False
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            self._teste_em_andamento = False
+            if self.falhas >= self.limite_falhas or self.aberto_ate is not None:
+                self.aberto_ate = time.monotonic() + self.tempo_aberto
+
+
+_sdk = None
+_sdk_pid = None
+_sdk_lock = threading.Lock()
+
+
+def get_mp_sdk():
+    """
+    SDK do Mercado Pago do processo. É recriado após um fork (cada worker do
+    gunicorn precisa do seu próprio pool de conexões).
+    """
+    global _sdk, _sdk_pid
+    if _sdk is not None and _sdk_pid == os.getpid():
+        return _sdk
+
+    with _sdk_lock:
+        if _sdk is None or _sdk_pid != os.getpid():
+            # O SDK (e o requests) só é importado na primeira chamada: o boot dos workers não paga por ele
+            import mercadopago
+            from mercadopago.config import RequestOptions
+            from mp_http import PooledHttpClient
+
+            config = current_app.config
+            breaker = CircuitBreaker(config["MP_CB_LIMITE_FALHAS"], config["MP_CB_TEMPO_ABERTO"])
+            http_client = PooledHttpClient(
+                base_url=config["MP_API_BASE_URL"],
+                connect_timeout=config["MP_CONNECT_TIMEOUT"],
+                read_timeout=config["MP_READ_TIMEOUT"],
+                pool_size=config["MP_POOL_SIZE"],
+                max_retries=config["MP_MAX_RETRIES"],
+                breaker=breaker,
+            )
+            request_options = RequestOptions(
+                connection_timeout=float(config["MP_READ_TIMEOUT"]),
+                max_retries=config["MP_MAX_RETRIES"],
+            )
+            _sdk = mercadopago.SDK(config["MP_ACCESS_TOKEN"], http_client=http_client,
+                                   request_options=request_options)
+            _sdk_pid = os.getpid()
+    return _sdk
@@ -0,0 +1,66 @@
+"""
+Transporte HTTP do SDK do Mercado Pago (usado por mp_client.get_mp_sdk).
+
+Fica separado de mp_client.py para que o `mercadopago` e o `requests` só
+sejam importados quando o SDK é usado pela primeira vez.
+"""
+import requests
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+MP_API_URL = "https://api.mercadopago.com"
+
+
+class PooledHttpClient(HttpClient):
+    """
+    HttpClient do SDK que reaproveita uma única sessão HTTP (keep-alive) e
+    passa cada chamada pelo circuit breaker.
+    """
+
+    def __init__(self, base_url, connect_timeout, read_timeout, pool_size, max_retries, breaker):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker
+
+        # Repete só erros de conexão e métodos idempotentes: um POST de
+        # preferência repetido criaria duas cobranças.
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.2,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "PUT", "DELETE"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, maxretries=None, **kwargs):
+        # O retry é configurado uma vez no adapter; o timeout é sempre o nosso
+        kwargs.pop("retry_on", None)
+        kwargs.pop("backoff_factor", None)
+        kwargs["timeout"] = self.timeout
+        if self.base_url != MP_API_URL and url.startswith(MP_API_URL):
+            url = self.base_url + url[len(MP_API_URL):]
+
+        self.breaker.antes_da_chamada()
+        try:
+            api_result = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.breaker.falha()
+            raise
+
+        if api_result.status_code >= 500 or api_result.status_code == 429:
+            self.breaker.falha()
+        else:
+            self.breaker.sucesso()
+
+        response = {"status": api_result.status_code, "response": None}
+        if api_result.status_code != 204 and api_result.content:
+            try:
+                response["response"] = api_result.json()
+            except ValueError:
+                response["response"] = {"message": api_result.text[:500]}
+        return response
@@ -0,0 +1,140 @@
+"""
+Stub local da API do Mercado Pago, para testar e carregar a integração offline.
+
+Uso:
+    python mp_stub.py --porta 8099 --latencia 0.2 --taxa-erro 0.05
+    MP_API_BASE_URL=http://127.0.0.1:8099 flask run
+
+Implementa só o que a aplicação usa:
+    POST /checkout/preferences       cria a preferência (init_point aponta para o stub)
+    GET  /checkout/pagar/<pref_id>   simula o pagamento aprovado, dispara o webhook
+                                     e redireciona para back_urls.success
+    GET  /v1/payments/<id>           consulta o pagamento
+    GET  /merchant_orders/<id>       consulta o pedido (um por preferência)
+    POST /stub/pagamentos            cria um pagamento aprovado direto (para carga)
+
+`--latencia` e `--taxa-erro` permitem simular um MP lento ou instável e ver o
+circuit breaker de mp_client.py em ação.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.request
+
+from flask import Flask, request, redirect
+
+stub = Flask(__name__)
+stub.config.update(LATENCIA=0.0, TAXA_ERRO=0.0)
+
+_lock = threading.Lock()
+_ids = itertools.count(1000)
+preferencias = {}
+pagamentos = {}
+
+
+def _novo_id():
+    with _lock:
+        return next(_ids)
+
+
+def _notificar(url, payload):
+    """Envia o webhook em segundo plano, como o MP faria."""
+    if not url:
+        return
+
+    def _post():
+        try:
+            req = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                         headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(req, timeout=5).close()
+        except Exception as e:
+            print(f"[mp_stub] Falha ao notificar {url}: {e}")
+
+    threading.Thread(target=_post, daemon=True).start()
+
+
+def _criar_pagamento(metadata, valor, notification_url=None, pref_id=None):
+    payment = {
+        "id": _novo_id(),
+        "status": "approved",
+        "transaction_amount": valor,
+        "metadata": metadata or {},
+        "preference_id": pref_id,
+    }
+    pagamentos[payment["id"]] = payment
+    _notificar(notification_url, {"type": "payment", "data": {"id": str(payment["id"])}})
+    return payment
+
+
+@stub.before_request
+def _simular_instabilidade():
+    if request.path.startswith("/stub/") or request.path.startswith("/checkout/pagar/"):
+        return None
+    if stub.config["LATENCIA"]:
+        time.sleep(stub.config["LATENCIA"])
+    if random.random() < stub.config["TAXA_ERRO"]:
+        return {"message": "erro simulado pelo stub", "status": 500}, 500
+    return None
+
+
+@stub.post("/checkout/preferences")
+def criar_preferencia():
+    data = request.get_json(force=True) or {}
+    pref_id = f"stub-{_novo_id()}"
+    preferencias[pref_id] = data
+    init_point = f"{request.host_url}checkout/pagar/{pref_id}"
+    return {"id": pref_id, "init_point": init_point, "sandbox_init_point": init_point}, 201
+
+
+@stub.get("/checkout/pagar/<pref_id>")
+def pagar_preferencia(pref_id):
+    pref = preferencias.get(pref_id)
+    if pref is None:
+        return {"message": "preference not found", "status": 404}, 404
+    valor = sum(i.get("unit_price", 0) * i.get("quantity", 1) for i in pref.get("items", []))
+    _criar_pagamento(pref.get("metadata"), valor, pref.get("notification_url"), pref_id)
+    sucesso = (pref.get("back_urls") or {}).get("success")
+    return redirect(sucesso) if sucesso else ({"status": "approved"}, 200)
+
+
+@stub.get("/v1/payments/<int:payment_id>")
+def consultar_pagamento(payment_id):
+    payment = pagamentos.get(payment_id)
+    if payment is None:
+        return {"message": "Payment not found", "status": 404}, 404
+    return payment, 200
+
+
+@stub.get("/merchant_orders/<order_id>")
+def consultar_pedido(order_id):
+    pref_id = f"stub-{order_id}"
+    if pref_id not in preferencias:
+        return {"message": "Order not found", "status": 404}, 404
+    pagos = [p for p in pagamentos.values() if p["preference_id"] == pref_id]
+    return {
+        "id": order_id,
+        "preference_id": pref_id,
+        "order_status": "paid" if pagos else "payment_required",
+        "payments": [{"id": p["id"], "status": p["status"]} for p in pagos],
+    }, 200
+
+
+@stub.post("/stub/pagamentos")
+def criar_pagamento_direto():
+    data = request.get_json(force=True) or {}
+    payment = _criar_pagamento(data.get("metadata"), data.get("valor", 0.0), data.get("notification_url"))
+    return payment, 201
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub local da API do Mercado Pago.")
+    parser.add_argument("--porta", type=int, default=8099)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso por chamada, em segundos.")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de chamadas que devolvem 500.")
+    args = parser.parse_args()
+
+    stub.config.update(LATENCIA=args.latencia, TAXA_ERRO=args.taxa_erro)
+    stub.run(host="127.0.0.1", port=args.porta, threaded=True)
@@ -0,0 +1,295 @@
+"""
+Fila de notificações do Mercado Pago.
+
+O webhook (`/mp/webhook`) só grava a notificação com `enqueue_notification`
+e responde 200 na hora, sem chamar a API do MP. O worker
+(`flask mp-webhook-worker`) consulta cada pagamento uma única vez e aplica o
+crédito de coins / ativação de plano na mesma transação que marca a
+notificação como processada, então reprocessar nunca credita em dobro.
+Notificações que esgotam as tentativas vão para `mp_notificacao_falha`.
+"""
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from coins import creditar, PagamentoJaCreditado
+from mp_client import get_mp_sdk, MPIndisponivel
+from models import db, Condominio, TransacaoPlano, MPNotificacao, MPNotificacaoFalha
+
+
+def enqueue_notification(topico, recurso_id, payload=None):
+    """
+    Registra (ou reaproveita) a notificação de (topico, recurso_id).
+    Reenvios enquanto ela ainda está na fila são absorvidos; um pagamento já
+    processado só volta para a fila se ainda não estava aprovado. O commit
+    fica a cargo de quem chamou.
+    """
+    recurso_id = str(recurso_id)
+    payload_txt = json.dumps(payload, default=str) if payload is not None else None
+
+    item = MPNotificacao.query.filter_by(topico=topico, recurso_id=recurso_id).first()
+    if item is None:
+        try:
+            with db.session.begin_nested():
+                item = MPNotificacao(
+                    topico=topico,
+                    recurso_id=recurso_id,
+                    payload=payload_txt,
+                    status="pendente",
+                    proxima_tentativa_em=datetime.utcnow(),
+                )
+                db.session.add(item)
+            return item
+        except IntegrityError:
+            # Outro worker gravou a mesma notificação ao mesmo tempo
+            item = MPNotificacao.query.filter_by(topico=topico, recurso_id=recurso_id).first()
+
+    # Registra o reenvio: se chegar enquanto o worker processa, ele repete
+    item.recebido_em = datetime.utcnow()
+    if item.status in ("pendente", "processando"):
+        return item
+    if item.topico == "payment" and item.status == "processado" and item.status_mp == "approved":
+        return item
+
+    if item.status == "falhou":
+        # Volta para a fila: a entrada da dead-letter deixa de valer (e o
+        # mp-webhook-reprocessar não mexe numa notificação já processada)
+        MPNotificacaoFalha.query.filter_by(notificacao_id=item.id).delete(synchronize_session=False)
+    item.payload = payload_txt
+    item.status = "pendente"
+    item.tentativas = 0
+    item.proxima_tentativa_em = datetime.utcnow()
+    return item
+
+
+def claim_batch(limit):
+    """
+    Reserva notificações vencidas (FOR UPDATE SKIP LOCKED no Postgres).
+    Retomar uma reserva vencida conta como tentativa: uma notificação que
+    derruba ou trava o worker chega à dead-letter em vez de voltar sempre.
+    """
+    now = datetime.utcnow()
+    itens = (
+        MPNotificacao.query
+        .filter(MPNotificacao.status.in_(["pendente", "processando"]),
+                MPNotificacao.proxima_tentativa_em <= now)
+        .order_by(MPNotificacao.proxima_tentativa_em, MPNotificacao.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    lease = now + timedelta(seconds=current_app.config["MP_WEBHOOK_LEASE"])
+    reservados = []
+    for item in itens:
+        if item.status == "processando":
+            _registrar_falha(item, "Reserva expirada: o worker parou durante o processamento.")
+            continue
+        item.status = "processando"
+        item.proxima_tentativa_em = lease
+        reservados.append(item.id)
+    db.session.commit()
+    return reservados
+
+
+def apply_approved_payment(payment):
+    """
+    Aplica um pagamento aprovado (já consultado na API) no banco.
+    Não faz commit: roda dentro da transação do worker.
+    """
+    payment_id = payment.get("id")
+    metadata = payment.get("metadata", {}) or {}
+
+    # Lógica para processar compra de planos (Condomínio)
+    condominio_id = metadata.get("condominio_id")
+    plano_assinatura = metadata.get("plano_assinatura")
+    if condominio_id and plano_assinatura:
+        condominio = Condominio.query.get(condominio_id)
+        if not condominio:
+            current_app.logger.error(f"Condomínio ID {condominio_id} não encontrado para pagamento do plano {payment_id}.")
+            return
+
+        # Garante que a transação não seja processada duas vezes: o índice
+        # único em payment_id barra o segundo worker com o mesmo pagamento
+        try:
+            with db.session.begin_nested():
+                db.session.add(TransacaoPlano(
+                    condominio_id=condominio.id,
+                    plano_id=plano_assinatura,
+                    valor=float(payment.get("transaction_amount", 0.0)),
+                    payment_id=str(payment_id),
+                    status="concluido"
+                ))
+        except IntegrityError:
+            current_app.logger.warning(f"Pagamento de plano ID {payment_id} já processado anteriormente.")
+            return
+
+        condominio.plano_assinatura = plano_assinatura
+        condominio.subscription_expires_at = datetime.utcnow() + timedelta(days=30)
+        current_app.logger.info(f"✅ SUCESSO: Plano {plano_assinatura} ativado para Condomínio ID {condominio_id}")
+        return
+
+    # Lógica para processar compra de coins (Empresa)
+    empresa_id = metadata.get("empresa_id")
+    coins_qtd = metadata.get("coins_qtd")
+    if empresa_id and coins_qtd:
+        # Crédito atômico no livro-razão (ver coins.py): não disputa com candidaturas simultâneas
+        try:
+            novo_saldo = creditar(int(empresa_id), int(coins_qtd), f"Compra de {coins_qtd} coins via Mercado Pago",
+                                  payment_id=str(payment_id))
+        except PagamentoJaCreditado:
+            current_app.logger.warning(f"Pagamento de coins ID {payment_id} já processado anteriormente.")
+            return
+        if novo_saldo is not None:
+            current_app.logger.info(f"💰 SUCESSO: {coins_qtd} Coins creditados para Empresa ID {empresa_id} (saldo: {novo_saldo})")
+        else:
+            current_app.logger.error(f"Empresa ID {empresa_id} não encontrada para pagamento {payment_id}.")
+        return
+
+    current_app.logger.warning(f"Pagamento ID {payment_id} aprovado, mas sem metadados reconhecíveis (plano ou coins).")
+
+
+def _process_payment(item, sdk):
+    resp = sdk.payment().get(item.recurso_id)
+    if not resp or resp.get("status") != 200:
+        raise RuntimeError(f"Falha ao consultar pagamento {item.recurso_id}: {resp}")
+
+    payment = resp["response"]
+    item.status_mp = payment.get("status")
+    if item.status_mp == "approved":
+        apply_approved_payment(payment)
+    else:
+        current_app.logger.info(f"Pagamento {item.recurso_id} não está aprovado, status: {item.status_mp}")
+
+
+def _process_merchant_order(item, sdk):
+    resp = sdk.merchant_order().get(item.recurso_id)
+    if not resp or resp.get("status") != 200:
+        raise RuntimeError(f"Falha ao buscar merchant_order {item.recurso_id}: {resp}")
+
+    order = resp["response"]
+    item.status_mp = order.get("order_status") or order.get("status")
+    # Cada pagamento aprovado do pedido vira uma notificação 'payment', que é
+    # deduplicada com as notificações diretas do mesmo pagamento.
+    for payment in order.get("payments", []):
+        if payment.get("status") == "approved":
+            current_app.logger.info(f"Encontrado pagamento aprovado {payment['id']} dentro do pedido {item.recurso_id}.")
+            enqueue_notification("payment", payment["id"], payment)
+
+
+def _registrar_falha(item, error):
+    item.tentativas += 1
+    item.ultimo_erro = str(error)[:1000]
+    if item.tentativas >= current_app.config["MP_WEBHOOK_MAX_TENTATIVAS"]:
+        item.status = "falhou"
+        db.session.add(MPNotificacaoFalha(
+            notificacao_id=item.id,
+            topico=item.topico,
+            recurso_id=item.recurso_id,
+            payload=item.payload,
+            erro=item.ultimo_erro,
+            tentativas=item.tentativas,
+        ))
+        current_app.logger.error(f"❌ Notificação MP #{item.id} ({item.topico} {item.recurso_id}) enviada para dead-letter: {error}")
+    else:
+        atraso = min(current_app.config["MP_WEBHOOK_BACKOFF_MAX"],
+                     current_app.config["MP_WEBHOOK_BACKOFF_BASE"] * (2 ** (item.tentativas - 1)))
+        item.status = "pendente"
+        item.proxima_tentativa_em = datetime.utcnow() + timedelta(seconds=atraso * random.uniform(0.8, 1.2))
+        current_app.logger.warning(f"Falha ao processar notificação MP #{item.id} (tentativa {item.tentativas}): {error}")
+
+
+def _mark_failure(item_id, error):
+    _registrar_falha(MPNotificacao.query.get(item_id), error)
+    db.session.commit()
+
+
+def process_notification(item_id, sdk):
+    """Processa uma notificação em sua própria transação."""
+    item = MPNotificacao.query.get(item_id)
+    inicio = datetime.utcnow()
+    try:
+        if item.topico == "payment":
+            _process_payment(item, sdk)
+        elif item.topico == "merchant_order":
+            _process_merchant_order(item, sdk)
+
+        recebido_em = db.session.query(MPNotificacao.recebido_em).filter_by(id=item_id).scalar()
+        if recebido_em and recebido_em > inicio and item.status_mp != "approved":
+            # Nova notificação chegou durante o processamento: consulta de novo
+            item.status = "pendente"
+            item.proxima_tentativa_em = datetime.utcnow()
+        else:
+            item.status = "processado"
+            item.processado_em = datetime.utcnow()
+        item.ultimo_erro = None
+        db.session.commit()
+    except MPIndisponivel:
+        # Circuit breaker aberto: devolve para a fila sem gastar tentativa
+        db.session.rollback()
+        item = MPNotificacao.query.get(item_id)
+        item.status = "pendente"
+        item.proxima_tentativa_em = datetime.utcnow() + timedelta(seconds=current_app.config["MP_CB_TEMPO_ABERTO"])
+        db.session.commit()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        _mark_failure(item_id, e)
+
+
+def drain_notifications():
+    """Processa a fila até esvaziá-la. Retorna quantas notificações foram tratadas."""
+    sdk = get_mp_sdk()
+    batch_size = current_app.config["MP_WEBHOOK_BATCH_SIZE"]
+    processados = 0
+    ids = claim_batch(batch_size)
+    while ids:
+        for pos, item_id in enumerate(ids):
+            try:
+                process_notification(item_id, sdk)
+            except MPIndisponivel:
+                # Não adianta insistir agora: libera o resto do lote e para
+                for restante in MPNotificacao.query.filter(MPNotificacao.id.in_(ids[pos + 1:])):
+                    restante.status = "pendente"
+                    restante.proxima_tentativa_em = datetime.utcnow() + timedelta(seconds=current_app.config["MP_CB_TEMPO_ABERTO"])
+                db.session.commit()
+                current_app.logger.warning("Mercado Pago indisponível: processamento da fila pausado.")
+                return processados + pos
+        processados += len(ids)
+        ids = claim_batch(batch_size)
+    return processados
+
+
+def run_webhook_worker(once=False):
+    """Loop do worker: drena a fila e dorme MP_WEBHOOK_POLL_INTERVAL quando vazia."""
+    intervalo = current_app.config["MP_WEBHOOK_POLL_INTERVAL"]
+    current_app.logger.info("Worker de notificações do Mercado Pago iniciado.")
+    while True:
+        try:
+            processados = drain_notifications()
+            if processados:
+                current_app.logger.info(f"Webhook MP: {processados} notificação(ões) processada(s).")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro no worker de notificações MP: {e}", exc_info=True)
+        finally:
+            db.session.remove()
+        if once:
+            return
+        time.sleep(intervalo)
+
+
+def requeue_dead_letters():
+    """Devolve à fila as notificações da dead-letter. Retorna quantas foram devolvidas."""
+    falhas = MPNotificacaoFalha.query.all()
+    for falha in falhas:
+        item = falha.notificacao
+        item.status = "pendente"
+        item.tentativas = 0
+        item.proxima_tentativa_em = datetime.utcnow()
+        db.session.delete(falha)
+    db.session.commit()
+    return len(falhas)
@@ -0,0 +1,229 @@
+"""
+Fila persistente de e-mails (outbox).
+
+As rotas chamam `enqueue_email(...)`, que apenas adiciona uma linha em
+`email_outbox` na sessão atual — o e-mail é gravado no mesmo commit da
+alteração que o originou e a requisição não espera pelo SMTP.
+
+O worker (`flask outbox-worker`) drena a fila em lotes, reaproveitando a
+mesma conexão SMTP enquanto houver mensagens, com novas tentativas e
+backoff exponencial em caso de falha.
+"""
+import random
+import smtplib
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import func
+
+from models import db, EmailOutbox
+
+# Erros que indicam que a conexão SMTP caiu: o lote é interrompido e a
+# conexão é reaberta na próxima rodada.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def enqueue_email(subject, recipients, body=None, html=None, sender=None):
+    """Adiciona um e-mail na fila. O commit fica a cargo de quem chamou."""
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    recipients = [r for r in recipients if r]
+    if not recipients:
+        return None
+
+    item = EmailOutbox(
+        assunto=subject,
+        remetente=sender or current_app.config["MAIL_USERNAME_SENDER"],
+        destinatarios=",".join(recipients),
+        corpo=body,
+        corpo_html=html,
+        status="pendente",
+        proxima_tentativa_em=datetime.utcnow(),
+    )
+    db.session.add(item)
+    return item
+
+
+def _build_message(item):
+    msg = Message(
+        item.assunto,
+        sender=item.remetente,
+        recipients=item.destinatarios.split(","),
+        charset='utf-8'
+    )
+    msg.body = item.corpo
+    if item.corpo_html:
+        msg.html = item.corpo_html
+    return msg
+
+
+def _backoff(tentativas):
+    """Atraso até a próxima tentativa: exponencial, com teto e jitter."""
+    base = current_app.config["OUTBOX_BACKOFF_BASE"]
+    teto = current_app.config["OUTBOX_BACKOFF_MAX"]
+    atraso = min(teto, base * (2 ** (tentativas - 1)))
+    return timedelta(seconds=atraso * random.uniform(0.8, 1.2))
+
+
+def claim_batch(limit):
+    """
+    Reserva até `limit` mensagens vencidas. No Postgres usa
+    FOR UPDATE SKIP LOCKED, então vários workers podem rodar em paralelo.
+    A reserva expira após OUTBOX_LEASE segundos caso o worker morra no meio;
+    retomar uma reserva vencida conta como tentativa (com backoff), senão
+    uma mensagem que derruba ou trava o worker voltaria para sempre sem
+    chegar a "falhou".
+    """
+    now = datetime.utcnow()
+    itens = (
+        EmailOutbox.query
+        .filter(EmailOutbox.status.in_(["pendente", "enviando"]),
+                EmailOutbox.proxima_tentativa_em <= now)
+        .order_by(EmailOutbox.proxima_tentativa_em, EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    lease = now + timedelta(seconds=current_app.config["OUTBOX_LEASE"])
+    reservados = []
+    for item in itens:
+        if item.status == "enviando":
+            _mark_failure(item, "Reserva expirada: o worker parou durante o envio.")
+            continue
+        item.status = "enviando"
+        item.proxima_tentativa_em = lease
+        reservados.append(item)
+    db.session.commit()
+    return reservados
+
+
+def _mark_failure(item, error):
+    item.tentativas += 1
+    item.ultimo_erro = str(error)[:1000]
+    if item.tentativas >= current_app.config["OUTBOX_MAX_TENTATIVAS"]:
+        item.status = "falhou"
+        current_app.logger.error(f"E-mail #{item.id} descartado após {item.tentativas} tentativas: {error}")
+    else:
+        item.status = "pendente"
+        item.proxima_tentativa_em = datetime.utcnow() + _backoff(item.tentativas)
+        current_app.logger.warning(f"Falha ao enviar e-mail #{item.id} (tentativa {item.tentativas}): {error}")
+
+
+def send_batch(conn, itens):
+    """
+    Envia um lote pela conexão já aberta. Retorna False se a conexão caiu,
+    para que o chamador a reabra; as mensagens não enviadas voltam para a fila.
+    """
+    for pos, item in enumerate(itens):
+        started = time.monotonic()
+        try:
+            conn.send(_build_message(item))
+        except CONNECTION_ERRORS as e:
+            _mark_failure(item, e)
+            for restante in itens[pos + 1:]:
+                restante.status = "pendente"
+                restante.proxima_tentativa_em = datetime.utcnow()
+            db.session.commit()
+            return False
+        except Exception as e:
+            _mark_failure(item, e)
+        else:
+            item.status = "enviado"
+            item.enviado_em = datetime.utcnow()
+            item.envio_ms = int((time.monotonic() - started) * 1000)
+            item.ultimo_erro = None
+            # Não guardamos o conteúdo depois de enviado (há senhas temporárias)
+            item.corpo = None
+            item.corpo_html = None
+        db.session.commit()
+    return True
+
+
+def drain_outbox():
+    """
+    Esvazia a fila usando uma única conexão SMTP enquanto houver lotes.
+    Retorna quantas mensagens foram processadas.
+    """
+    mail = current_app.extensions["mail"]
+    batch_size = current_app.config["OUTBOX_BATCH_SIZE"]
+    processados = 0
+
+    itens = claim_batch(batch_size)
+    while itens:
+        try:
+            with mail.connect() as conn:
+                conexao_ok = True
+                while itens and conexao_ok:
+                    processados += len(itens)
+                    conexao_ok = send_batch(conn, itens)
+                    if conexao_ok:
+                        itens = claim_batch(batch_size)
+        except CONNECTION_ERRORS + (smtplib.SMTPException, OSError) as e:
+            # Falha ao abrir (ou fechar) a conexão: devolve o lote com backoff
+            current_app.logger.error(f"Erro de conexão SMTP no outbox: {e}")
+            for item in itens:
+                if item.status == "enviando":
+                    _mark_failure(item, e)
+            db.session.commit()
+            return processados
+        if not conexao_ok:
+            # A conexão caiu no meio do lote: reabre e segue com o que restou
+            itens = claim_batch(batch_size)
+    return processados
+
+
+def run_outbox_worker(once=False):
+    """Loop do worker: drena a fila e dorme OUTBOX_POLL_INTERVAL quando vazia."""
+    intervalo = current_app.config["OUTBOX_POLL_INTERVAL"]
+    current_app.logger.info("Worker do outbox de e-mails iniciado.")
+    while True:
+        try:
+            processados = drain_outbox()
+            if processados:
+                current_app.logger.info(f"Outbox: {processados} e-mail(s) processado(s).")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro no worker do outbox: {e}", exc_info=True)
+        finally:
+            db.session.remove()
+        if once:
+            return
+        time.sleep(intervalo)
+
+
+def outbox_stats():
+    """Profundidade da fila e latências de envio (última hora)."""
+    desde = datetime.utcnow() - timedelta(hours=1)
+    por_status = dict(
+        db.session.query(EmailOutbox.status, func.count(EmailOutbox.id))
+        .group_by(EmailOutbox.status)
+        .all()
+    )
+    enviados = (
+        db.session.query(EmailOutbox.envio_ms, EmailOutbox.created_at, EmailOutbox.enviado_em)
+        .filter(EmailOutbox.status == "enviado", EmailOutbox.enviado_em >= desde)
+        .all()
+    )
+    envio_ms = sorted(e.envio_ms for e in enviados if e.envio_ms is not None)
+    espera_s = sorted((e.enviado_em - e.created_at).total_seconds() for e in enviados if e.created_at)
+
+    def _p95(valores):
+        return valores[int(0.95 * (len(valores) - 1))] if valores else None
+
+    mais_antigo = (
+        db.session.query(func.min(EmailOutbox.created_at))
+        .filter(EmailOutbox.status.in_(["pendente", "enviando"]))
+        .scalar()
+    )
+    return {
+        "fila": por_status.get("pendente", 0) + por_status.get("enviando", 0),
+        "falhou": por_status.get("falhou", 0),
+        "enviados_ultima_hora": len(enviados),
+        "envio_ms_medio": round(sum(envio_ms) / len(envio_ms), 1) if envio_ms else None,
+        "envio_ms_p95": _p95(envio_ms),
+        "espera_s_media": round(sum(espera_s) / len(espera_s), 1) if espera_s else None,
+        "espera_s_p95": _p95(espera_s),
+        "pendente_mais_antigo": mais_antigo.isoformat() if mais_antigo else None,
+    }
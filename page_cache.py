@@ -0,0 +1,160 @@
+"""
+Cache das páginas públicas (início, condomínios certificados, empresas
+parceiras, FAQ, blog e planos).
+
+O conteúdo dessas páginas só muda quando um condomínio, uma empresa ou uma
+avaliação muda, então a resposta inteira (HTML já renderizado) fica em um
+cache em memória, com chave (rota, argumentos relevantes):
+
+    @app.route("/empresas-parceiras")
+    @cache_publico(args=("cursor", "per_page"))
+    def lista_empresas(): ...
+
+Só entram no cache GETs anônimos (sem login e sem mensagens flash
+pendentes) com resposta 200. Query strings com outros argumentos passam
+direto, para que links gerados a partir de request.args (paginação) não
+fiquem no cache.
+
+Cada entrada vale PAGE_CACHE_TTL segundos e o cache guarda no máximo
+PAGE_CACHE_MAX_ITENS páginas (LRU). Um commit que insere, altera ou apaga
+Condominio, Empresa ou Avaliacao — inclusive com UPDATE em massa — esvazia
+o cache. A invalidação vale para o processo que fez o commit; nos outros
+processos (demais workers do gunicorn, `flask logo-worker`) a página
+antiga dura no máximo o TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, has_app_context, request, session
+from sqlalchemy.orm import Session
+
+from models import db, Condominio, Empresa, Avaliacao
+
+MODELOS_OBSERVADOS = (Condominio, Empresa, Avaliacao)
+
+
+class PageCache:
+    """Dicionário LRU com expiração, seguro entre threads."""
+
+    def __init__(self, max_itens, ttl):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._itens[chave]
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[1]
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"itens": len(self._itens), "hits": self.hits, "misses": self.misses}
+
+
+def get_page_cache():
+    """Cache de páginas da aplicação (criado uma vez por app)."""
+    cache = current_app.extensions.get("page_cache")
+    if cache is None:
+        cache = PageCache(current_app.config["PAGE_CACHE_MAX_ITENS"], current_app.config["PAGE_CACHE_TTL"])
+        current_app.extensions["page_cache"] = cache
+    return cache
+
+
+def _cacheavel():
+    return (
+        current_app.config["PAGE_CACHE_ENABLED"]
+        and request.method == "GET"
+        and not session.get("user_type")
+        and not session.get("_flashes")
+    )
+
+
+def cache_publico(args=()):
+    """Guarda a resposta da view para visitantes anônimos (ver docstring do módulo)."""
+    permitidos = frozenset(args)
+
+    def decorator(view):
+        @wraps(view)
+        def _wrap(*view_args, **view_kwargs):
+            if not _cacheavel() or not permitidos.issuperset(request.args.keys()):
+                return view(*view_args, **view_kwargs)
+
+            chave = (request.endpoint, tuple(sorted(view_kwargs.items())),
+                     tuple(sorted(request.args.items(multi=True))))
+            cache = get_page_cache()
+            guardada = cache.get(chave)
+            if guardada is not None:
+                corpo, status, headers = guardada
+                response = current_app.response_class(corpo, status=status, headers=headers)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = current_app.make_response(view(*view_args, **view_kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                # Set-Cookie é da requisição que gerou a página, não vai para o cache
+                headers = [(nome, valor) for nome, valor in response.headers if nome.lower() != "set-cookie"]
+                cache.set(chave, (response.get_data(), response.status_code, headers))
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return _wrap
+    return decorator
+
+
+# --- Invalidação -----------------------------------------------------------
+
+def _marcar(session):
+    session.info["page_cache_sujo"] = True
+
+
+@db.event.listens_for(Session, "after_flush")
+def _observar_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, MODELOS_OBSERVADOS):
+            _marcar(session)
+            return
+
+
+@db.event.listens_for(Session, "do_orm_execute")
+def _observar_update_em_massa(orm_execute_state):
+    # Query.update()/delete() e db.update(Modelo) não passam pelo flush
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is not None and \
+            issubclass(orm_execute_state.bind_mapper.class_, MODELOS_OBSERVADOS):
+        _marcar(orm_execute_state.session)
+
+
+@db.event.listens_for(Session, "after_commit")
+def _invalidar(session):
+    if session.info.pop("page_cache_sujo", False) and has_app_context():
+        cache = current_app.extensions.get("page_cache")
+        if cache is not None:
+            cache.limpar()
+
+
+@db.event.listens_for(Session, "after_soft_rollback")
+def _descartar(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop("page_cache_sujo", None)
@@ -0,0 +1,136 @@
+"""
+Paginação por cursor (keyset) para as telas de listagem.
+
+Em vez de OFFSET, cada página filtra a partir da última linha vista usando a
+mesma chave de ordenação — ex.: (created_at, id) ou (nome, id) — então o
+custo de qualquer página é o mesmo, não importa o tamanho da tabela.
+
+    page = paginate_keyset(query, Licitacao.created_at, Licitacao.id, descending=True)
+    page.items, page.next_url, page.prev_url
+
+O cursor é opaco (JSON em base64) e vai na query string como `?cursor=...`.
+O último campo da chave precisa ser único (normalmente o id), e todas as
+colunas da chave precisam ser NOT NULL: com um NULL a comparação de linha
+dá NULL e as páginas seguintes voltam vazias. Por isso o created_at das
+tabelas listadas é obrigatório no modelo e no banco.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from flask import current_app, request, url_for
+from sqlalchemy import literal, tuple_
+from sqlalchemy.engine import Row
+
+
+class Page:
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def _url(self, cursor):
+        args = request.args.to_dict()
+        args["cursor"] = cursor
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+    @property
+    def next_url(self):
+        return self._url(self.next_cursor) if self.next_cursor else None
+
+    @property
+    def prev_url(self):
+        return self._url(self.prev_cursor) if self.prev_cursor else None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _encode(direction, values):
+    valores = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps({"d": direction, "v": valores}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor, columns):
+    """Devolve (direção, valores) ou None se o cursor for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        direction, valores = data["d"], data["v"]
+        if direction not in ("n", "p") or len(valores) != len(columns):
+            return None
+        convertidos = []
+        for col, valor in zip(columns, valores):
+            if valor is not None and col.type.python_type is datetime:
+                valor = datetime.fromisoformat(valor)
+            convertidos.append(valor)
+        return direction, convertidos
+    except (ValueError, KeyError, TypeError, NotImplementedError):
+        return None
+
+
+def _after(columns, values, descending):
+    """Comparação de linha (c1, c2) > (v1, v2) — ou < quando decrescente — que o índice atende."""
+    chave = tuple_(*columns)
+    valores = tuple_(*[literal(v, type_=c.type) for c, v in zip(columns, values)])
+    return chave < valores if descending else chave > valores
+
+
+def page_size(default=None):
+    """Tamanho de página pedido em ?per_page, limitado por PAGE_SIZE_MAX."""
+    default = default or current_app.config["PAGE_SIZE_DEFAULT"]
+    try:
+        per_page = int(request.args.get("per_page", default))
+    except (TypeError, ValueError):
+        per_page = default
+    return max(1, min(per_page, current_app.config["PAGE_SIZE_MAX"]))
+
+
+def paginate_keyset(query, *columns, descending=False, per_page=None, cursor=None):
+    """
+    Pagina `query` pela chave `columns`. Não chame order_by antes: a ordem
+    é definida aqui. `cursor` e `per_page` vêm da requisição se omitidos.
+    """
+    per_page = per_page or page_size()
+    if cursor is None:
+        cursor = request.args.get("cursor")
+    decoded = _decode(cursor, columns) if cursor else None
+
+    def _order(desc):
+        return [c.desc() if desc else c.asc() for c in columns]
+
+    if decoded is None:
+        rows = query.order_by(*_order(descending)).limit(per_page + 1).all()
+        has_more, items = len(rows) > per_page, rows[:per_page]
+        has_next, has_prev = has_more, False
+    elif decoded[0] == "n":
+        rows = (query.filter(_after(columns, decoded[1], descending))
+                .order_by(*_order(descending)).limit(per_page + 1).all())
+        has_more, items = len(rows) > per_page, rows[:per_page]
+        has_next, has_prev = has_more, True
+    else:
+        # Página anterior: percorre ao contrário e desinverte o resultado
+        rows = (query.filter(_after(columns, decoded[1], not descending))
+                .order_by(*_order(not descending)).limit(per_page + 1).all())
+        has_more, items = len(rows) > per_page, rows[:per_page][::-1]
+        has_next, has_prev = True, has_more
+
+    def _key(item):
+        # Consultas com colunas extras devolvem Row: a entidade é o primeiro elemento,
+        # e colunas calculadas da chave (ex.: o rank da busca) vêm pelo nome
+        if not isinstance(item, Row):
+            return [getattr(item, c.key) for c in columns]
+        linha = item._mapping
+        return [linha[c.key] if c.key in linha else getattr(item[0], c.key) for c in columns]
+
+    return Page(
+        items,
+        per_page,
+        next_cursor=_encode("n", _key(items[-1])) if items and has_next else None,
+        prev_cursor=_encode("p", _key(items[0])) if items and has_prev else None,
+    )
@@ -0,0 +1,81 @@
+"""
+Custo de importação no boot da aplicação (`flask startup-report`).
+
+Roda `python -X importtime` em um interpretador novo fazendo o mesmo que
+cada worker do gunicorn faz ao subir (`import wsgi`, que chama
+create_app()) e agrupa o tempo pelo pacote de primeiro nível (flask,
+sqlalchemy, models, views...). Serve para conferir que dependências pesadas
+(mercadopago, Pillow, boto3, Alembic) continuam fora do boot.
+
+    flask startup-report --top 20
+    python startup_report.py
+"""
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LINHA = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+CODIGO = (
+    "import time; inicio = time.perf_counter(); import wsgi; "
+    "print(f'BOOT {(time.perf_counter() - inicio) * 1000:.1f}')"
+)
+
+
+def _modulos_do_projeto():
+    return {
+        nome[:-3] if nome.endswith(".py") else nome
+        for nome in os.listdir(BASE_DIR)
+        if nome.endswith(".py") or os.path.isfile(os.path.join(BASE_DIR, nome, "__init__.py"))
+    }
+
+
+def medir():
+    """Importa a app em um processo novo; devolve o tempo total e o custo por módulo."""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODIGO],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    projeto = _modulos_do_projeto()
+    pacotes = defaultdict(lambda: {"proprio_us": 0, "modulos": 0})
+    diretos = {}
+    # O -X importtime lista cada módulo depois dos que ele importou, com recuo
+    # maior; a pilha guarda os que ainda não encontraram quem os importou.
+    pendentes = []
+    for linha in resultado.stderr.splitlines():
+        m = LINHA.match(linha)
+        if not m:
+            continue
+        proprio, acumulado, recuo, nome = int(m.group(1)), int(m.group(2)), len(m.group(3)), m.group(4)
+        raiz = nome.split(".")[0]
+        pacotes[raiz]["proprio_us"] += proprio
+        pacotes[raiz]["modulos"] += 1
+        filhos = []
+        while pendentes and pendentes[-1][0] > recuo:
+            filhos.append(pendentes.pop())
+        if raiz in projeto:
+            # Dependências importadas direto pelo código da aplicação
+            for _, filho, custo in filhos:
+                if filho.split(".")[0] not in projeto:
+                    diretos[filho] = max(diretos.get(filho, 0), custo)
+        pendentes.append((recuo, nome, acumulado))
+    boot = next(float(l.split()[1]) for l in resultado.stdout.splitlines() if l.startswith("BOOT "))
+    return {"boot_ms": boot, "pacotes": dict(pacotes), "diretos": diretos}
+
+
+def imprimir(relatorio, top=25):
+    print(f"Boot (import wsgi + create_app): {relatorio['boot_ms']:.0f} ms\n")
+    print(f"{'pacote':<28}{'módulos':>9}{'tempo próprio':>16}")
+    pacotes = sorted(relatorio["pacotes"].items(), key=lambda item: item[1]["proprio_us"], reverse=True)
+    for nome, dados in pacotes[:top]:
+        print(f"{nome:<28}{dados['modulos']:>9}{dados['proprio_us'] / 1000:>13.1f} ms")
+    print(f"\n{'importado pela aplicação':<37}{'acumulado':>16}")
+    diretos = sorted(relatorio["diretos"].items(), key=lambda item: item[1], reverse=True)
+    for nome, acumulado in diretos[:top]:
+        print(f"{nome:<37}{acumulado / 1000:>13.1f} ms")
+
+
+if __name__ == "__main__":
+    imprimir(medir())
@@ -0,0 +1,298 @@
+"""
+Armazenamento dos arquivos enviados (documentos e logos).
+
+As rotas não mexem mais em `UPLOAD_DIR / relative_dir` diretamente: usam
+`get_storage()`, que devolve o backend configurado em STORAGE_BACKEND.
+
+    local  pasta no disco (UPLOAD_FOLDER), servida por /uploads (uploads.py)
+    s3     bucket S3 ou compatível (MinIO, R2...). Os downloads são
+           redirecionados para URLs pré-assinadas: os bytes não passam pelo Flask
+
+Os dois backends gravam e leem em streaming (o arquivo nunca é carregado
+inteiro na memória) e usam a mesma chave: o caminho relativo que fica
+salvo em pdf_filename / doc_filename / logo_filename.
+
+Os uploads são endereçados pelo conteúdo (`salvar_conteudo`): o arquivo é
+copiado em blocos para um temporário enquanto o SHA-256 é calculado e só é
+gravado no storage se aquele conteúdo ainda não existir. A chave fica
+`<namespace>/<aa>/<sha256>.<ext>` e a tabela arquivo_upload conta as
+referências (models.ArquivoUpload). A linha é gravada antes do arquivo e,
+quando o conteúdo já existe, o upload renova `updated_at` e trava a linha
+até o commit: o GC (upload_gc.py) não apaga um conteúdo que acabou de
+ser reaproveitado.
+
+Para testar o S3 localmente com MinIO:
+
+    docker run -p 9000:9000 minio/minio server /data
+    STORAGE_BACKEND=s3 S3_ENDPOINT_URL=http://127.0.0.1:9000 S3_BUCKET=uploads \\
+    S3_ACCESS_KEY=minioadmin S3_SECRET_KEY=minioadmin flask run
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+
+from models import db, ArquivoUpload
+
+CHUNK_SIZE = 1024 * 1024
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+class ArquivoNaoEncontrado(Exception):
+    pass
+
+
+def _content_type(chave):
+    return mimetypes.guess_type(chave)[0] or "application/octet-stream"
+
+
+class LocalStorage:
+    """Arquivos em uma pasta local (um único nó ou disco compartilhado)."""
+
+    def __init__(self, raiz):
+        self.raiz = Path(raiz)
+        # Temporários no mesmo sistema de arquivos: put_file vira um rename
+        self.pasta_temporaria = self.raiz / ".tmp"
+
+    def caminho(self, chave):
+        """Caminho no disco da chave; recusa chaves que saiam da raiz."""
+        caminho = (self.raiz / chave).resolve()
+        if not caminho.is_relative_to(self.raiz.resolve()):
+            raise ArquivoNaoEncontrado(chave)
+        return caminho
+
+    def put(self, chave, fileobj, content_type=None):
+        destino = self.caminho(chave)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        # Grava em arquivo temporário e renomeia: quem lê nunca vê um arquivo pela metade
+        fd, temporario = tempfile.mkstemp(dir=destino.parent, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as saida:
+                shutil.copyfileobj(fileobj, saida, CHUNK_SIZE)
+            os.replace(temporario, destino)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+        return chave
+
+    def put_file(self, chave, caminho, content_type=None):
+        """Move um arquivo local já gravado para a chave (consome o arquivo)."""
+        destino = self.caminho(chave)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(caminho, destino)
+        return chave
+
+    def open(self, chave):
+        try:
+            return open(self.caminho(chave), "rb")
+        except FileNotFoundError:
+            raise ArquivoNaoEncontrado(chave)
+
+    def exists(self, chave):
+        return self.caminho(chave).is_file()
+
+    def delete(self, chave):
+        try:
+            self.caminho(chave).unlink()
+        except FileNotFoundError:
+            pass
+
+    def listar(self, prefixo=""):
+        """Gera (chave, tamanho, mtime) de todos os arquivos sob `prefixo`."""
+        base = self.caminho(prefixo) if prefixo else self.raiz
+        for pasta, subpastas, arquivos in os.walk(base):
+            if pasta == str(self.raiz):
+                subpastas[:] = [p for p in subpastas if p != self.pasta_temporaria.name]
+            for nome in arquivos:
+                caminho = Path(pasta) / nome
+                stat = caminho.stat()
+                yield caminho.relative_to(self.raiz).as_posix(), stat.st_size, stat.st_mtime
+
+    def url_download(self, chave):
+        """Sem URL externa: o arquivo é entregue pela rota /uploads."""
+        return None
+
+
+class S3Storage:
+    """Bucket S3 ou compatível. Requer boto3."""
+
+    def __init__(self, bucket, prefixo="", endpoint_url=None, region=None,
+                 access_key=None, secret_key=None, expira_em=3600, cache_control=None):
+        import boto3  # Dependência só deste backend
+        from botocore.config import Config as BotoConfig
+
+        self.bucket = bucket
+        self.pasta_temporaria = None # Pasta temporária padrão do sistema
+        self.prefixo = prefixo.strip("/")
+        self.expira_em = expira_em
+        self.cache_control = cache_control
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+            config=BotoConfig(signature_version="s3v4", retries={"max_attempts": 3, "mode": "standard"},
+                              s3={"addressing_style": "path"} if endpoint_url else None),
+        )
+
+    def _key(self, chave):
+        return f"{self.prefixo}/{chave}" if self.prefixo else chave
+
+    def put(self, chave, fileobj, content_type=None):
+        extra = {"ContentType": content_type or _content_type(chave)}
+        if self.cache_control:
+            extra["CacheControl"] = self.cache_control
+        # upload_fileobj envia em partes (multipart) sem ler o arquivo inteiro
+        self.client.upload_fileobj(fileobj, self.bucket, self._key(chave), ExtraArgs=extra)
+        return chave
+
+    def put_file(self, chave, caminho, content_type=None):
+        extra = {"ContentType": content_type or _content_type(chave)}
+        if self.cache_control:
+            extra["CacheControl"] = self.cache_control
+        self.client.upload_file(str(caminho), self.bucket, self._key(chave), ExtraArgs=extra)
+        os.unlink(caminho)
+        return chave
+
+    def open(self, chave):
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(chave))["Body"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                raise ArquivoNaoEncontrado(chave)
+            raise
+
+    def exists(self, chave):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(chave))
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return False
+            raise
+
+    def delete(self, chave):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(chave))
+
+    def listar(self, prefixo=""):
+        inicio = len(self.prefixo) + 1 if self.prefixo else 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        for pagina in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefixo)):
+            for obj in pagina.get("Contents", []):
+                yield obj["Key"][inicio:], obj["Size"], obj["LastModified"].timestamp()
+
+    def url_download(self, chave):
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(chave)},
+            ExpiresIn=self.expira_em,
+        )
+
+
+def get_storage():
+    """Backend de armazenamento da aplicação (criado uma vez por app)."""
+    storage = current_app.extensions.get("storage")
+    if storage is None:
+        config = current_app.config
+        if config["STORAGE_BACKEND"] == "s3":
+            storage = S3Storage(
+                bucket=config["S3_BUCKET"],
+                prefixo=config["S3_PREFIX"],
+                endpoint_url=config["S3_ENDPOINT_URL"],
+                region=config["S3_REGION"],
+                access_key=config["S3_ACCESS_KEY"],
+                secret_key=config["S3_SECRET_KEY"],
+                expira_em=config["S3_PRESIGN_EXPIRES"],
+                cache_control=f"max-age={config['UPLOAD_CACHE_MAX_AGE']}, immutable",
+            )
+        else:
+            storage = LocalStorage(config["UPLOAD_FOLDER"])
+        current_app.extensions["storage"] = storage
+    return storage
+
+
+def _copiar_com_hash(fileobj, pasta_temporaria):
+    """Copia o stream em blocos para um temporário calculando o SHA-256."""
+    if pasta_temporaria is not None:
+        Path(pasta_temporaria).mkdir(parents=True, exist_ok=True)
+    sha256, tamanho = hashlib.sha256(), 0
+    fd, temporario = tempfile.mkstemp(dir=pasta_temporaria, prefix="up_")
+    try:
+        with os.fdopen(fd, "wb") as saida:
+            while bloco := fileobj.read(CHUNK_SIZE):
+                sha256.update(bloco)
+                saida.write(bloco)
+                tamanho += len(bloco)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+    return temporario, sha256.hexdigest(), tamanho
+
+
+def sha256_da_chave(chave):
+    """SHA-256 de uma chave endereçada por conteúdo, ou None (arquivos antigos, com uuid)."""
+    sha256 = os.path.basename(chave).split(".", 1)[0]
+    return sha256 if _SHA256.fullmatch(sha256) else None
+
+
+def _reaproveitar(chave):
+    """Renova updated_at de um conteúdo já registrado; devolve False se a linha não existe."""
+    return db.session.execute(
+        update(ArquivoUpload)
+        .where(ArquivoUpload.chave == chave)
+        .values(updated_at=datetime.utcnow())
+        .returning(ArquivoUpload.id)
+        .execution_options(synchronize_session=False)
+    ).first() is not None
+
+
+def salvar_conteudo(fileobj, namespace, extensao="", content_type=None):
+    """
+    Grava o conteúdo uma única vez por SHA-256 e devolve a chave para guardar
+    no banco. O commit fica a cargo de quem chamou; as referências são
+    contadas quando a chave é gravada em uma coluna (models.py).
+    """
+    storage = get_storage()
+    temporario, sha256, tamanho = _copiar_com_hash(fileobj, storage.pasta_temporaria)
+    try:
+        chave = f"{namespace}/{sha256[:2]}/{sha256}" + (f".{extensao}" if extensao else "")
+        content_type = content_type or _content_type(chave)
+        novo = False
+        while not novo and not _reaproveitar(chave):
+            try:
+                with db.session.begin_nested():
+                    db.session.add(ArquivoUpload(chave=chave, sha256=sha256, tamanho=tamanho,
+                                                 content_type=content_type, referencias=0))
+                novo = True
+            except IntegrityError:
+                pass # Outro upload do mesmo conteúdo registrou a chave antes: reaproveita a linha dele
+        # Conteúdo novo, ou linha cujo arquivo sumiu (GC interrompido depois de apagar)
+        if novo or not storage.exists(chave):
+            storage.put_file(chave, temporario, content_type=content_type)
+    finally:
+        if os.path.exists(temporario):
+            os.unlink(temporario)
+    return chave
+
+
+def salvar_upload(arquivo, namespace):
+    """
+    Grava um FileStorage do Flask em `namespace` ("documentos" ou "logos")
+    e devolve a chave para guardar no banco.
+    """
+    nome = secure_filename(arquivo.filename or "")
+    extensao = nome.rsplit(".", 1)[-1].lower() if "." in nome else ""
+    return salvar_conteudo(arquivo.stream, namespace, extensao, content_type=arquivo.mimetype or None)
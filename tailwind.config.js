@@ -0,0 +1,12 @@
+/** Usado por `flask assets-build` (assets.py): só as classes encontradas nos templates entram no CSS. */
+module.exports = {
+  content: ["./templates/**/*.html"],
+  theme: {
+    extend: {
+      fontFamily: {
+        sans: ["Inter", "ui-sans-serif", "system-ui", "sans-serif"],
+      },
+    },
+  },
+  plugins: [],
+};
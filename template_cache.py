@@ -0,0 +1,95 @@
+"""
+Cache de bytecode dos templates Jinja.
+
+Sem ele, cada worker do gunicorn lê, analisa e compila cada template na
+primeira vez que o usa, a cada restart. Com JINJA_CACHE_DIR o código já
+compilado fica em disco (um arquivo por template, invalidado pelo checksum
+do fonte e pela versão do Python) e é compartilhado por todos os workers.
+No deploy, antes de subir o gunicorn:
+
+    flask templates-precompile
+
+compila todos os templates de uma vez (e falha se algum tiver erro de
+sintaxe). Fora do modo debug os templates também não são verificados no
+disco a cada uso (TEMPLATES_AUTO_RELOAD).
+
+    flask templates-bench
+
+mostra, template a template, o tempo de carga no primeiro uso sem o cache
+(fonte -> código) e a partir do bytecode.
+"""
+import os
+import tempfile
+import time
+
+from jinja2 import FileSystemBytecodeCache, TemplateSyntaxError
+
+PADRAO_ARQUIVO = "__jinja2_%s.cache"
+EXTENSOES = (".html", ".txt", ".xml")
+
+
+def init_template_cache(app):
+    pasta = app.config.get("JINJA_CACHE_DIR")
+    if not pasta:
+        return
+    try:
+        os.makedirs(pasta, exist_ok=True)
+    except OSError as e:
+        app.logger.warning(f"Cache de templates desativado: não foi possível criar {pasta}: {e}")
+        return
+    if not os.access(pasta, os.W_OK):
+        app.logger.warning(f"Cache de templates desativado: sem permissão de escrita em {pasta}.")
+        return
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(pasta, PADRAO_ARQUIVO)
+
+
+def _templates(env):
+    return env.list_templates(filter_func=lambda nome: nome.endswith(EXTENSOES))
+
+
+def _carregar(env, nome):
+    """Carrega `nome` sem passar pelo cache em memória; devolve o tempo em ms."""
+    inicio = time.perf_counter()
+    env.get_template(nome)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def precompilar(app):
+    """
+    Compila todos os templates e grava o bytecode dos que mudaram.
+    Devolve ([(nome, ms)], [(nome, erro)]).
+    """
+    env = app.jinja_env.overlay(cache_size=0)
+    tempos, erros = [], []
+    for nome in _templates(env):
+        try:
+            tempos.append((nome, _carregar(env, nome)))
+        except TemplateSyntaxError as e:
+            erros.append((nome, f"linha {e.lineno}: {e.message}"))
+    return tempos, erros
+
+
+def comparar(app, repeticoes=5):
+    """
+    Tempo de carga de cada template no primeiro uso (menor de `repeticoes`):
+    sem cache (análise + compilação) x com o bytecode já em disco.
+    Devolve [(nome, sem_ms, com_ms)].
+    """
+    cache = app.jinja_env.bytecode_cache
+    temporaria = None
+    if cache is None: # Sem JINJA_CACHE_DIR: mede com um cache descartável
+        temporaria = tempfile.TemporaryDirectory()
+        cache = FileSystemBytecodeCache(temporaria.name, PADRAO_ARQUIVO)
+    sem_cache = app.jinja_env.overlay(cache_size=0, bytecode_cache=None)
+    com_cache = app.jinja_env.overlay(cache_size=0, bytecode_cache=cache)
+    try:
+        resultado = []
+        for nome in _templates(sem_cache):
+            _carregar(com_cache, nome) # Garante o bytecode em disco
+            sem = min(_carregar(sem_cache, nome) for _ in range(repeticoes))
+            com = min(_carregar(com_cache, nome) for _ in range(repeticoes))
+            resultado.append((nome, sem, com))
+        return resultado
+    finally:
+        if temporaria is not None:
+            temporaria.cleanup()
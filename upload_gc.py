@@ -0,0 +1,135 @@
+"""
+Coleta de lixo dos uploads (`flask uploads-gc`).
+
+Arquivos substituídos, logos reprocessadas e cadastros que deram rollback
+depois de gravar o arquivo deixam no storage chaves que nenhuma coluna
+referencia. O GC lista o storage uma vez, monta o conjunto de chaves
+referenciadas com uma consulta por tabela e apaga a diferença.
+
+Só são apagados arquivos mais velhos que o período de carência, para não
+pegar um upload cuja transação ainda não foi confirmada. A decisão final é
+do próprio DELETE (`referencias = 0` e `updated_at` fora da carência, com
+RETURNING): um upload do mesmo conteúdo que ganhou referência ou foi
+reaproveitado depois da listagem não é apagado. O arquivo sai do storage
+antes do commit, enquanto as linhas apagadas ainda estão travadas, então um
+upload que chegar depois grava o arquivo de novo.
+"""
+import os
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete
+
+from models import db, ArquivoUpload
+from storage import get_storage, sha256_da_chave
+
+LOTE_DELETE = 500
+
+
+def formatar_bytes(total):
+    if total < 1024:
+        return f"{total} B"
+    for unidade in ("KB", "MB", "GB", "TB"):
+        total /= 1024
+        if total < 1024 or unidade == "TB":
+            return f"{total:.1f} {unidade}"
+
+
+def _limpar_temporarios(storage, limite):
+    """Temporários de uploads interrompidos (só no armazenamento local)."""
+    pasta = storage.pasta_temporaria
+    if pasta is None or not os.path.isdir(pasta):
+        return 0, 0
+    arquivos, total = 0, 0
+    for entrada in os.scandir(pasta):
+        stat = entrada.stat()
+        if entrada.is_file() and stat.st_mtime < limite:
+            os.unlink(entrada.path)
+            arquivos += 1
+            total += stat.st_size
+    return arquivos, total
+
+
+def _registrar_sem_linha(lote, listados):
+    """
+    Cria a linha (sem referências, com a data do arquivo) das chaves
+    endereçadas por conteúdo que não têm uma, como arquivos de uploads que
+    deram rollback. Assim elas também passam pelo DELETE condicional.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    linhas = []
+    for chave in lote:
+        sha256 = sha256_da_chave(chave)
+        if sha256:
+            tamanho, mtime = listados[chave]
+            linhas.append(dict(chave=chave, sha256=sha256, tamanho=tamanho, referencias=0,
+                               updated_at=datetime.utcfromtimestamp(mtime)))
+    if linhas:
+        db.session.execute(insert(ArquivoUpload).values(linhas).on_conflict_do_nothing(index_elements=["chave"]))
+
+
+def coletar_orfaos(carencia_horas=24, dry_run=False):
+    """
+    Apaga os arquivos sem referência mais velhos que `carencia_horas`.
+    Retorna um dicionário com o que foi (ou seria) removido.
+    """
+    storage = get_storage()
+    limite = time.time() - carencia_horas * 3600
+
+    listados = {}
+    recentes = 0
+    for chave, tamanho, mtime in storage.listar():
+        if mtime < limite:
+            listados[chave] = (tamanho, mtime)
+        else:
+            recentes += 1
+
+    referenciadas = ArquivoUpload.chaves_referenciadas()
+    orfaos = sorted(set(listados) - referenciadas)
+    resultado = {
+        "arquivos_listados": len(listados) + recentes,
+        "referenciados": len(referenciadas),
+        "ignorados_por_carencia": recentes,
+        "orfaos": len(orfaos),
+        "bytes": sum(listados[chave][0] for chave in orfaos),
+        "chaves": orfaos,
+    }
+    if dry_run:
+        return resultado
+
+    limite_registro = datetime.utcfromtimestamp(limite)
+    removidos = 0
+    for inicio in range(0, len(orfaos), LOTE_DELETE):
+        lote = orfaos[inicio:inicio + LOTE_DELETE]
+        _registrar_sem_linha(lote, listados)
+        apagadas = db.session.execute(
+            delete(ArquivoUpload)
+            .where(ArquivoUpload.chave.in_(lote),
+                   ArquivoUpload.referencias == 0,
+                   ArquivoUpload.updated_at < limite_registro)
+            .returning(ArquivoUpload.chave)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        # Arquivos antigos (nome com uuid) não têm linha nem são regravados: saem direto
+        apagadas += [chave for chave in lote if not sha256_da_chave(chave)]
+        # Se o storage falhar no meio, o rollback devolve as linhas; o upload
+        # que reaproveitar uma delas regrava o arquivo (storage.salvar_conteudo)
+        for chave in apagadas:
+            storage.delete(chave)
+        db.session.commit()
+        removidos += len(apagadas)
+        resultado["bytes"] -= sum(listados[chave][0] for chave in set(lote) - set(apagadas))
+    resultado["orfaos"] = removidos
+
+    temporarios, bytes_temporarios = _limpar_temporarios(storage, limite)
+    resultado["temporarios"] = temporarios
+    resultado["bytes"] += bytes_temporarios
+    current_app.logger.info(
+        f"Uploads GC: {removidos} órfão(s) e {temporarios} temporário(s) removidos, "
+        f"{formatar_bytes(resultado['bytes'])} liberados."
+    )
+    return resultado
@@ -0,0 +1,87 @@
+"""
+Entrega dos arquivos enviados (documentos e logos) em /uploads/<caminho>.
+
+Com STORAGE_BACKEND=s3 a rota só redireciona para uma URL pré-assinada do
+bucket (storage.py). O restante vale para o armazenamento local.
+
+As chaves são endereçadas pelo conteúdo (`<namespace>/<aa>/<sha256>.<ext>`,
+ver storage.salvar_conteudo), então o conteúdo de uma URL nunca muda: a
+resposta leva o próprio SHA-256 como ETag forte e `Cache-Control:
+max-age=..., immutable`, um If-None-Match que bate responde 304 sem abrir
+o arquivo e pedidos com Range (PDFs grandes) recebem 206 com o trecho
+pedido. Arquivos antigos, gravados com nome uuid antes do endereçamento
+por conteúdo, usam um ETag de tamanho/mtime/nome.
+
+Com UPLOAD_X_ACCEL_PREFIX definido, o Flask só valida o caminho e devolve
+X-Accel-Redirect; o nginx lê e envia o arquivo (inclusive Range):
+
+    location /_uploads/ {
+        internal;
+        alias /caminho/da/app/uploads/;
+    }
+"""
+import mimetypes
+import os
+import zlib
+
+from flask import current_app, request, send_file, abort, redirect
+from werkzeug.security import safe_join
+
+from storage import get_storage, sha256_da_chave
+
+
+def _etag(filename, stat):
+    sha256 = sha256_da_chave(filename)
+    if sha256:
+        return sha256
+    check = zlib.adler32(filename.encode()) & 0xFFFFFFFF
+    return f"{stat.st_size:x}-{int(stat.st_mtime):x}-{check:x}"
+
+
+def _cache_headers(response, filename):
+    # Logos aparecem em páginas públicas; documentos só no navegador de quem abriu
+    publico = filename.startswith("logos/") or os.path.basename(filename).startswith("logo_")
+    response.cache_control.no_cache = None
+    response.cache_control.public = publico
+    response.cache_control.private = not publico
+    response.cache_control.max_age = current_app.config["UPLOAD_CACHE_MAX_AGE"]
+    response.cache_control.immutable = True
+    return response
+
+
+def servir_upload(filename):
+    storage = get_storage()
+    url = storage.url_download(filename)
+    if url:
+        response = redirect(url)
+        # O redirecionamento não pode sobreviver à assinatura da URL
+        response.cache_control.private = True
+        response.cache_control.max_age = current_app.config["S3_PRESIGN_EXPIRES"] // 2
+        return response
+
+    caminho = safe_join(str(storage.raiz), filename)
+    if caminho is None:
+        abort(404)
+
+    prefixo = current_app.config["UPLOAD_X_ACCEL_PREFIX"]
+    if prefixo:
+        response = current_app.response_class()
+        response.headers["X-Accel-Redirect"] = prefixo.rstrip("/") + "/" + filename
+        response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        return _cache_headers(response, filename)
+
+    try:
+        stat = os.stat(caminho)
+    except (FileNotFoundError, NotADirectoryError):
+        abort(404)
+
+    etag = _etag(filename, stat)
+    if request.if_none_match.contains(etag):
+        # Revalidação: responde sem abrir o arquivo
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return _cache_headers(response, filename)
+
+    response = send_file(caminho, etag=etag, conditional=True, last_modified=stat.st_mtime,
+                         max_age=current_app.config["UPLOAD_CACHE_MAX_AGE"])
+    return _cache_headers(response, filename)
@@ -0,0 +1,8 @@
+"""Blueprints da aplicação, registrados por create_app()."""
+
+
+def registrar_blueprints(app):
+    from views import public, auth, condominio, empresa, admin, payments, mensagens, eventos
+
+    for modulo in (public, auth, condominio, empresa, admin, payments, mensagens, eventos):
+        app.register_blueprint(modulo.bp)
@@ -0,0 +1,491 @@
+"""Painel do administrador: aprovações, suspensões, listagens, licitações e contatos."""
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, session, url_for
+
+from loaders import LICITACAO_COM_CONDOMINIO
+from models import db, Condominio, Empresa, CondominioRank, Licitacao, Contato
+from outbox import enqueue_email, outbox_stats
+from pagination import paginate_keyset
+from views.comum import generate_temp_password, login_required
+
+bp = Blueprint("admin", __name__)
+
+
+@bp.route("/admin")
+@login_required
+def admin_dashboard():
+    if session.get("user_type") != "admin":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+    
+    try:
+        pend_emp = Empresa.query.filter(Empresa.status.in_(["pendente", "verificado"])).count()
+        pend_cond = Condominio.query.filter(Condominio.status.in_(["pendente", "verificado"])).count()
+        selos = Condominio.query.count()
+        
+        empresas = Empresa.query.order_by(Empresa.created_at.desc()).limit(10).all()
+        condominios = Condominio.query.order_by(Condominio.created_at.desc()).limit(10).all()
+    except Exception as e:
+        print(f"Erro no dashboard: {e}")
+        pend_emp = pend_cond = selos = 0
+        empresas = condominios = []
+    
+    return render_template(
+        "admin_dashboard.html",
+        pend_emp=pend_emp, pend_cond=pend_cond, selos=selos,
+        empresas=empresas, condominios=condominios
+    )
+
+
+@bp.post("/admin/condominio/<int:_id>/<string:acao>")
+@login_required
+def admin_condominio_action(_id, acao):
+    if session.get("user_type") != "admin": return redirect(url_for("auth.logout"))
+    
+    try:
+        c = Condominio.query.get_or_404(_id)
+        
+        if acao == "aprovar":
+            if not c.email_verified:
+                flash("Condomínio não verificou o e-mail. Não é possível aprovar.", "warning")
+                return redirect(url_for("admin.admin_dashboard"))
+            
+            # Get rank from form data
+            selected_rank_str = request.form.get("rank")
+            
+            if not selected_rank_str:
+                flash("É necessário selecionar um rank para aprovar o condomínio.", "danger")
+                return redirect(url_for("admin.admin_dashboard")) # Or redirect to the detail page
+            
+            try:
+                # Convert string to CondominioRank enum member
+                selected_rank = CondominioRank[selected_rank_str.upper()] 
+                c.rank = selected_rank
+            except KeyError:
+                flash("Rank inválido selecionado.", "danger")
+                return redirect(url_for("admin.admin_dashboard")) # Or redirect to the detail page
+                
+            c.status = "aprovado"
+            
+            # Gerar e Enviar Senha Temporária
+            if not c.password_hash or c.needs_password_change == False: 
+                temp_password = generate_temp_password()
+                c.set_password(temp_password)
+                c.needs_password_change = True 
+
+                enqueue_email(
+                    "Acesso Aprovado e Senha Temporária - Condomínio Blindado",
+                    recipients=[c.email],
+                    body=(
+                        f"Parabéns! O condomínio {c.nome} (Rank: {c.rank.value.capitalize()}) foi aprovado.\n\n" # Added rank to email
+                        f"Sua senha temporária é: {temp_password}\n"
+                        f"Faça login em {url_for('auth.login', _external=True)} para acessar e **MUDAR SUA SENHA IMEDIATAMENTE**."
+                    )
+                )
+                rank_display = c.rank.value.capitalize() if c.rank else "N/A"
+                flash(f"Aprovação salva. Rank {rank_display} atribuído. Senha temporária enfileirada para envio por e-mail.", "success")
+
+        elif acao == "rejeitar":
+            c.status = "rejeitado"
+            c.needs_password_change = False
+            # If rejected, remove any assigned rank
+            c.rank = None 
+            flash("Condomínio rejeitado.", "info")
+            
+        db.session.commit()
+    except Exception as e:
+        flash(f"Erro ao processar ação: {str(e)}", "danger")
+    
+    return redirect(url_for("admin.admin_dashboard"))
+
+
+@bp.post("/admin/empresa/<int:_id>/<string:acao>")
+@login_required
+def admin_empresa_action(_id, acao):
+    if session.get("user_type") != "admin": return redirect(url_for("auth.logout"))
+    
+    try:
+        e = Empresa.query.get_or_404(_id)
+        
+        if acao == "aprovar":
+            if not e.email_verified:
+                flash("Empresa não verificou o e-mail. Não é possível aprovar.", "warning")
+                return redirect(url_for("admin.admin_dashboard"))
+                
+            e.status = "aprovado"
+            
+            # Gerar e Enviar Senha Temporária
+            if not e.password_hash or e.needs_password_change == False: 
+                temp_password = generate_temp_password()
+                e.set_password(temp_password)
+                e.needs_password_change = True 
+
+                enqueue_email(
+                    "Acesso Aprovado e Senha Temporária - Condomínio Blindado",
+                    recipients=[e.email_comercial],
+                    body=(
+                        f"Parabéns! A empresa {e.nome} foi aprovada.\n\n"
+                        f"Sua senha temporária é: {temp_password}\n"
+                        f"Faça login em {url_for('auth.login', _external=True)} para acessar e **MUDAR SUA SENHA IMEDIATAMENTE**."
+                    )
+                )
+                flash("Aprovação salva. Senha temporária enfileirada para envio por e-mail.", "success")
+
+        elif acao == "rejeitar":
+            e.status = "rejeitado"
+            e.needs_password_change = False
+            flash("Empresa rejeitada.", "info")
+            
+        db.session.commit()
+    except Exception as e:
+        flash(f"Erro ao processar ação: {str(e)}", "danger")
+    
+    return redirect(url_for("admin.admin_dashboard"))
+
+
+@bp.route("/admin/condominio/<int:_id>")
+@login_required
+def admin_condominio_detalhe(_id):
+    if session.get("user_type") != "admin": return redirect(url_for("auth.logout"))
+    try:
+        condominio = Condominio.query.get_or_404(_id)
+    except Exception as e:
+        flash(f"Condomínio não encontrado: {str(e)}", "danger")
+        return redirect(url_for("admin.admin_dashboard"))
+        
+    return render_template("admin_condominio_detalhe.html", c=condominio)
+
+
+@bp.route("/admin/empresa/<int:_id>")
+@login_required
+def admin_empresa_detalhe(_id):
+    if session.get("user_type") != "admin": return redirect(url_for("auth.logout"))
+    try:
+        empresa = Empresa.query.get_or_404(_id)
+    except Exception as e:
+        flash(f"Empresa não encontrada: {str(e)}", "danger")
+        return redirect(url_for("admin.admin_dashboard"))
+        
+    return render_template("admin_empresa_detalhe.html", e=empresa)
+
+
+@bp.post("/admin/condominio/<int:_id>/set-active")
+@login_required
+def admin_set_active_condominio(_id):
+    if session.get("user_type") != "admin":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    c = Condominio.query.get_or_404(_id)
+    is_active_str = request.form.get("is_active")
+    
+    if is_active_str is None:
+        flash("Nenhuma ação selecionada.", "danger")
+        return redirect(url_for("admin.admin_condominio_detalhe", _id=_id))
+
+    is_active = is_active_str.lower() == 'true'
+    
+    if c.is_active == is_active:
+        flash(f"O status do condomínio já é {'ativo' if is_active else 'suspenso'}.", "info")
+    else:
+        c.is_active = is_active
+
+        if not is_active:
+            enqueue_email(
+                "Sua conta foi temporariamente suspensa - Condomínio Blindado",
+                recipients=[c.email],
+                body=(
+                    f"Olá {c.contato_nome},\n\n"
+                    f"Sua conta para o condomínio {c.nome} foi temporariamente suspensa por um administrador.\n"
+                    "Estamos investigando o caso. Se você acredita que isso é um engano ou precisa de mais informações, "
+                    "por favor, entre em contato conosco pelo e-mail: administrador@condblindado.com.br\n\n"
+                    "Atenciosamente,\nEquipe Condomínio Blindado"
+                )
+            )
+        else:
+            enqueue_email(
+                "Sua conta foi reativada - Condomínio Blindado",
+                recipients=[c.email],
+                body=(
+                    f"Olá {c.contato_nome},\n\n"
+                    f"Boas notícias! Sua conta para o condomínio {c.nome} foi reativada.\n"
+                    "Você já pode acessar o sistema normalmente.\n\n"
+                    "Atenciosamente,\nEquipe Condomínio Blindado"
+                )
+            )
+
+        db.session.commit()
+        flash(f"Status do condomínio atualizado para {'ativo' if is_active else 'suspenso'}.", "success")
+        flash(f"E-mail de notificação de {'reativação' if is_active else 'suspensão'} enfileirado para o usuário.", "info")
+
+    return redirect(url_for("admin.admin_condominio_detalhe", _id=_id))
+
+
+@bp.post("/admin/condominio/<int:_id>/edit-rank")
+@login_required
+def admin_edit_condominio_rank(_id):
+    if session.get("user_type") != "admin":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    c = Condominio.query.get_or_404(_id)
+    new_rank_str = request.form.get("rank")
+
+    if not new_rank_str:
+        flash("Nenhum rank selecionado.", "danger")
+        return redirect(url_for("admin.admin_condominio_detalhe", _id=_id))
+
+    try:
+        # Convert string to CondominioRank enum member
+        new_rank = CondominioRank[new_rank_str.upper()]
+        if c.rank == new_rank:
+            flash(f"O rank do condomínio já é {new_rank.value.capitalize()}.", "info")
+        else:
+            c.rank = new_rank
+            db.session.commit()
+            flash(f"Rank do condomínio atualizado para {new_rank.value.capitalize()}.", "success")
+    except KeyError:
+        flash("Rank inválido selecionado.", "danger")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao atualizar o rank: {str(e)}", "danger")
+
+    return redirect(url_for("admin.admin_condominio_detalhe", _id=_id))
+
+
+@bp.post("/admin/empresa/<int:_id>/set-active")
+@login_required
+def admin_set_active_empresa(_id):
+    if session.get("user_type") != "admin":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    e = Empresa.query.get_or_404(_id)
+    is_active_str = request.form.get("is_active")
+
+    if is_active_str is None:
+        flash("Nenhuma ação selecionada.", "danger")
+        return redirect(url_for("admin.admin_empresa_detalhe", _id=_id))
+
+    is_active = is_active_str.lower() == 'true'
+    
+    if e.is_active == is_active:
+        flash(f"O status da empresa já é {'ativo' if is_active else 'suspenso'}.", "info")
+    else:
+        e.is_active = is_active
+
+        if not is_active:
+            enqueue_email(
+                "Sua conta foi temporariamente suspensa - Condomínio Blindado",
+                recipients=[e.email_comercial],
+                body=(
+                    f"Olá {e.nome},\n\n"
+                    f"Sua conta de empresa foi temporariamente suspensa por um administrador.\n"
+                    "Estamos investigando o caso. Se você acredita que isso é um engano ou precisa de mais informações, "
+                    "por favor, entre em contato conosco pelo e-mail: administrador@condblindado.com.br\n\n"
+                    "Atenciosamente,\nEquipe Condomínio Blindado"
+                )
+            )
+        else:
+            enqueue_email(
+                "Sua conta foi reativada - Condomínio Blindado",
+                recipients=[e.email_comercial],
+                body=(
+                    f"Olá {e.nome},\n\n"
+                    f"Boas notícias! Sua conta de empresa foi reativada.\n"
+                    "Você já pode acessar o sistema normalmente.\n\n"
+                    "Atenciosamente,\nEquipe Condomínio Blindado"
+                )
+            )
+
+        db.session.commit()
+        flash(f"Status da empresa atualizado para {'ativo' if is_active else 'suspenso'}.", "success")
+        flash(f"E-mail de notificação de {'reativação' if is_active else 'suspensão'} enfileirado para o usuário.", "info")
+    
+    return redirect(url_for("admin.admin_empresa_detalhe", _id=_id))
+
+
+@bp.route("/admin/condominios")
+@login_required
+def admin_lista_condominios():
+    if session.get("user_type") != "admin": return redirect(url_for("auth.logout"))
+    status_filter = request.args.get("status", "pendente")
+    
+    query = Condominio.query
+    
+    if status_filter == "pendente":
+        query = query.filter(Condominio.status.in_(["pendente", "verificado"]))
+    elif status_filter == "aprovado":
+        query = query.filter(Condominio.status == "aprovado")
+    elif status_filter == "rejeitado":
+        query = query.filter(Condominio.status == "rejeitado")
+
+    page = paginate_keyset(query, Condominio.created_at, Condominio.id, descending=True)
+        
+    return render_template("admin_lista.html",
+                           itens=page.items,
+                           page=page,
+                           tipo="condominio",
+                           titulo="Condomínios",
+                           status_filter=status_filter)
+
+
+@bp.route("/admin/empresas")
+@login_required
+def admin_lista_empresas():
+    if session.get("user_type") != "admin": return redirect(url_for("auth.logout"))
+    status_filter = request.args.get("status", "pendente")
+    
+    query = Empresa.query
+    
+    if status_filter == "pendente":
+        query = query.filter(Empresa.status.in_(["pendente", "verificado"]))
+    elif status_filter == "aprovado":
+        query = query.filter(Empresa.status == "aprovado")
+    elif status_filter == "rejeitado":
+        query = query.filter(Empresa.status == "rejeitado")
+
+    page = paginate_keyset(query, Empresa.created_at, Empresa.id, descending=True)
+        
+    return render_template("admin_lista.html",
+                           itens=page.items,
+                           page=page,
+                           tipo="empresa",
+                           titulo="Empresas Parceiras",
+                           status_filter=status_filter)
+
+
+@bp.route("/admin/gestores")
+@login_required
+def admin_lista_gestores():
+    if session.get("user_type") != "admin": return redirect(url_for("auth.logout"))
+    
+    # Obtém todos os condomínios para listar como "gestores"
+    page = paginate_keyset(Condominio.query, Condominio.created_at, Condominio.id, descending=True)
+        
+    return render_template("admin_lista_gestores.html",
+                           gestores=page.items,
+                           page=page,
+                           titulo="Gerentes de Condomínio")
+
+
+@bp.route("/admin/licitacoes")
+@login_required
+def admin_licitacoes():
+    if session.get("user_type") != "admin":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    status_filter = request.args.get("status", "aberta")
+    query = Licitacao.query.options(*LICITACAO_COM_CONDOMINIO)
+
+    if status_filter == "aberta":
+        query = query.filter(Licitacao.status == "aberta")
+    elif status_filter == "terminada":
+        query = query.filter(Licitacao.status.in_(["fechada", "concluida"]))
+    elif status_filter == "embargada":
+        query = query.filter(Licitacao.status == "embargada")
+
+    page = paginate_keyset(query, Licitacao.created_at, Licitacao.id, descending=True)
+
+    return render_template("admin_licitacoes.html", 
+                           licitacoes=page.items, 
+                           page=page, 
+                           status_filter=status_filter)
+
+
+@bp.route("/admin/licitacao/<int:licitacao_id>/embargar", methods=["POST"])
+@login_required
+def admin_embargar_licitacao(licitacao_id):
+    if session.get("user_type") != "admin":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    licitacao = Licitacao.transicionar(licitacao_id, "embargada")
+    if licitacao is None:
+        db.session.rollback()
+        if db.session.get(Licitacao, licitacao_id) is None:
+            abort(404)
+        flash("A licitação já está embargada.", "warning")
+        return redirect(url_for("admin.admin_licitacoes"))
+    if licitacao.empresa_vencedora_id:
+        # Só a concluída tem vencedora: o serviço embargado deixa de contar na reputação da empresa
+        Empresa.ajustar_servicos(licitacao.empresa_vencedora_id, -1)
+    db.session.commit()
+
+    flash(f"A licitação '{licitacao.titulo}' foi embargada.", "success")
+    return redirect(url_for("admin.admin_licitacoes"))
+
+
+@bp.route("/admin/outbox")
+@login_required
+def admin_outbox_stats():
+    if session.get("user_type") != "admin":
+        return {"error": "Acesso não autorizado"}, 401
+    return outbox_stats(), 200
+
+
+@bp.route("/admin/eventos")
+@login_required
+def admin_eventos_stats():
+    """Conexões SSE abertas no worker que atendeu (cada processo tem o seu barramento)."""
+    if session.get("user_type") != "admin":
+        return {"error": "Acesso não autorizado"}, 401
+    barramento = current_app.extensions.get("eventos")
+    if barramento is None:
+        return {"licitacoes": 0, "conexoes": 0, "ouvinte_postgres": False}, 200
+    return barramento.stats(), 200
+
+
+@bp.route("/admin/contatos")
+@login_required
+def admin_contatos():
+    if session.get("user_type") != "admin":
+        return redirect(url_for("auth.logout"))
+    
+    page = paginate_keyset(Contato.query, Contato.created_at, Contato.id, descending=True)
+    return render_template("admin_contatos.html", contatos=page.items, page=page)
+
+
+@bp.route("/admin/contato/<int:contato_id>", methods=["GET", "POST"])
+@login_required
+def admin_responder_contato(contato_id):
+    if session.get("user_type") != "admin":
+        return redirect(url_for("auth.logout"))
+
+    contato = Contato.query.get_or_404(contato_id)
+
+    if request.method == "POST":
+        resposta = request.form.get("resposta")
+        if not resposta:
+            flash("O corpo da resposta não pode estar vazio.", "danger")
+            return redirect(url_for('admin.admin_responder_contato', contato_id=contato_id))
+
+        try:
+            enqueue_email(
+                f"Re: Contato de {contato.nome}", # Assunto do E-mail
+                recipients=[contato.email],
+                html=render_template(
+                    "email/resposta_contato.html", 
+                    nome_usuario=contato.nome, 
+                    mensagem_original=contato.mensagem, 
+                    resposta_admin=resposta
+                )
+            )
+
+            contato.status = "respondido"
+            db.session.commit()
+
+            flash("Resposta enfileirada para envio com sucesso!", "success")
+            return redirect(url_for("admin.admin_contatos"))
+
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Erro ao enfileirar e-mail: {e}", "danger")
+            current_app.logger.error(f"Falha ao enfileirar e-mail de resposta: {e}", exc_info=True)
+
+    # Marca como 'lido' ao visualizar, se ainda não foi lido.
+    if contato.status == "nao_lido":
+        contato.status = "lido"
+        db.session.commit()
+        
+    return render_template("admin_responder_contato.html", contato=contato)
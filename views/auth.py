@@ -0,0 +1,309 @@
+"""Cadastro de condomínios e empresas, verificação de e-mail, login e troca de senha."""
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+from itsdangerous import BadSignature, SignatureExpired
+from werkzeug.security import check_password_hash
+
+from models import db, Condominio, Empresa, ContaAcesso, normalizar_email
+from outbox import enqueue_email
+from storage import salvar_upload
+from views.comum import allowed_file, get_serializer, login_required
+
+bp = Blueprint("auth", __name__)
+
+
+@bp.route("/certificar-condominio", methods=["GET", "POST"])
+def certificar_condominio():
+    if request.method == "POST":
+        pdf_file = request.files.get("pdf")
+        form = request.form
+        
+        try:
+            # Tratamento de erro para campos numéricos
+            unidades = int(form.get("unidades", 0))
+            progress = int(form.get("progress", 0))
+
+            if ContaAcesso.email_em_uso(form.get("email")):
+                flash("Este e-mail já está cadastrado. Faça login ou use outro e-mail.", "warning")
+                return redirect(request.url)
+
+            c = Condominio(
+                nome=form.get("nome", "").strip(),
+                cnpj=form.get("cnpj", "").strip(),
+                tipo=form.get("tipo", "").strip(),
+                unidades=unidades,
+                cep=form.get("cep", "").strip(),
+                endereco=form.get("endereco", "").strip(),
+                cidade=form.get("cidade", "").strip(),
+                estado=form.get("estado", "").strip(),
+                contato_nome=form.get("contato_nome", "").strip(),
+                email=form.get("email", "").strip(),
+                telefone=form.get("telefone", "").strip(),
+                whatsapp=form.get("whatsapp", "").strip(),
+                nivel=form.get("nivel", "").strip(),
+                objetivo=form.get("objetivo", "").strip(),
+                observacoes=form.get("observacoes", "").strip(),
+                progress=progress,
+                status="pendente",
+                email_verified=False,
+                needs_password_change=False 
+            )
+            
+            # Ação: Salvar a senha PROVISÓRIA.
+            c.set_password("placeholder_pre_aprovacao")
+            
+            db.session.add(c)
+            db.session.flush() # Flush para obter o ID do condomínio (c.id)
+
+            # Lida com o upload do arquivo APÓS ter um ID
+            if pdf_file and pdf_file.filename:
+                if not allowed_file(pdf_file.filename) or not pdf_file.filename.lower().endswith(".pdf"):
+                    flash("Envie um PDF válido.", "warning")
+                    # Damos rollback pois o usuário já foi adicionado
+                    db.session.rollback()
+                    return redirect(request.url)
+                
+                # Salva o arquivo (uma vez por conteúdo, disco local ou S3, ver storage.py)
+                # e guarda a chave (caminho relativo) no banco de dados
+                c.pdf_filename = salvar_upload(pdf_file, "documentos")
+
+            # Envia o e-mail de verificação
+            if current_app.config.get("MAIL_USERNAME_SENDER") and c.email:
+                token = get_serializer().dumps({"kind": "condominio", "id": c.id})
+                verify_url = url_for("auth.verificar_email", token=token, _external=True)
+                enqueue_email(
+                    "Confirme seu e-mail - Condomínio Blindado",
+                    recipients=[c.email],
+                    body=(
+                        f"Olá {c.contato_nome or ''},\n\n"
+                        f"Recebemos sua solicitação para certificar o condomínio {c.nome}.\n"
+                        f"Para confirmar seu e-mail, clique no link abaixo:\n{verify_url}\n\n"
+                        f"Após a verificação, a solicitação aparecerá para o time administrativo."
+                    )
+                )
+            
+            db.session.commit() # Commit final
+            
+            flash("Solicitação enviada! Verifique seu e-mail para confirmar.", "success")
+            return redirect(url_for("public.index"))
+        
+        except ValueError:
+            flash("O número de unidades e progresso devem ser valores numéricos.", "danger")
+            return redirect(request.url)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro ao certificar condomínio: {e}", exc_info=True)
+            flash(f"Erro ao processar solicitação: {str(e)}", "danger")
+            return redirect(request.url)
+    
+    return render_template("condominio_form.html")
+
+
+@bp.route("/cadastrar-empresa", methods=["GET", "POST"])
+def cadastrar_empresa():
+    if request.method == "POST":
+        doc_file = request.files.get("doc")
+        form = request.form
+        
+        try:
+            categorias = ",".join(request.form.getlist("categorias"))
+
+            if ContaAcesso.email_em_uso(form.get("email_comercial")):
+                flash("Este e-mail já está cadastrado. Faça login ou use outro e-mail.", "warning")
+                return redirect(request.url)
+            
+            e = Empresa(
+                nome=form.get("nome", "").strip(),
+                cnpj=form.get("cnpj", "").strip(),
+                categorias=categorias,
+                descricao=form.get("descricao", "").strip(),
+                cidade=form.get("cidade", "").strip(),
+                estado=form.get("estado", "").strip(),
+                cep=form.get("cep", "").strip(),
+                endereco=form.get("endereco", "").strip(),
+                telefone=form.get("telefone", "").strip(),
+                email_comercial=form.get("email_comercial", "").strip(),
+                website=form.get("website", "").strip(),
+                status="pendente",
+                email_verified=False,
+                needs_password_change=False
+            )
+            
+            e.set_password("placeholder_pre_aprovacao")
+            
+            db.session.add(e)
+            db.session.flush() # Flush para obter o ID da empresa (e.id)
+
+            if doc_file and doc_file.filename:
+                if not allowed_file(doc_file.filename):
+                    flash("Documento deve ser PDF/JPG/PNG.", "warning")
+                    db.session.rollback()
+                    return redirect(request.url)
+                
+                # Salva o documento (uma vez por conteúdo, disco local ou S3, ver storage.py)
+                e.doc_filename = salvar_upload(doc_file, "documentos")
+
+            # Envia e-mail de verificação
+            if current_app.config.get("MAIL_USERNAME_SENDER") and e.email_comercial:
+                token = get_serializer().dumps({"kind": "empresa", "id": e.id})
+                verify_url = url_for("auth.verificar_email", token=token, _external=True)
+                enqueue_email(
+                    "Confirme seu e-mail - Verificação de Empresa",
+                    recipients=[e.email_comercial],
+                    body=(
+                        f"Olá, recebemos o cadastro da empresa {e.nome}.\n"
+                        f"Confirme seu e-mail no link:\n{verify_url}\n\n"
+                        f"Após confirmar, sua solicitação entrará para análise do time administrativo."
+                    )
+                )
+            
+            db.session.commit()
+            
+            flash("Cadastro enviado! Verifique seu e-mail para confirmar.", "success")
+            return redirect(url_for("public.index"))
+        
+        except Exception as e_exc:
+            db.session.rollback()
+            current_app.logger.error(f"Erro ao cadastrar empresa: {e_exc}", exc_info=True)
+            flash(f"Erro ao processar cadastro: {str(e_exc)}", "danger")
+            return redirect(request.url)
+    
+    return render_template("empresa_form.html")
+
+
+@bp.route("/verificar")
+def verificar_email():
+    token = request.args.get("token", "")
+    try:
+        data = get_serializer().loads(token, max_age=60 * 60 * 24 * 3)
+    except SignatureExpired:
+        flash("Link expirado. Envie novamente.", "warning")
+        return redirect(url_for("public.index"))
+    except BadSignature:
+        flash("Link inválido.", "danger")
+        return redirect(url_for("public.index"))
+    
+    kind = data.get("kind")
+    _id = data.get("id")
+    
+    try:
+        if kind == "condominio":
+            c = Condominio.query.get_or_404(_id)
+            c.email_verified = True
+            if c.status == "pendente":
+                c.status = "verificado"
+            db.session.commit()
+            flash("E-mail do condomínio verificado! Aguarde aprovação.", "success")
+        elif kind == "empresa":
+            e = Empresa.query.get_or_404(_id)
+            e.email_verified = True
+            if e.status == "pendente":
+                e.status = "verificado"
+            db.session.commit()
+            flash("E-mail da empresa verificado! Aguarde aprovação.", "success")
+        else:
+            flash("Token desconhecido.", "danger")
+    except Exception as e:
+        flash(f"Erro ao verificar e-mail: {str(e)}", "danger")
+    
+    return redirect(url_for("public.index"))
+
+
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        email = request.form.get("email")
+        senha = request.form.get("senha")
+        
+        # 1. Tentar Login como ADMIN (SEGURANÇA IMPLEMENTADA!)
+        admin_email = current_app.config.get("ADMIN_EMAIL")
+        admin_password_hash = current_app.config.get("ADMIN_PASSWORD_HASH") 
+        
+        # Checagem SEGURA: usa o HASH do .env e a senha em texto puro do form
+        if email == admin_email and check_password_hash(admin_password_hash, senha):
+            session.clear()
+            session["user_type"] = "admin"
+            session["user_id"] = "admin"
+            session["user_name"] = "Admin"
+            flash("Login de Administrador efetuado.", "success")
+            return redirect(url_for("admin.admin_dashboard"))
+
+        # 2. Tentar Login como CONDOMÍNIO ou EMPRESA: uma consulta na tabela de contas
+        conta = ContaAcesso.query.filter_by(email_normalizado=normalizar_email(email)).first()
+        if conta and conta.check_password(senha):
+            if not conta.is_active:
+                if conta.tipo == "condominio":
+                    nome = db.session.get(Condominio, conta.usuario_id).nome
+                    flash(f"O acesso para o condomínio '{nome}' está suspenso. Contate o administrador.", "warning")
+                else:
+                    nome = db.session.get(Empresa, conta.usuario_id).nome
+                    flash(f"O acesso para a empresa '{nome}' está suspenso. Contate o administrador.", "warning")
+                return redirect(url_for("auth.login"))
+
+            session.clear()
+            session["user_type"] = conta.tipo
+            session["user_id"] = conta.usuario_id
+            session["user_name"] = conta.nome_exibicao
+            flash(f"Bem-vindo(a), {conta.nome_exibicao}!", "success")
+
+            if conta.needs_password_change:
+                return redirect(url_for("auth.mudar_senha"))
+
+            return redirect(url_for(f"{conta.tipo}.{conta.tipo}_dashboard"))
+        
+        flash("Credenciais inválidas.", "danger")
+        
+    return render_template("login.html")
+
+
+@bp.route("/mudar-senha", methods=["GET", "POST"])
+@login_required
+def mudar_senha():
+    user_type = session.get("user_type")
+    user_id = session.get("user_id")
+
+    if user_type == "admin":
+        flash("A senha do administrador deve ser alterada no arquivo .env do servidor.", "info")
+        return redirect(url_for("admin.admin_dashboard"))
+        
+    user_entity = None
+    if user_type == "condominio":
+        user_entity = Condominio.query.get(user_id)
+    elif user_type == "empresa":
+        user_entity = Empresa.query.get(user_id)
+        
+    if not user_entity:
+        return redirect(url_for("auth.logout"))
+        
+    if request.method == "POST":
+        nova_senha = request.form.get("nova_senha")
+        confirma_senha = request.form.get("confirma_senha")
+        
+        if nova_senha != confirma_senha:
+            flash("A nova senha e a confirmação de senha não são iguais.", "danger")
+            return redirect(request.url)
+
+        if not nova_senha or len(nova_senha) < 6:
+            flash("A senha deve ter pelo menos 6 caracteres.", "danger")
+            return redirect(request.url)
+            
+        try:
+            # Salva a nova senha e reseta o flag
+            user_entity.set_password(nova_senha)
+            user_entity.needs_password_change = False
+            db.session.commit()
+            
+            flash("Sua senha foi alterada com sucesso! Você está logado.", "success")
+            return redirect(url_for(f"{user_type}.{user_type}_dashboard"))
+            
+        except Exception as e:
+            flash(f"Erro ao salvar a nova senha: {str(e)}", "danger")
+            return redirect(request.url)
+            
+    return render_template("mudar_senha_form.html")
+
+
+@bp.route("/sair")
+def logout():
+    session.clear()
+    flash("Sessão encerrada.", "info")
+    return redirect(url_for("public.index"))
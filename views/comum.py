@@ -0,0 +1,42 @@
+"""Funções usadas por mais de um blueprint."""
+import secrets
+import string
+from functools import wraps
+
+from flask import current_app, redirect, session, url_for
+from itsdangerous import URLSafeTimedSerializer
+
+ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg"}
+
+
+def allowed_file(filename: str) -> bool:
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+# Função para gerar senha temporária segura
+def generate_temp_password(length=12):
+    """Gera uma senha temporária complexa de 12 caracteres."""
+    characters = string.ascii_letters + string.digits + string.punctuation
+    temp_password = [
+        secrets.choice(string.ascii_lowercase),
+        secrets.choice(string.ascii_uppercase),
+        secrets.choice(string.digits),
+        secrets.choice(string.punctuation),
+    ]
+    temp_password += [secrets.choice(characters) for _ in range(length - 4)]
+    secrets.SystemRandom().shuffle(temp_password)
+    return ''.join(temp_password)
+
+
+def get_serializer():
+    """Serializer dos links de verificação de e-mail (assinado com a SECRET_KEY da app)."""
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"])
+
+
+def login_required(fn):
+    @wraps(fn)
+    def _wrap(*args, **kwargs):
+        if session.get("user_type"):
+            return fn(*args, **kwargs)
+        return redirect(url_for("auth.login"))
+    return _wrap
@@ -0,0 +1,296 @@
+"""Área do condomínio: dashboard, licitações, escolha do vencedor e avaliação."""
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, session, url_for
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from loaders import LICITACAO_COM_CANDIDATOS
+from models import db, Condominio, Empresa, Licitacao, Candidatura, Avaliacao, MensagemLicitacao
+from outbox import enqueue_email
+from pagination import paginate_keyset
+from storage import salvar_upload
+from views.comum import allowed_file, login_required
+
+bp = Blueprint("condominio", __name__)
+
+
+def _transicao_recusada(licitacao_id, user_id, mensagem):
+    """Resposta quando o UPDATE condicional não pegou a linha: inexistente, de outro dono ou fora de estado."""
+    dono = db.session.query(Licitacao.condominio_id).filter_by(id=licitacao_id).scalar()
+    if dono is None:
+        abort(404)
+    if dono != user_id:
+        flash("Licitação não encontrada.", "danger")
+        return redirect(url_for("condominio.condominio_licitacoes"))
+    flash(mensagem, "warning")
+    return redirect(url_for("condominio.condominio_detalhe_licitacao", licitacao_id=licitacao_id))
+
+
+@bp.route("/dashboard/condominio", methods=["GET", "POST"])
+@login_required
+def condominio_dashboard():
+    user_id = session.get("user_id")
+
+    if session.get("user_type") != "condominio" or user_id == "admin":
+        flash("Acesso negado.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    c = Condominio.query.get_or_404(user_id)
+
+    if c.needs_password_change:
+        return redirect(url_for("auth.mudar_senha"))
+
+    if request.method == "POST":
+        if 'documento' in request.files:
+            documento = request.files.get("documento")
+            if documento and documento.filename:
+                if allowed_file(documento.filename) and documento.filename.lower().endswith(".pdf"):
+                    # Save the file and the relative path (storage key) to the database
+                    c.pdf_filename = salvar_upload(documento, "documentos")
+                    db.session.commit()
+                    flash("Documento enviado com sucesso!", "success")
+                else:
+                    flash("Envie um PDF válido.", "warning")
+
+        # Lidar com consentimento LGPD e Termos de Uso
+        if 'lgpd-consent' in request.form:
+            c.lgpd_consent = True
+        if 'terms-consent' in request.form:
+            c.terms_consent = True
+        db.session.commit()
+
+    return render_template("condominio_dashboard.html", c=c)
+
+
+@bp.route("/dashboard/condominio/licitacoes")
+@login_required
+def condominio_licitacoes():
+    user_id = session.get("user_id")
+    if session.get("user_type") != "condominio":
+        flash("Acesso negado.", "danger")
+        return redirect(url_for("auth.logout"))
+        
+    # Busca as licitações criadas por este condomínio, já com o total de
+    # candidatos e a menor/maior proposta (um único GROUP BY, sem carregar as candidaturas)
+    query = (
+        db.session.query(
+            Licitacao,
+            func.count(Candidatura.id).label("total_candidatos"),
+            func.min(Candidatura.valor_proposta).label("menor_proposta"),
+            func.max(Candidatura.valor_proposta).label("maior_proposta"),
+        )
+        .outerjoin(Candidatura, Candidatura.licitacao_id == Licitacao.id)
+        .filter(Licitacao.condominio_id == user_id)
+        .group_by(Licitacao.id)
+    )
+    page = paginate_keyset(query, Licitacao.created_at, Licitacao.id, descending=True)
+    
+    return render_template("condominio_licitacoes.html", licitacoes=page.items, page=page)
+
+
+@bp.route("/dashboard/condominio/licitacao/<int:licitacao_id>")
+@login_required
+def condominio_detalhe_licitacao(licitacao_id):
+    user_id = session.get("user_id")
+    user_type = session.get("user_type")
+
+    if user_type not in ["admin", "condominio"]:
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    licitacao = Licitacao.query.options(*LICITACAO_COM_CANDIDATOS).get_or_404(licitacao_id)
+
+    # Se for um condomínio, garanta que ele só possa ver suas próprias licitações
+    if user_type == "condominio" and licitacao.condominio_id != user_id:
+        flash("Licitação não encontrada.", "danger")
+        return redirect(url_for("condominio.condominio_licitacoes"))
+
+    # Canal de comunicação: só as últimas mensagens; o histórico e as novas vêm por JSON (views/mensagens.py)
+    mensagens, mensagens_anteriores = [], False
+    if licitacao.status == 'concluida' and licitacao.empresa_vencedora_id:
+        mensagens, mensagens_anteriores = MensagemLicitacao.do_canal(
+            licitacao.id, limite=current_app.config["MENSAGENS_POR_PAGINA"])
+
+    return render_template(
+        "condominio_detalhe_licitacao.html",
+        licitacao=licitacao,
+        mensagens=mensagens,
+        mensagens_anteriores=mensagens_anteriores,
+    )
+
+
+@bp.route("/dashboard/condominio/licitacao/<int:licitacao_id>/encerrar", methods=["POST"])
+@login_required
+def condominio_encerrar_licitacao(licitacao_id):
+    user_id = session.get("user_id")
+    if session.get("user_type") != "condominio":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    if Licitacao.transicionar(licitacao_id, "fechada", Licitacao.condominio_id == user_id) is None:
+        db.session.rollback()
+        return _transicao_recusada(licitacao_id, user_id, "Esta licitação não está mais aberta.")
+
+    db.session.commit()
+    flash("Licitação encerrada. Agora você pode escolher um vencedor.", "success")
+    return redirect(url_for("condominio.condominio_detalhe_licitacao", licitacao_id=licitacao_id))
+
+
+
+@bp.route("/dashboard/condominio/licitacao/<int:licitacao_id>/vencedor/<int:candidatura_id>", methods=["POST"])
+@login_required
+def condominio_escolher_vencedor(licitacao_id, candidatura_id):
+    user_id = session.get("user_id")
+    if session.get("user_type") != "condominio":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    winning_candidatura = Candidatura.query.options(joinedload(Candidatura.empresa)) \
+                                           .filter_by(id=candidatura_id, licitacao_id=licitacao_id).first_or_404()
+    vencedora = winning_candidatura.empresa
+    nome_vencedora = vencedora.nome
+
+    # 1. fechada -> concluida num UPDATE condicional: de dois envios
+    #    simultâneos, o segundo não encontra a linha fechada e não escolhe outra vencedora
+    licitacao = Licitacao.transicionar(licitacao_id, "concluida", Licitacao.condominio_id == user_id,
+                                       empresa_vencedora_id=winning_candidatura.empresa_id)
+    if licitacao is None:
+        db.session.rollback()
+        atual = db.session.query(Licitacao.condominio_id, Licitacao.empresa_vencedora_id) \
+                          .filter_by(id=licitacao_id).first()
+        if atual == (user_id, winning_candidatura.empresa_id):
+            # Reenvio do mesmo formulário (duplo clique): nada a fazer, nem e-mails
+            flash(f"Empresa {nome_vencedora} já é a vencedora desta licitação.", "info")
+            return redirect(url_for("condominio.condominio_detalhe_licitacao", licitacao_id=licitacao_id))
+        return _transicao_recusada(licitacao_id, user_id,
+                                   "A vencedora só pode ser escolhida com a licitação encerrada e sem vencedora.")
+
+    try:
+        Empresa.ajustar_servicos(winning_candidatura.empresa_id, +1)
+        winning_candidatura.status = "aceita"
+
+        # 2. Todas as outras candidaturas em um único UPDATE; os e-mails em uma consulta com join
+        rejeitadas = Candidatura.query.filter(
+            Candidatura.licitacao_id == licitacao_id,
+            Candidatura.id != candidatura_id
+        ).update({Candidatura.status: "rejeitada"}, synchronize_session=False)
+
+        emails_perdedoras = [email for (email,) in (
+            db.session.query(Empresa.email_comercial)
+            .join(Candidatura, Candidatura.empresa_id == Empresa.id)
+            .filter(Candidatura.licitacao_id == licitacao_id, Candidatura.id != candidatura_id)
+        )]
+        current_app.logger.info(f"Licitação ID {licitacao_id} marcada como 'concluida'. Candidatura vencedora ID {candidatura_id} status: 'aceita'; {rejeitadas} perdedora(s) 'rejeitada'.")
+
+        # 3. Enfileira as notificações na mesma transação (enviadas pelo worker do outbox)
+        nome_condominio = db.session.query(Condominio.nome).filter_by(id=user_id).scalar()
+        enqueue_email(
+            f"Parabéns! Sua proposta para a licitação '{licitacao.titulo}' foi aceita!",
+            recipients=[vencedora.email_comercial],
+            body=f"Olá {vencedora.nome},\n\nSua proposta para a licitação '{licitacao.titulo}' foi aceita pelo condomínio {nome_condominio}. Parabéns!\n\nPara iniciar a comunicação, acesse o portal e veja a licitação na sua área de 'Minhas Candidaturas'.\n\nAtenciosamente,\nEquipe Condomínio Blindado"
+        )
+        for email in emails_perdedoras:
+            enqueue_email(
+                f"Resultado da Licitação: {licitacao.titulo}",
+                recipients=[email],
+                body=f"Olá,\n\nA licitação '{licitacao.titulo}' para a qual você se candidatou foi encerrada e outro fornecedor foi selecionado.\n\nAgradecemos seu interesse e encorajamos você a continuar participando de outras oportunidades em nossa plataforma."
+            )
+
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro ao commitar alterações de status: {e}", exc_info=True)
+        flash("Ocorreu um erro ao atualizar os status. Tente novamente.", "danger")
+        return redirect(url_for("condominio.condominio_detalhe_licitacao", licitacao_id=licitacao_id))
+
+    flash(f"Empresa {nome_vencedora} escolhida como vencedora. As notificações serão enviadas por e-mail.", "success")
+    return redirect(url_for("condominio.condominio_detalhe_licitacao", licitacao_id=licitacao_id))
+
+
+@bp.route("/dashboard/condominio/licitacao/<int:licitacao_id>/avaliar", methods=["POST"])
+@login_required
+def condominio_avaliar_servico(licitacao_id):
+    user_id = session.get("user_id")
+    if session.get("user_type") != "condominio":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    licitacao = Licitacao.query.get_or_404(licitacao_id)
+    if licitacao.condominio_id != user_id:
+        flash("Licitação não encontrada.", "danger")
+        return redirect(url_for("condominio.condominio_licitacoes"))
+
+    rating_str = request.form.get("rating")
+    comment = request.form.get("comment")
+
+    try:
+        rating = int(rating_str)
+        if not 1 <= rating <= 5:
+            raise ValueError("Rating fora do intervalo.")
+    except (ValueError, TypeError):
+        flash("Nota de avaliação inválida.", "danger")
+        return redirect(url_for("condominio.condominio_detalhe_licitacao", licitacao_id=licitacao.id))
+
+    avaliacao = Avaliacao(
+        licitacao_id=licitacao.id,
+        empresa_id=licitacao.empresa_vencedora_id,
+        condominio_id=user_id,
+        rating=rating,
+        comment=comment
+    )
+    db.session.add(avaliacao)
+    Empresa.registrar_avaliacao(licitacao.empresa_vencedora_id, rating)
+    db.session.commit()
+
+    flash("Avaliação enviada com sucesso.", "success")
+    return redirect(url_for("condominio.condominio_detalhe_licitacao", licitacao_id=licitacao.id))
+
+
+@bp.route("/licitacoes/nova", methods=["GET", "POST"])
+@login_required
+def criar_licitacao():
+    user_id = session.get("user_id")
+    if session.get("user_type") != "condominio":
+        flash("Apenas condomínios podem criar licitações.", "warning")
+        return redirect(url_for("public.index"))
+
+    if request.method == "POST":
+        titulo = request.form.get("titulo")
+        tipo = request.form.get("tipo_servico")
+        descricao = request.form.get("descricao")
+        valor_orcamento_str = request.form.get("valor_orcamento")
+
+        valor_orcamento = None
+        if valor_orcamento_str:
+            try:
+                valor_orcamento = float(valor_orcamento_str)
+            except ValueError:
+                flash("Valor do orçamento inválido.", "danger")
+                return redirect(request.url)
+        
+        if not titulo or not tipo or not descricao:
+            flash("Preencha todos os campos obrigatórios.", "danger")
+            return redirect(request.url)
+            
+        try:
+            nova_licitacao = Licitacao(
+                condominio_id=user_id,
+                titulo=titulo,
+                tipo_servico=tipo,
+                descricao=descricao,
+                valor_orcamento=valor_orcamento,
+                status=Licitacao.ESTADO_INICIAL,
+                custo_coins=10 # Valor fixo por enquanto, pode ser dinâmico no futuro
+            )
+            
+            db.session.add(nova_licitacao)
+            db.session.commit()
+            
+            flash("Licitação publicada com sucesso! As empresas serão notificadas.", "success")
+            return redirect(url_for("condominio.condominio_dashboard"))
+            
+        except Exception as e:
+            flash(f"Erro ao criar licitação: {str(e)}", "danger")
+            return redirect(request.url)
+            
+    return render_template("criar_licitacao.html")
@@ -0,0 +1,240 @@
+"""Área da empresa: dashboard, licitações abertas, candidaturas."""
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+from sqlalchemy.orm import load_only
+
+from busca import buscar_licitacoes, listar_abertas
+from coins import SaldoInsuficiente, debitar
+from eventos import notificar
+from loaders import LICITACAO_COM_CONDOMINIO, CANDIDATURA_COM_LICITACAO
+from models import db, Empresa, Licitacao, Candidatura, MensagemLicitacao
+from storage import salvar_upload
+from views.comum import allowed_file, login_required
+
+bp = Blueprint("empresa", __name__)
+
+
+@bp.route("/licitacoes")
+@login_required
+def listar_licitacoes():
+    user_id = session.get("user_id")
+    if session.get("user_type") != "empresa":
+        flash("Acesso restrito a empresas.", "warning")
+        return redirect(url_for("public.index"))
+        
+    empresa = Empresa.query.get(user_id)
+    # Lista apenas licitações abertas; com ?q=, por relevância (busca.py)
+    termos = request.args.get("q", "").strip()
+    cidade = request.args.get("cidade", "").strip()
+    estado = request.args.get("estado", "").strip()
+    if termos:
+        page, destaques = buscar_licitacoes(termos, cidade, estado, opcoes=LICITACAO_COM_CONDOMINIO)
+        licitacoes = [lic for lic, _ in page.items]
+    else:
+        page, destaques = listar_abertas(cidade, estado, opcoes=LICITACAO_COM_CONDOMINIO), {}
+        licitacoes = page.items
+    
+    return render_template("lista_licitacoes.html", licitacoes=licitacoes, page=page, destaques=destaques,
+                           termos=termos, cidade=cidade, estado=estado, saldo_coins=empresa.saldo_coins)
+
+
+@bp.route("/licitacoes/<int:_id>")
+@login_required
+def detalhe_licitacao(_id):
+    user_id = session.get("user_id")
+    if session.get("user_type") != "empresa":
+        return redirect(url_for("public.index"))
+        
+    lic = Licitacao.query.options(*LICITACAO_COM_CONDOMINIO).get_or_404(_id)
+    empresa = Empresa.query.get(user_id)
+    
+    # Garante que saldo_coins nunca seja None para evitar erros no template
+    if empresa.saldo_coins is None:
+        empresa.saldo_coins = 0
+    
+    # Verifica se já se candidatou (EXISTS no índice único)
+    ja_candidatou = db.session.query(
+        Candidatura.query.filter_by(licitacao_id=lic.id, empresa_id=empresa.id).exists()
+    ).scalar()
+    
+    # CORREÇÃO: Trata None como 0 para evitar erro de comparação
+    saldo_atual = empresa.saldo_coins  # Agora seguro, não é mais None
+    custo_licitacao = lic.custo_coins if lic.custo_coins is not None else 0
+    saldo_insuficiente = saldo_atual < custo_licitacao
+    
+    return render_template("detalhe_licitacao.html", 
+                           lic=lic, 
+                           empresa=empresa, 
+                           ja_candidatou=ja_candidatou,
+                           saldo_insuficiente=saldo_insuficiente)
+
+
+@bp.route("/licitacoes/<int:_id>/candidatar", methods=["POST"])
+@login_required
+def candidatar_licitacao(_id):
+    user_id = session.get("user_id")
+    if session.get("user_type") != "empresa":
+        return redirect(url_for("public.index"))
+        
+    # Só o necessário para o débito; status e duplicidade ficam com o INSERT
+    lic = Licitacao.query.options(
+        load_only(Licitacao.id, Licitacao.titulo, Licitacao.status, Licitacao.custo_coins)
+    ).get_or_404(_id)
+    if lic.status != "aberta":
+        flash("Esta licitação não está mais aberta para candidaturas.", "warning")
+        return redirect(url_for("empresa.detalhe_licitacao", _id=_id))
+
+    mensagem = request.form.get("mensagem", "")
+    valor_proposta_str = request.form.get("valor_proposta")
+
+    valor_proposta = None
+    if valor_proposta_str:
+        try:
+            valor_proposta = float(valor_proposta_str)
+        except ValueError:
+            flash("Valor da proposta inválido.", "danger")
+            return redirect(url_for("empresa.detalhe_licitacao", _id=_id))
+
+    custo_licitacao = lic.custo_coins if lic.custo_coins is not None else 0
+
+    try:
+        # 1. Criar Candidatura: nada é inserido se já existir ou se a licitação fechou
+        candidatura_id = Candidatura.inscrever(lic.id, user_id, mensagem=mensagem, valor_proposta=valor_proposta)
+        if candidatura_id is None:
+            # Sem linha inserida: ou a empresa já tinha candidatura, ou a licitação fechou depois da leitura acima
+            ja_candidatou = db.session.query(
+                Candidatura.query.filter_by(licitacao_id=lic.id, empresa_id=user_id).exists()
+            ).scalar()
+            db.session.rollback()
+            if ja_candidatou:
+                flash("Você já se candidatou para esta vaga.", "warning")
+            else:
+                flash("Esta licitação não está mais aberta para candidaturas.", "warning")
+            return redirect(url_for("empresa.detalhe_licitacao", _id=_id))
+
+        # 2. Debitar Coins no mesmo commit: o UPDATE só passa se houver saldo (ver coins.py)
+        debitar(user_id, custo_licitacao, f"Candidatura Licitação #{lic.id} - {lic.titulo}")
+        notificar(db.session, [{"tipo": "candidatura", "licitacao_id": lic.id, "id": candidatura_id}])
+        db.session.commit()
+        
+        # Opcional: Enviar e-mail para o condomínio notificando nova candidatura
+        
+        flash("Candidatura realizada com sucesso!", "success")
+        return redirect(url_for("empresa.detalhe_licitacao", _id=_id))
+        
+    except SaldoInsuficiente:
+        db.session.rollback()
+        flash("Saldo insuficiente.", "danger")
+        return redirect(url_for("payments.comprar_coins"))
+
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao processar candidatura: {str(e)}", "danger")
+        return redirect(url_for("empresa.detalhe_licitacao", _id=_id))
+
+
+@bp.route("/dashboard/empresa", methods=["GET", "POST"])
+@login_required
+def empresa_dashboard():
+    user_id = session.get("user_id")
+
+    if session.get("user_type") != "empresa" or user_id == "admin":
+        flash("Acesso negado.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    e = Empresa.query.get_or_404(user_id)
+
+    if e.needs_password_change:
+        return redirect(url_for("auth.mudar_senha"))
+
+    if request.method == "POST":
+        # Lógica de upload de documento
+        if 'documento' in request.files:
+            documento = request.files.get("documento")
+            if documento and documento.filename:
+                if allowed_file(documento.filename):
+                    e.doc_filename = salvar_upload(documento, "documentos")
+                    db.session.commit()
+                    flash("Documento enviado com sucesso!", "success")
+                else:
+                    flash("Envie um arquivo válido (PDF/JPG/PNG).", "warning")
+
+        # Lógica de upload de logo
+        if 'logo' in request.files:
+            logo = request.files.get("logo")
+            if logo and logo.filename:
+                if logo.filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+                    from logos import receber_logo, LogoInvalida # Pillow só é carregado aqui
+                    try:
+                        # Só grava o original; as variantes saem do `flask logo-worker`
+                        receber_logo(e, logo)
+                        db.session.commit()
+                        flash("Logo recebida! Ela aparecerá em instantes, assim que for processada.", "success")
+                    except LogoInvalida as ex:
+                        flash(str(ex), "warning")
+                    except Exception as ex:
+                        db.session.rollback()
+                        current_app.logger.error(f"Erro ao processar logo: {ex}", exc_info=True)
+                        flash("Ocorreu um erro ao processar a imagem da logo.", "danger")
+                else:
+                    flash("Envie uma imagem válida (PNG ou JPEG).", "warning")
+
+        # Lidar com consentimento LGPD e Termos de Uso
+        if 'lgpd-consent' in request.form:
+            e.lgpd_consent = True
+        if 'terms-consent' in request.form:
+            e.terms_consent = True
+        db.session.commit()
+
+    return render_template("empresa_dashboard.html", e=e)
+
+
+@bp.route("/dashboard/empresa/candidaturas")
+@login_required
+def empresa_candidaturas():
+    user_id = session.get("user_id")
+    if session.get("user_type") != "empresa":
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    # Busca as candidaturas da empresa, fazendo join com a licitação para ter acesso aos detalhes
+    candidaturas = (
+        db.session.query(Candidatura).join(Licitacao)
+        .options(*CANDIDATURA_COM_LICITACAO)
+        .filter(Candidatura.empresa_id == user_id)
+        .order_by(Licitacao.created_at.desc())
+        .all()
+    )
+
+    return render_template("empresa_candidaturas.html", candidaturas=candidaturas)
+
+
+@bp.route("/dashboard/empresa/licitacao/<int:licitacao_id>")
+@login_required
+def empresa_detalhe_licitacao(licitacao_id):
+    user_id = session.get("user_id")
+    user_type = session.get("user_type")
+
+    if user_type != 'empresa':
+        flash("Acesso restrito.", "danger")
+        return redirect(url_for("auth.logout"))
+
+    licitacao = Licitacao.query.options(*LICITACAO_COM_CONDOMINIO).get_or_404(licitacao_id)
+    
+    # Security check: Ensure the company is a candidate for this bid
+    candidatura = Candidatura.query.filter_by(licitacao_id=licitacao.id, empresa_id=user_id).first()
+    if not candidatura:
+        flash("Você não tem permissão para ver esta licitação.", "danger")
+        return redirect(url_for('empresa.empresa_candidaturas'))
+
+    # Canal de comunicação: só as últimas mensagens; o histórico e as novas vêm por JSON (views/mensagens.py)
+    mensagens, mensagens_anteriores = [], False
+    if licitacao.status == 'concluida' and licitacao.empresa_vencedora_id == user_id:
+        mensagens, mensagens_anteriores = MensagemLicitacao.do_canal(
+            licitacao.id, limite=current_app.config["MENSAGENS_POR_PAGINA"])
+
+    return render_template(
+        "empresa_detalhe_licitacao.html",
+        licitacao=licitacao,
+        mensagens=mensagens,
+        mensagens_anteriores=mensagens_anteriores,
+    )
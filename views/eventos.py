@@ -0,0 +1,52 @@
+"""Stream de eventos ao vivo de uma licitação (Server-Sent Events, ver eventos.py)."""
+from flask import Blueprint, Response, current_app, session
+from sqlalchemy import func
+
+from eventos import eventos_ativos, get_barramento, transmitir
+from models import db, Licitacao, Candidatura, MensagemLicitacao
+from views.mensagens import participa_do_canal
+
+bp = Blueprint("eventos", __name__)
+
+
+@bp.route("/licitacao/<int:licitacao_id>/eventos")
+def eventos_licitacao(licitacao_id):
+    # Respostas diferentes de 200 fazem o EventSource desistir, sem reconectar
+    if not eventos_ativos():
+        return "", 204
+    licitacao = db.session.get(Licitacao, licitacao_id)
+    if licitacao is None:
+        return "", 404
+    user_type, user_id = session.get("user_type"), session.get("user_id")
+    if not participa_do_canal(licitacao, user_type, user_id):
+        return "", 403
+
+    # Candidaturas das concorrentes só interessam ao condomínio
+    e_condominio = user_type == 'condominio'
+    tipos = ("candidatura", "mensagem") if e_condominio else ("mensagem",)
+    barramento = get_barramento()
+    # Assina antes de ler o estado: nada que chegue entre os dois se perde
+    assinatura = barramento.assinar(licitacao.id, tipos)
+    try:
+        estado = {
+            "tipo": "estado",
+            "licitacao_id": licitacao.id,
+            "candidaturas": Candidatura.query.filter_by(licitacao_id=licitacao.id).count() if e_condominio else None,
+            "ultima_mensagem": db.session.query(func.max(MensagemLicitacao.id))
+                                         .filter(MensagemLicitacao.licitacao_id == licitacao.id).scalar(),
+        }
+    except Exception:
+        barramento.cancelar(assinatura)
+        raise
+    # O streaming pode durar minutos: a conexão do banco volta ao pool agora
+    db.session.close()
+
+    config = current_app.config
+    response = Response(
+        transmitir(barramento, assinatura, estado, config["SSE_KEEPALIVE"], config["SSE_DURACAO_MAX"]),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # Sem buffer no nginx
+    )
+    # Se o cliente cair antes do primeiro byte o gerador nem começa: a assinatura sai aqui
+    response.call_on_close(lambda: barramento.cancelar(assinatura))
+    return response
@@ -0,0 +1,86 @@
+"""
+Mensagens trocadas entre o condomínio e a empresa vencedora de uma licitação.
+
+A página de detalhe mostra só as últimas MENSAGENS_POR_PAGINA mensagens; o
+restante vem por JSON, com o id da mensagem como cursor:
+
+    GET /licitacao/<id>/mensagens?depois=<id>   novas mensagens (polling)
+    GET /licitacao/<id>/mensagens?antes=<id>    página anterior do histórico
+
+Cada chamada é uma faixa do índice (licitacao_id, id), então um polling sem
+mensagens novas custa uma leitura vazia no índice.
+"""
+from flask import Blueprint, current_app, flash, redirect, request, session, url_for
+
+from models import db, Licitacao, MensagemLicitacao
+from pagination import page_size
+from views.comum import login_required
+
+bp = Blueprint("mensagens", __name__)
+
+
+def participa_do_canal(licitacao, user_type, user_id):
+    """Só o condomínio dono da licitação e a empresa vencedora usam o canal."""
+    is_condominio_owner = user_type == 'condominio' and licitacao.condominio_id == user_id
+    is_empresa_winner = user_type == 'empresa' and licitacao.empresa_vencedora_id == user_id
+    return is_condominio_owner or is_empresa_winner
+
+
+def _quer_json():
+    return request.accept_mimetypes.best == "application/json"
+
+
+@bp.route("/licitacao/<int:licitacao_id>/mensagens")
+@login_required
+def listar_mensagens_licitacao(licitacao_id):
+    licitacao = Licitacao.query.get_or_404(licitacao_id)
+    if not participa_do_canal(licitacao, session.get("user_type"), session.get("user_id")):
+        return {"error": "Acesso não autorizado"}, 403
+
+    mensagens, tem_mais = MensagemLicitacao.do_canal(
+        licitacao.id,
+        depois=request.args.get("depois", type=int),
+        antes=request.args.get("antes", type=int),
+        limite=page_size(current_app.config["MENSAGENS_POR_PAGINA"]),
+    )
+    return {"mensagens": [m.para_json() for m in mensagens], "tem_mais": tem_mais}, 200, {"Cache-Control": "no-store"}
+
+
+@bp.route("/licitacao/<int:licitacao_id>/enviar-mensagem", methods=["POST"])
+@login_required
+def enviar_mensagem_licitacao(licitacao_id):
+    licitacao = Licitacao.query.get_or_404(licitacao_id)
+    user_id = session.get("user_id")
+    user_type = session.get("user_type")
+
+    # Security check: ensure user is part of this bid
+    if not participa_do_canal(licitacao, user_type, user_id):
+        if _quer_json():
+            return {"error": "Acesso não autorizado"}, 403
+        flash("Acesso não autorizado a este canal de mensagens.", "danger")
+        return redirect(url_for('public.index'))
+
+    conteudo = request.form.get("conteudo")
+    if not conteudo:
+        if _quer_json():
+            return {"error": "A mensagem não pode estar vazia."}, 400
+        flash("A mensagem não pode estar vazia.", "warning")
+    else:
+        nova_mensagem = MensagemLicitacao(
+            licitacao_id=licitacao.id,
+            remetente_id=user_id,
+            remetente_tipo=user_type,
+            conteudo=conteudo
+        )
+        db.session.add(nova_mensagem)
+        db.session.commit()
+        # Envio pelo chat da página (fetch): devolve a mensagem em vez de recarregar tudo
+        if _quer_json():
+            return nova_mensagem.para_json(), 201
+        flash("Mensagem enviada.", "success")
+
+    # Redirect back to the appropriate detail page
+    if user_type == 'condominio':
+        return redirect(url_for('condominio.condominio_detalhe_licitacao', licitacao_id=licitacao.id))
+    else: # 'empresa'
+        return redirect(url_for('empresa.empresa_detalhe_licitacao', licitacao_id=licitacao.id))
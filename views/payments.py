@@ -0,0 +1,273 @@
+"""Pagamentos pelo Mercado Pago: compra de coins, assinaturas e webhook."""
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+
+from models import db, Condominio, Empresa
+from mp_client import get_mp_sdk, MPIndisponivel
+from mp_webhooks import enqueue_notification
+from views.comum import login_required
+
+bp = Blueprint("payments", __name__)
+
+
+@bp.route("/comprar-coins")
+@login_required
+def comprar_coins():
+    if session.get("user_type") != "empresa":
+        flash("Apenas empresas podem comprar coins.", "warning")
+        return redirect(url_for("public.index"))
+    
+    return render_template("comprar_coins.html")
+
+
+@bp.route("/mp/criar-pagamento", methods=["POST"])
+@login_required
+def mp_criar_pagamento():
+    user_id = session.get("user_id")
+    if session.get("user_type") != "empresa":
+        return {"error": "Acesso não autorizado"}, 401
+
+    # --- CORREÇÃO DE ROBUSTEZ ---
+    # Busca a empresa no início e verifica se ela existe
+    empresa = Empresa.query.get(user_id)
+    if not empresa:
+        current_app.logger.error(f"Tentativa de criar pagamento para empresa inexistente com user_id: {user_id}")
+        return {"error": "Empresa não encontrada"}, 404
+    # --- FIM DA CORREÇÃO ---
+
+    try:
+        data = request.json
+        pacote_id = data.get("pacote_id")
+
+        pacotes = {
+            "pacote_1": {"qtd": 50, "preco": 50.00, "titulo": "50 Coins"},
+            "pacote_2": {"qtd": 120, "preco": 100.00, "titulo": "120 Coins (Bônus)"},
+            "pacote_3": {"qtd": 300, "preco": 200.00, "titulo": "300 Coins (Mega Bônus)"}
+        }
+
+        pacote = pacotes.get(pacote_id)
+        if not pacote:
+            return {"error": "Pacote inválido"}, 400
+
+        sdk = get_mp_sdk()
+
+        # Cria a preferência de pagamento com todos os dados necessários
+        preference_data = {
+            "items": [
+                {
+                    "title": f"Pacote de Coins - {pacote['titulo']}",
+                    "quantity": 1,
+                    "unit_price": pacote["preco"]
+                }
+            ],
+            "payer": {
+                "email": empresa.email_comercial,  # USA A EMPRESA JÁ VERIFICADA
+            },
+            "back_urls": {
+                "success": f"{current_app.config['BASE_URL']}/mp/success",
+                "failure": f"{current_app.config['BASE_URL']}/mp/failure",
+                "pending": f"{current_app.config['BASE_URL']}/mp/pending",
+            },
+            "auto_return": "approved",
+            "notification_url": f"{current_app.config['BASE_URL']}/mp/webhook",
+            "metadata": {
+                "empresa_id": user_id,
+                "coins_qtd": pacote['qtd']
+            }
+        }
+
+        preference_response = sdk.preference().create(preference_data)
+
+        if preference_response.get("status") in [200, 201]:
+            preference = preference_response["response"]
+            return {"init_point": preference["init_point"], "preference_id": preference["id"]}, 200
+        else:
+            current_app.logger.error(f"Erro MP ao criar preferência: {preference_response}")
+            return {"error": "Falha ao criar preferência de pagamento."}, 500
+
+    except MPIndisponivel:
+        current_app.logger.warning("Mercado Pago indisponível ao criar preferência de coins (circuit breaker aberto).")
+        return {"error": "Mercado Pago indisponível no momento. Tente novamente em instantes."}, 503
+    except Exception as e:
+        current_app.logger.error(f"Erro inesperado em mp_criar_pagamento: {e}", exc_info=True)
+        return {"error": str(e)}, 500
+
+
+@bp.route("/mp/success")
+def mp_success():
+    flash("Pagamento processado! Seus coins serão creditados assim que o Mercado Pago confirmar.", "success")
+    return redirect(url_for("empresa.empresa_dashboard"))
+
+
+@bp.route("/mp/failure")
+def mp_failure():
+    flash("Pagamento falhou ou foi cancelado.", "danger")
+    return redirect(url_for("payments.comprar_coins"))
+
+
+@bp.route("/mp/pending")
+def mp_pending():
+    flash("Pagamento em análise.", "info")
+    return redirect(url_for("empresa.empresa_dashboard"))
+
+
+@bp.route("/mp/webhook", methods=["POST"])
+def mp_webhook():
+    """
+    Apenas grava a notificação e responde na hora. A consulta à API do MP e a
+    aplicação do pagamento ficam com o worker (`flask mp-webhook-worker`).
+    """
+    data = request.json if request.is_json else request.form.to_dict()
+    current_app.logger.info(f"Webhook MP recebido: {data}")
+
+    try:
+        # Unifica a busca pelo tópico, compatível com diferentes versões da API do MP
+        topic = data.get('topic') or data.get('type')
+
+        if topic == 'payment':
+            recurso_id = (data.get('data') or {}).get('id')
+            if not recurso_id:
+                current_app.logger.error("Webhook de pagamento sem ID.")
+                return "Webhook de pagamento sem ID.", 400
+
+        elif topic == 'merchant_order':
+            resource_url = data.get('resource')
+            if not resource_url:
+                current_app.logger.error("Webhook de merchant_order sem URL de recurso.")
+                return "Webhook de merchant_order sem URL de recurso.", 400
+            recurso_id = resource_url.rstrip('/').split('/')[-1]
+
+        else:
+            current_app.logger.warning(f"Webhook com tópico desconhecido ou ausente: '{topic}'")
+            return "OK", 200
+
+        enqueue_notification(topic, recurso_id, data)
+        db.session.commit()
+        return "OK", 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"❌ Erro fatal no Webhook MP: {e}", exc_info=True)
+        return "Internal Server Error", 500
+
+
+@bp.route("/mp/criar-assinatura-recorrente", methods=["POST"])
+@login_required
+def mp_criar_assinatura_recorrente():
+    condominio_id = session.get("user_id")
+    if session.get("user_type") != "condominio":
+        return {"error": "Acesso não autorizado"}, 401
+
+    condominio = Condominio.query.get(condominio_id)
+    if not condominio:
+        current_app.logger.error(f"Tentativa de criar assinatura para condomínio inexistente com user_id: {condominio_id}")
+        return {"error": "Condomínio não encontrado"}, 404
+
+    try:
+        data = request.json
+        plano_id_str = data.get("plano_id")
+
+        # Mapeamento dos planos internos para IDs de preapproval_plan do Mercado Pago
+        # VOCÊ PRECISA CRIAR ESTES PLANOS NO SEU PAINEL DO MERCADO PAGO E COLOCAR OS IDs REAIS AQUI
+        planos_mp = {
+            "plano_basico": {
+                "title": "Plano Básico Condomínio Blindado",
+                "description": "Certificação Bronze, Suporte Básico, 1 Licitação/mês",
+                "price": 99.00,
+                "frequency": 1, # Mensal
+                "frequency_type": "months",
+                # "preapproval_plan_id": current_app.config["MP_PLAN_ID_BASIC"] # Removido
+            },
+            "plano_avancado": {
+                "title": "Plano Avançado Condomínio Blindado",
+                "description": "Certificação Prata, Suporte Prioritário, 3 Licitações/mês, Relatórios Mensais",
+                "price": 199.00,
+                "frequency": 1, # Mensal
+                "frequency_type": "months",
+                # "preapproval_plan_id": current_app.config["MP_PLAN_ID_ADVANCED"] # Removido
+            },
+            "plano_premium": {
+                "title": "Plano Premium Condomínio Blindado",
+                "description": "Certificação Ouro, Suporte VIP 24/7, Licitações Ilimitadas, Relatórios Personalizados, Consultoria",
+                "price": 299.00,
+                "frequency": 1, # Mensal
+                "frequency_type": "months",
+                # "preapproval_plan_id": current_app.config["MP_PLAN_ID_PREMIUM"] # Removido
+            }
+        }
+
+        plano_escolhido = planos_mp.get(plano_id_str)
+        if not plano_escolhido:
+            return {"error": "Plano inválido"}, 400
+        
+        # Validar se o preapproval_plan_id foi configurado
+
+
+        sdk = get_mp_sdk()
+
+        # Cria a preferência de pagamento (agora como um pagamento único)
+        preference_data = {
+            "items": [
+                {
+                    "title": plano_escolhido["title"],
+                    "description": plano_escolhido["description"],
+                    "quantity": 1,
+                    "unit_price": plano_escolhido["price"],
+                    "currency_id": "BRL"
+                }
+            ],
+            "payer": {
+                "email": condominio.email,
+            },
+            "back_urls": {
+                "success": f"{current_app.config['BASE_URL']}/mp/assinatura-status?status=approved",
+                "failure": f"{current_app.config['BASE_URL']}/mp/assinatura-status?status=rejected",
+                "pending": f"{current_app.config['BASE_URL']}/mp/assinatura-status?status=pending",
+            },
+            "auto_return": "approved",
+            "notification_url": f"{current_app.config['BASE_URL']}/mp/webhook",
+            "metadata": {
+                "condominio_id": condominio.id,
+                "plano_assinatura": plano_id_str
+            }
+        }
+
+        preference_response = sdk.preference().create(preference_data)
+
+        if preference_response.get("status") in [200, 201]:
+            preference = preference_response["response"]
+            # Salva o plano no condomínio (status inicial)
+            condominio.plano_assinatura = plano_id_str
+            # subscription_expires_at será atualizado pelo webhook após o pagamento
+            db.session.commit()
+
+            return {"init_point": preference["init_point"], "preference_id": preference["id"]}, 200
+        else:
+            #current_app.logger.error(f"Erro MP ao criar pré-aprovação: {preapproval_response}")    (consertar esse erro kkkk ta foda)
+            return {"error": "Falha ao criar assinatura. Tente novamente mais tarde."}, 500
+
+    except MPIndisponivel:
+        current_app.logger.warning("Mercado Pago indisponível ao criar assinatura (circuit breaker aberto).")
+        return {"error": "Mercado Pago indisponível no momento. Tente novamente em instantes."}, 503
+    except Exception as e:
+        current_app.logger.error(f"Erro inesperado em mp_criar_assinatura_recorrente: {e}", exc_info=True)
+        return {"error": str(e)}, 500
+
+
+@bp.route("/mp/assinatura-status")
+@login_required
+def mp_assinatura_status():
+    # Rota de retorno após o usuário interagir com o Mercado Pago
+    status = request.args.get("status")
+    preapproval_id = request.args.get("preapproval_id")
+
+    if status == "approved":
+        flash("Sua assinatura foi criada com sucesso! Aguarde a confirmação do primeiro pagamento.", "success")
+    elif status == "pending":
+        flash("Sua assinatura está pendente de aprovação do Mercado Pago.", "info")
+    elif status == "in_process":
+        flash("O pagamento da sua assinatura está em análise.", "info")
+    else: # canceled, rejected, etc.
+        flash("Não foi possível processar sua assinatura. Tente novamente.", "danger")
+    
+    # O webhook cuidará da atualização final do banco de dados
+    return redirect(url_for("condominio.condominio_dashboard"))
@@ -0,0 +1,103 @@
+"""Páginas públicas: início, listagens de certificados e parceiras, conteúdo e uploads."""
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+
+from models import db, Condominio, Empresa, Contato
+from page_cache import cache_publico
+from pagination import paginate_keyset
+from uploads import servir_upload
+
+bp = Blueprint("public", __name__)
+
+
+@bp.route("/blog")
+@cache_publico()
+def blog():
+    return render_template("blog.html")
+
+
+@bp.route("/faq")
+@cache_publico()
+def faq():
+    return render_template("faq.html")
+
+
+@bp.route("/contato", methods=["GET", "POST"])
+def contato():
+    if request.method == "POST":
+        try:
+            form = request.form
+            novo_contato = Contato(
+                nome=form.get("nome"),
+                email=form.get("email"),
+                telefone=form.get("telefone"),
+                mensagem=form.get("mensagem"),
+                status="nao_lido"
+            )
+            db.session.add(novo_contato)
+            db.session.commit()
+            flash("Mensagem enviada com sucesso! Em breve entraremos em contato.", "success")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Erro ao salvar contato: {e}", exc_info=True)
+            flash(f"Ocorreu um erro ao enviar sua mensagem. Tente novamente mais tarde.", "danger")
+        
+        return redirect(url_for("public.contato"))
+    return render_template("contato.html")
+
+
+@bp.route("/planos")
+@cache_publico()
+def pricing():
+    user_id = session.get("user_id")
+    user_type = session.get("user_type")
+    
+    # Tenta buscar o condomínio se ele estiver logado para passar para o template
+    condominio = None
+    if user_type == "condominio" and user_id:
+        condominio = Condominio.query.get(user_id)
+    
+    return render_template("pricing.html", c=condominio)
+
+
+@bp.route("/")
+@cache_publico()
+def index():
+    try:
+        condominios = Condominio.query.filter_by(status="aprovado").order_by(Condominio.created_at.desc()).limit(8).all()
+    except Exception as e:
+        # Se a tabela ainda não existe (no primeiro load), esta exceção evita o crash.
+        print(f"Erro ao carregar condomínios: {e}") 
+        condominios = []
+    
+    return render_template("index.html", condominios=condominios)
+
+
+@bp.route("/condominios-certificados")
+@cache_publico(args=("cursor", "per_page"))
+def lista_certificados():
+    try:
+        page = paginate_keyset(Condominio.query.filter_by(status="aprovado"), Condominio.nome, Condominio.id)
+    except Exception as e:
+        print(f"Erro ao listar certificados: {e}")
+        page = None
+        
+    return render_template("certificados.html", condominios=page.items if page else [], page=page)
+
+
+@bp.route("/empresas-parceiras")
+@cache_publico(args=("cursor", "per_page"))
+def lista_empresas():
+    try:
+        page = paginate_keyset(Empresa.query.filter_by(status="aprovado"), Empresa.nome, Empresa.id)
+    except Exception as e:
+        print(f"Erro ao listar empresas: {e}")
+        page = None
+        
+    return render_template("empresas_parceiras.html", empresas=page.items if page else [], page=page)
+
+
+@bp.route("/uploads/<path:filename>")
+def uploaded_file(filename):
+    # ATENÇÃO: Esta rota só funcionará se você configurar um CDN ou armazenamento persistente.
+    # ETag, cache imutável, 304, Range e X-Accel-Redirect ficam em uploads.py
+    return servir_upload(filename)